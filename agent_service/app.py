@@ -246,7 +246,7 @@ async def _convert_message_to_events(message: Any) -> AsyncIterator[Dict[str, An
                     # Detect CLI tool type
                     cli_tools = [
                         "mf-market-get", "mf-estimates-get", "mf-documents-get",
-                        "mf-filing-extract", "mf-qa", "mf-calc-simple",
+                        "mf-filing-extract", "mf-filings-search", "mf-qa", "mf-calc-simple",
                         "mf-valuation-basic-dcf", "mf-report-save",
                         "mf-extract-json", "mf-json-inspect", "mf-doc-diff",
                         "mf-render-metrics", "mf-render-comparison",
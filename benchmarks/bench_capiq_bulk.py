@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CapIQProvider.bulk_query with chunks sent one at a time (previous
+loop) vs concurrently, against a local stand-in GDS server whose latency
+grows with the number of requests in a call.
+
+USAGE:
+  python benchmarks/bench_capiq_bulk.py [--tickers 50] [--mnemonics 10] [--periods 10]
+                                        [--base-ms 300] [--per-request-ms 1] [--in-flight 1 4 8]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.providers.capiq import CapIQProvider
+
+
+def make_handler(base: float, per_request: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if self.path.endswith("/token"):
+                payload = {"access_token": "a", "refresh_token": "r", "expires_in_seconds": "3600"}
+            else:
+                requests = json.loads(body)["inputRequests"]
+                time.sleep(base + per_request * len(requests))
+                payload = {"GDSSDKResponse": [
+                    {"Identifier": r["identifier"], "Mnemonic": r["mnemonic"], "Properties": {},
+                     "Rows": [{"Row": ["1.0"]}], "ErrMsg": ""} for r in requests
+                ]}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--mnemonics", type=int, default=10)
+    parser.add_argument("--periods", type=int, default=10)
+    parser.add_argument("--base-ms", type=float, default=300)
+    parser.add_argument("--per-request-ms", type=float, default=1)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    os.environ["CAPIQ_TOKEN_CACHE"] = "0"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.base_ms / 1000, args.per_request_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    tickers = [f"T{i}" for i in range(args.tickers)]
+    mnemonics = [f"IQ_M{i}" for i in range(args.mnemonics)]
+    periods = [f"IQ_FY+{i}" for i in range(1, args.periods + 1)]
+
+    total = len(tickers) * len(mnemonics) * len(periods)
+    print(f"{total} requests, {args.base_ms:.0f} ms + {args.per_request_ms:g} ms/request per call")
+    print(f"{'in-flight':>9}  {'calls':>5}  {'seconds':>7}  {'speedup':>7}")
+    baseline = None
+    for in_flight in args.in_flight:
+        provider = CapIQProvider("bench", "bench", auth_base_url=url, data_base_url=f"{url}/gds",
+                                 max_in_flight=in_flight)
+        start = time.perf_counter()
+        points = provider.bulk_query(tickers, mnemonics, periods=periods)
+        elapsed = time.perf_counter() - start
+        assert len(points) == total
+        baseline = baseline or elapsed
+        print(f"{in_flight:>9}  {provider.stats['gds_calls']:>5}  {elapsed:>7.2f}  {baseline / elapsed:>6.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
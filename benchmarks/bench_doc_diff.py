@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mf-doc-diff on a year-over-year pair of synthetic 10-Ks, and its
+patience alignment vs difflib.SequenceMatcher on the same paragraph hashes.
+
+USAGE:
+  python benchmarks/bench_doc_diff.py [--mb 1] [--change 0.01]
+
+"unique" gives every paragraph distinct text, like a real filing;
+"repetitive" keeps synthetic_10k's repeated paragraphs, the worst case for
+longest-match alignment (difflib grows quadratically there; keep --mb small).
+"""
+import argparse
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_10k
+from src.util.doc_diff import align, diff_documents, paragraph_hash, render_changes, split_paragraphs
+from src.util.filings_processor import html_to_text
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def next_year(lines, change, rng):
+    """Drop, edit and insert about `change` of the lines each."""
+    out = []
+    for line in lines:
+        r = rng.random()
+        if r < change:
+            continue
+        if r < 2 * change:
+            line += " The impact increased compared to the prior year."
+        out.append(line)
+        if r > 1 - change:
+            out.append(f"We face new risks from export controls affecting shipments ({rng.random():.6f}).")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=1)
+    parser.add_argument("--change", type=float, default=0.01)
+    args = parser.parse_args()
+
+    base = [line for line in html_to_text(synthetic_10k(args.mb)).split("\n") if line.strip()]
+    print(f"{'text':<10}  {'paragraphs':>10}  {'diff ms':>7}  {'align ms':>8}  {'difflib ms':>10}  {'changes KB':>10}")
+    for name, lines in (
+        ("unique", [f"{line} (ref {i})" for i, line in enumerate(base)]),
+        ("repetitive", base),
+    ):
+        old = "\n".join(lines)
+        new = "\n".join(next_year(lines, args.change, random.Random(1)))
+        diff, t_diff = timed(lambda: diff_documents(old, new))
+        hashes_a = [paragraph_hash(p) for p in split_paragraphs(old)]
+        hashes_b = [paragraph_hash(p) for p in split_paragraphs(new)]
+        _, t_align = timed(lambda: align(hashes_a, hashes_b))
+        _, t_difflib = timed(lambda: SequenceMatcher(None, hashes_a, hashes_b, autojunk=False).get_opcodes())
+        print(f"{name:<10}  {len(hashes_a):>10}  {t_diff * 1000:>7.0f}  {t_align * 1000:>8.0f}  "
+              f"{t_difflib * 1000:>10.0f}  {len(render_changes(diff)) / 1024:>10.0f}")
+    print(f"input per document: {len(old) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: repeated keyword/regex searches against one filing, re-tokenizing
+per call (previous behaviour) vs the persisted word-offset index.
+
+USAGE:
+  python benchmarks/bench_filing_search.py [--mb 5] [--searches 5]
+
+"split" rebuilds text.split() and a prefix-sum list on every search, as
+extract_keyword_context did before. "index" builds clean.words.idx once and
+memory-maps it for every later search, as SecProvider does.
+"""
+import argparse
+import re
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_html
+from src.util.filing_index import WordIndex
+from src.util.filings_processor import extract_keyword_context, html_to_text
+
+PHRASES = [["revenue"], ["risk factors"], ["net sales"], ["operating income"], ["liquidity"]]
+
+
+def split_search(text: str, phrases, window: int = 200) -> int:
+    words = text.split()
+    prefix_sum = [0]
+    running = 0
+    for w in words:
+        running += len(w) + 1
+        prefix_sum.append(running)
+    hits = 0
+    for phrase in phrases:
+        for match in re.finditer(re.escape(phrase), text, re.IGNORECASE):
+            idx = bisect_right(prefix_sum, match.start()) - 1
+            " ".join(words[max(idx - window, 0):idx + window + 1])
+            hits += 1
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=5)
+    parser.add_argument("--searches", type=int, default=5)
+    args = parser.parse_args()
+
+    text = html_to_text(synthetic_html(args.mb))
+    runs = [PHRASES[i % len(PHRASES)] for i in range(args.searches)]
+    with tempfile.TemporaryDirectory() as tmp:
+        clean = Path(tmp) / "clean.txt"
+        clean.write_text(text, encoding="utf-8")
+
+        start = time.perf_counter()
+        for phrases in runs:
+            split_search(clean.read_text(encoding="utf-8"), phrases)
+        t_split = time.perf_counter() - start
+
+        start = time.perf_counter()
+        WordIndex.for_file(clean)
+        t_build = time.perf_counter() - start
+        for phrases in runs:
+            body = clean.read_text(encoding="utf-8")
+            extract_keyword_context(body, phrases, 200, 200, index=WordIndex.for_file(clean, body))
+        t_index = time.perf_counter() - start
+
+    print(f"text {len(text) / 1e6:.1f}M chars, {args.searches} searches")
+    print(f"  split  {t_split * 1000:>7.0f} ms")
+    print(f"  index  {t_index * 1000:>7.0f} ms  (build {t_build * 1000:.0f} ms)  {t_split / t_index:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
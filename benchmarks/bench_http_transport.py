@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request latency of urlopen (new connection per call) vs the
+pooled keep-alive HttpTransport, against a local stand-in HTTPS server.
+
+USAGE:
+  python benchmarks/bench_http_transport.py [--requests 200] [--rtt-ms 0]
+
+--rtt-ms adds a simulated network round-trip per request and two per new
+connection (TCP + TLS handshake), approximating a remote API.
+"""
+import argparse
+import json
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.request import urlopen
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.providers.http import HttpTransport
+
+PAYLOAD = json.dumps([{"date": "2024-01-02", "close": 185.64}] * 50).encode()
+
+
+def make_handler(rtt: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(2 * rtt)  # connection establishment
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(rtt)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+    return Handler
+
+
+def start_server(rtt: float, workdir: Path) -> str:
+    cert, key = workdir / "cert.pem", workdir / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", str(key),
+         "-out", str(cert), "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(rtt))
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(cert, key)
+    server.socket = ctx.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://localhost:{server.server_address[1]}", cert
+
+
+def timed(fn, n: int) -> list:
+    samples = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base, cert = start_server(args.rtt_ms / 1000, Path(tmp))
+        ctx = ssl.create_default_context(cafile=str(cert))
+
+        def via_urlopen(i):
+            with urlopen(f"{base}/quote?i={i}", context=ctx) as resp:
+                json.loads(resp.read())
+
+        transport = HttpTransport(ssl_context=ctx)
+
+        def via_transport(i):
+            transport.get_json(f"{base}/quote?i={i}")
+
+        results = {
+            "urlopen": timed(via_urlopen, args.requests),
+            "pooled": timed(via_transport, args.requests),
+        }
+
+    print(f"{args.requests} requests, simulated rtt {args.rtt_ms} ms")
+    for name, samples in results.items():
+        print(
+            f"  {name:8s} mean {statistics.mean(samples):7.2f} ms   "
+            f"p50 {statistics.median(samples):7.2f} ms   "
+            f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.2f} ms"
+        )
+    speedup = statistics.mean(results["urlopen"]) / statistics.mean(results["pooled"])
+    print(f"  speedup  {speedup:.1f}x   (connections opened by pool: {transport.stats['connections_opened']})")
+
+
+if __name__ == "__main__":
+    main()
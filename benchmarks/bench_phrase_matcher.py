@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: finding many phrases in a filing, one regex scan per phrase
+(previous extract_keyword_context) vs a single PhraseMatcher pass.
+
+USAGE:
+  python benchmarks/bench_phrase_matcher.py [--mb 5] [--phrases 5 20 50]
+
+Also times extract_ai_content against the previous 11-way alternation
+searched sentence by sentence.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_html
+from src.util.filings_processor import (
+    PhraseMatcher,
+    extract_ai_content,
+    extract_matches_with_context,
+    html_to_text,
+)
+
+VOCABULARY = [
+    "net sales", "operating income", "gross margin", "risk factors", "liquidity",
+    "capital resources", "share repurchase", "foreign currency", "interest rate",
+    "income taxes", "deferred revenue", "supply chain", "research and development",
+    "intellectual property", "cybersecurity", "competition", "litigation",
+    "goodwill", "inventory", "dividends", "segment", "americas", "europe",
+    "greater china", "japan", "services", "wearables", "iphone", "mac", "ipad",
+]
+
+AI_PATTERN = (
+    r"artificial intelligence|machine learning|\bai\b|neural network|deep learning|generative ai|"
+    r"\bllm\b|large language model|computer vision|natural language processing|\bnlp\b"
+)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def per_phrase(text, phrases):
+    return sorted(m.start() for p in phrases for m in re.finditer(re.escape(p), text, re.IGNORECASE))
+
+
+def one_pass(text, phrases):
+    return [start for start, _, _ in PhraseMatcher(phrases).finditer(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=5)
+    parser.add_argument("--phrases", type=int, nargs="+", default=[5, 20, 50])
+    args = parser.parse_args()
+
+    text = html_to_text(synthetic_html(args.mb))
+    print(f"text {len(text) / 1e6:.1f}M chars")
+    print(f"{'phrases':>7}  {'per-phrase ms':>13}  {'matcher ms':>10}  {'speedup':>7}")
+    for count in args.phrases:
+        phrases = [VOCABULARY[i % len(VOCABULARY)] + ("" if i < len(VOCABULARY) else f" {i}")
+                   for i in range(count)]
+        _, t_old = timed(lambda: per_phrase(text, phrases))
+        _, t_new = timed(lambda: one_pass(text, phrases))
+        print(f"{count:>7}  {t_old * 1000:>13.0f}  {t_new * 1000:>10.0f}  {t_old / t_new:>6.1f}x")
+
+    old, t_old = timed(lambda: extract_matches_with_context(text, AI_PATTERN))
+    new, t_new = timed(lambda: extract_ai_content(text))
+    print(f"ai_content  alternation {t_old * 1000:.0f} ms  matcher {t_new * 1000:.0f} ms  "
+          f"({len(old)} sentences)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mf-qa map phase, sequential (previous loop) vs QAPipeline with a
+concurrency limit, against a local stand-in Messages API.
+
+USAGE:
+  python benchmarks/bench_qa_pipeline.py [--chunks 40] [--latency-ms 800] [--concurrency 1 4 8]
+
+--latency-ms is the simulated generation time of one call.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import anthropic
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.util.qa_pipeline import QAPipeline
+
+
+def make_handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            body = json.dumps({
+                "id": "msg_bench", "type": "message", "role": "assistant", "model": request["model"],
+                "content": [{"type": "text", "text": "partial answer " * 50}],
+                "stop_reason": "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": 4000, "output_tokens": 200},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = anthropic.Anthropic(api_key="bench", base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                                 max_retries=0)
+    chunks = ["chunk text " * 1500] * args.chunks
+
+    print(f"{args.chunks} chunks, {args.latency_ms:.0f} ms per call")
+    print(f"{'concurrency':>11}  {'map + reduce s':>14}  {'speedup':>7}")
+    baseline = None
+    for concurrency in args.concurrency:
+        pipeline = QAPipeline(client, "claude-bench", "system", "Summarize.", concurrency=concurrency)
+        start = time.perf_counter()
+        pipeline.run(chunks)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{concurrency:>11}  {elapsed:>14.2f}  {baseline / elapsed:>6.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: output size and time of search_keywords (every merged ±N-word
+window) vs search_ranked (top BM25 passages under a budget).
+
+USAGE:
+  python benchmarks/bench_ranked_passages.py [--mb 5] [--max-tokens 3000]
+
+The output size is what mf-qa would be sent; tokens are estimated at
+TOKENS_PER_WORD.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_html
+from src.util.filing_index import WordIndex
+from src.util.filings_processor import (
+    TOKENS_PER_WORD,
+    extract_keyword_context,
+    html_to_text,
+    rank_passages,
+)
+
+QUERIES = [["net sales"], ["services", "ipad"], ["cost of sales", "2024"]]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=5)
+    parser.add_argument("--max-tokens", type=int, default=3000)
+    args = parser.parse_args()
+
+    text = html_to_text(synthetic_html(args.mb))
+    index = WordIndex.build(text)
+    print(f"text {len(text) / 1e6:.1f}M chars, {len(index)} words")
+    print(f"{'query':<40}  {'windows tok':>11}  {'ranked tok':>10}  {'windows ms':>10}  {'ranked ms':>9}")
+    for phrases in QUERIES:
+        merged, t_old = timed(lambda: extract_keyword_context(text, phrases, index=index))
+        ranked, t_new = timed(lambda: rank_passages(text, phrases, max_tokens=args.max_tokens, index=index))
+        old_tokens = len(merged.split()) * TOKENS_PER_WORD
+        new_tokens = sum(p["end_word"] - p["start_word"] for p in ranked) * TOKENS_PER_WORD
+        print(f"{', '.join(phrases):<40}  {old_tokens:>11.0f}  {new_tokens:>10.0f}  "
+              f"{t_old * 1000:>10.0f}  {t_new * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
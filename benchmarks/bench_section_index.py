@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: extracting the four Item sections of a 10-K, one lazy DOTALL
+regex per section (previous behaviour) vs the persisted heading index.
+
+USAGE:
+  python benchmarks/bench_section_index.py [--sizes 2 10]
+
+"first" builds clean.sections.json and slices; "again" loads the sidecar
+and slices, as every later SecProvider.extract_sections call does.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_10k
+from src.util.filing_sections import SectionIndex
+from src.util.filings_processor import (
+    extract_business,
+    extract_financial_statements,
+    extract_mda,
+    extract_risk_factors,
+    extract_section,
+    html_to_text,
+)
+
+LEGACY_PATTERNS = [
+    r"(?i)Item[^\n]*7\.[^\n]*Management\'s\s*Discussion.*?(?=Item[^\n]*7A|Item[^\n]*8)",
+    r"(?i)Item[^\n]*1\.[^\n]*Business.*?(?=Item[^\n]*1A|Item[^\n]*2)",
+    r"(?i)Item[^\n]*1A\.[^\n]*Risk\s*Factors.*?(?=Item[^\n]*1B|Item[^\n]*2)",
+    r"(?is)Item\s*8\.\s*Financial\s*Statements[\s\S]*?(?=\s*Item\s*9|\s*Item\s*7)",
+]
+EXTRACTORS = [extract_mda, extract_business, extract_risk_factors, extract_financial_statements]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[2, 10])
+    args = parser.parse_args()
+
+    print(f"{'size':>6}  {'regex ms':>9}  {'first ms':>9}  {'again ms':>9}")
+    for size in args.sizes:
+        text = html_to_text(synthetic_10k(size))
+        with tempfile.TemporaryDirectory() as tmp:
+            clean = Path(tmp) / "clean.txt"
+            clean.write_text(text, encoding="utf-8")
+
+            def indexed():
+                index = SectionIndex.for_file(clean, text)
+                for extract in EXTRACTORS:
+                    extract(text, sections=index)
+
+            t_regex = timed(lambda: [extract_section(text, p) for p in LEGACY_PATTERNS])
+            t_first = timed(indexed)
+            t_again = timed(indexed)
+        print(f"{size:>5}M  {t_regex * 1000:>9.0f}  {t_first * 1000:>9.0f}  {t_again * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AI and R&D content extraction, splitting the filing into
+sentence strings and searching each (previous behaviour) vs one search of
+the full text placed into sentences through the sentence offset index.
+
+USAGE:
+  python benchmarks/bench_sentence_index.py [--sizes 2 10] [--hits 2000]
+
+`--hits` paragraphs are edited to mention AI and R&D so both paths have
+sentences to report. "first" builds clean.sentences.idx; "again" loads it.
+"""
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_10k
+from src.util.filing_index import SentenceIndex
+from src.util.filings_processor import (
+    extract_ai_content,
+    extract_rd_content,
+    get_sentence_context,
+    html_to_text,
+)
+
+AI_PATTERN = (
+    r"artificial intelligence|machine learning|\bai\b|neural network|deep learning|generative ai|"
+    r"\bllm\b|large language model|computer vision|natural language processing|\bnlp\b"
+)
+RD_PATTERN = r"(?:Research\s+(?:&|and)\s+Development|R&D)"
+LEGACY_BREAK = r"(?<!Mr)(?<!Mrs)(?<!Ms)(?<!Dr)(?<!\bU\.S)(?<!\bInc)(?<!\bCorp)(?<!\bLtd)\.\s+"
+
+
+def per_sentence(text):
+    sentences = [s.strip() for s in re.sub(LEGACY_BREAK, ".<SPLIT>", text).split("<SPLIT>") if s.strip()]
+    found = 0
+    for pattern in (AI_PATTERN, RD_PATTERN):
+        for i, sentence in enumerate(sentences):
+            if re.search(f"(?i){pattern}", sentence):
+                get_sentence_context(sentences, i)
+                found += 1
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[2, 10])
+    parser.add_argument("--hits", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'size':>6}  {'split ms':>9}  {'first ms':>9}  {'again ms':>9}")
+    for size in args.sizes:
+        text = html_to_text(synthetic_10k(size)).replace(
+            "Services & iPad", "Services & AI research and development", args.hits
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            clean = Path(tmp) / "clean.txt"
+            clean.write_text(text, encoding="utf-8")
+
+            def indexed():
+                sentences = SentenceIndex.for_file(clean, text)
+                extract_ai_content(text, sentences)
+                extract_rd_content(text, sentences)
+
+            t_split = timed(lambda: per_sentence(text))
+            t_first = timed(indexed)
+            t_again = timed(indexed)
+        print(f"{size:>5}M  {t_split * 1000:>9.0f}  {t_first * 1000:>9.0f}  {t_again * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: splitting an EDGAR submission with the old whole-string regex
+approach vs the streaming SgmlSplitter, on synthetic submissions.
+
+USAGE:
+  python benchmarks/bench_sgml_split.py [--sizes 5 20 50] [--chunk-kb 64]
+
+Reports wall time and peak Python heap (tracemalloc) for each. The regex
+path needs the whole submission as one str; the streaming path only sees
+one chunk at a time.
+"""
+import argparse
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.synthetic_filing import synthetic_submission
+from src.providers.sec.sgml import split_submission
+
+
+def regex_split(data: bytes, chunk: int) -> int:
+    """Previous SecProvider path: read all, DOTALL regex + finditer per document."""
+    content = b"".join(data[i:i + chunk] for i in range(0, len(data), chunk)).decode("utf-8")
+    assert re.search(r"<DOCUMENT>.*?<TYPE>10-K.*?</DOCUMENT>", content, re.DOTALL)
+    count = 0
+    for match in re.finditer(r"<DOCUMENT>([\s\S]*?)</DOCUMENT>", content):
+        doc = match.group(1)
+        re.search(r"<TYPE>([^\n]+)", doc)
+        re.search(r"<SEQUENCE>([^\n]+)", doc)
+        re.search(r"<FILENAME>([^\n]+)", doc)
+        count += 1
+    return count
+
+
+def stream_split(data: bytes, chunk: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        chunks = (data[i:i + chunk] for i in range(0, len(data), chunk))
+        return len(split_submission(chunks, Path(tmp), raw=None))
+
+
+def measure(fn, data, chunk):
+    tracemalloc.start()
+    start = time.perf_counter()
+    docs = fn(data, chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return docs, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+    chunk = args.chunk_kb * 1024
+
+    print(f"{'size':>6}  {'regex ms':>9} {'peak MB':>8}  {'stream ms':>9} {'peak MB':>8}")
+    for size in args.sizes:
+        data = synthetic_submission(size)
+        r_docs, r_t, r_peak = measure(regex_split, data, chunk)
+        s_docs, s_t, s_peak = measure(stream_split, data, chunk)
+        assert r_docs == s_docs, (r_docs, s_docs)
+        print(f"{size:>5}M  {r_t * 1000:>9.0f} {r_peak / 2**20:>8.1f}  {s_t * 1000:>9.0f} {s_peak / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Synthetic 10-K style HTML and EDGAR submissions for benchmarks."""
+
+_PARAGRAPH = (
+    '<p style="font-family:Times New Roman;font-size:10pt">'
+    "The Company&#8217;s net sales increased 2% or $7.8&#160;billion during 2024 "
+    "compared to 2023 &#8212; driven by higher net sales of Services &amp; iPad.</p>\n"
+)
+_TABLE = (
+    "<table><tr><td><span>Net sales</span></td><td>$</td><td>391,035</td></tr>\n"
+    "<tr><td>&#8226; Cost of sales</td><td>$</td><td>210,352</td></tr></table>\n"
+)
+_ITEM = '<div><span style="font-weight:700">Item {n}. Section heading</span></div>\n'
+
+
+def synthetic_html(size_mb: float) -> str:
+    """Inline-XBRL-like 10-K body of roughly `size_mb` megabytes."""
+    target = int(size_mb * 1024 * 1024)
+    parts = ["<html><body>\n<div>UNITED STATES SECURITIES AND EXCHANGE COMMISSION</div>\n"]
+    size, n = 0, 0
+    while size < target:
+        block = (_ITEM.format(n=n % 16 + 1) if n % 50 == 0 else "") + (_TABLE if n % 7 == 0 else _PARAGRAPH)
+        parts.append(block)
+        size += len(block)
+        n += 1
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+_10K_ITEMS = [
+    ("I", "1", "Business"), ("I", "1A", "Risk Factors"), ("I", "1B", "Unresolved Staff Comments"),
+    ("I", "1C", "Cybersecurity"), ("I", "2", "Properties"), ("I", "3", "Legal Proceedings"),
+    ("I", "4", "Mine Safety Disclosures"),
+    ("II", "5", "Market for Registrant&#8217;s Common Equity"), ("II", "6", "[Reserved]"),
+    ("II", "7", "Management&#8217;s Discussion and Analysis of Financial Condition and Results of Operations"),
+    ("II", "7A", "Quantitative and Qualitative Disclosures About Market Risk"),
+    ("II", "8", "Financial Statements and Supplementary Data"),
+    ("II", "9", "Changes in and Disagreements with Accountants"), ("II", "9A", "Controls and Procedures"),
+    ("III", "10", "Directors, Executive Officers and Corporate Governance"),
+    ("IV", "15", "Exhibit and Financial Statement Schedules"),
+]
+# Share of the body given to each item; the rest get a paragraph or two
+_10K_WEIGHTS = {"1": 0.1, "1A": 0.2, "7": 0.25, "8": 0.3}
+
+
+def synthetic_10k(size_mb: float) -> str:
+    """10-K HTML with a table of contents and the real Item headings, roughly `size_mb` MB."""
+    target = int(size_mb * 1024 * 1024)
+    parts = ["<html><body>\n<div>UNITED STATES SECURITIES AND EXCHANGE COMMISSION</div>\n<table>"]
+    parts += [f"<tr><td>Item {n}.</td><td>{title}</td><td>{i + 1}</td></tr>\n"
+              for i, (_, n, title) in enumerate(_10K_ITEMS)]
+    parts.append("</table>\n")
+    part = None
+    for part_label, n, title in _10K_ITEMS:
+        if part_label != part:
+            parts.append(f"<div>PART {part_label}</div>\n")
+            part = part_label
+        parts.append(f'<div><span style="font-weight:700">Item {n}.&#160;&#160;&#160;&#160;{title}</span></div>\n')
+        size = int(target * _10K_WEIGHTS.get(n, 0.001))
+        parts.append(((_PARAGRAPH * 6 + _TABLE) * (size // (len(_PARAGRAPH) * 6 + len(_TABLE)) + 1)))
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+def synthetic_submission(size_mb: float, exhibits: int = 20) -> bytes:
+    """EDGAR `<accession>.txt` with a 10-K primary document plus exhibits."""
+    primary = synthetic_html(size_mb * 0.6)
+    exhibit = synthetic_html(size_mb * 0.4 / max(exhibits, 1))
+    docs = [("10-K", 1, "form10k.htm", primary)]
+    docs += [(f"EX-{10 + i}.1", i + 2, f"ex{10 + i}1.htm", exhibit) for i in range(exhibits)]
+    out = ["<SEC-DOCUMENT>0000000000-24-000001.txt : 20241101\n<SEC-HEADER>\nACCESSION NUMBER: 0000000000-24-000001\n</SEC-HEADER>\n"]
+    for doc_type, seq, name, body in docs:
+        out.append(f"<DOCUMENT>\n<TYPE>{doc_type}\n<SEQUENCE>{seq}\n<FILENAME>{name}\n<TEXT>\n{body}</TEXT>\n</DOCUMENT>\n")
+    out.append("</SEC-DOCUMENT>\n")
+    return "".join(out).encode("utf-8")
@@ -0,0 +1,160 @@
+"""Read-through response cache for DataHub with per-endpoint freshness policies."""
+from __future__ import annotations
+import os
+import time
+import inspect
+import functools
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+from pydantic import BaseModel
+
+from src.util.disk_cache import DiskCache, cache_key
+from src.util.workspace import workspace_cache_dir
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Typical lag between a quarter closing and its 10-Q/10-K being filed
+EARNINGS_REPORT_LAG_DAYS = 45
+
+
+def until_next_earnings(value: Any) -> float:
+    """
+    Expiry for quarterly fundamentals: the expected release of the next quarter.
+
+    Next report ~= latest period_end + one quarter + reporting lag. If that
+    date has already passed (late filer), re-check daily.
+    """
+    quarters = getattr(value, "quarters", None) or []
+    if not quarters:
+        return time.time() + DAY
+    last = datetime.strptime(str(quarters[-1].period_end), "%Y-%m-%d")
+    expected = last + timedelta(days=91 + EARNINGS_REPORT_LAG_DAYS)
+    return max(expected.timestamp(), time.time() + DAY)
+
+
+# Freshness per DataHub endpoint: seconds, or callable(value) -> absolute expiry epoch
+TTL_POLICIES: Dict[str, Union[float, Callable[[Any], float]]] = {
+    "quote": MINUTE,
+    "market_cap": 5 * MINUTE,
+    "stock_screener": HOUR,
+    "sec_filings_list": 6 * HOUR,
+    "analyst_estimates": 12 * HOUR,
+    "analyst_recommendations": 12 * HOUR,
+    "upgrades_downgrades": 12 * HOUR,
+    "price_target": 12 * HOUR,
+    "earnings_surprises": DAY,
+    "key_metrics": DAY,
+    "key_metrics_ttm": DAY,
+    "financial_ratios": DAY,
+    "enterprise_values": DAY,
+    "financial_growth": DAY,
+    "income_statement_growth": DAY,
+    "owner_earnings": DAY,
+    "institutional_ownership": DAY,
+    "insider_trading": DAY,
+    "dividends": DAY,
+    "stock_splits": DAY,
+    "company_profile": 7 * DAY,
+    "key_executives": 7 * DAY,
+    "stock_peers": 7 * DAY,
+    "revenue_segments_by_product": 7 * DAY,
+    "revenue_segments_by_geography": 7 * DAY,
+    "esg_ratings": 7 * DAY,
+    "executive_compensation": 7 * DAY,
+    "fundamentals_quarterly": until_next_earnings,
+}
+
+
+def _normalize(name: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value.upper() if name == "ticker" else value
+    return value
+
+
+class ResponseCache:
+    """
+    Endpoint-aware wrapper around DiskCache.
+
+    Keys are endpoint + normalized call params; pydantic results are stored
+    as JSON and re-validated on the way out. Tracks hits/misses per endpoint.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.store = DiskCache(Path(root), max_bytes=max_bytes)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Workspace cache (WORKSPACE_ABS_PATH/.cache/datahub); DATAHUB_CACHE=0 disables."""
+        root = workspace_cache_dir("datahub", "DATAHUB_CACHE")
+        if root is None:
+            return None
+        max_mb = int(os.getenv("DATAHUB_CACHE_MAX_MB", "256"))
+        return cls(root, max_bytes=max_mb * 1024 * 1024)
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            counts = self.stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def summary(self) -> Dict[str, int]:
+        """Total hits/misses across endpoints (for tool metrics)."""
+        with self._lock:
+            return {
+                "hits": sum(c["hits"] for c in self.stats.values()),
+                "misses": sum(c["misses"] for c in self.stats.values()),
+            }
+
+    def fetch(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        loader: Callable[[], Any],
+        model: Optional[Type[BaseModel]] = None,
+    ) -> Any:
+        """Return a fresh cached response or call `loader` and store its result."""
+        normalized = {k: _normalize(k, v) for k, v in sorted(params.items())}
+        key = cache_key(endpoint, normalized)
+
+        missing = object()
+        cached = self.store.get(key, missing)
+        if cached is not missing:
+            self._count(endpoint, "hits")
+            return model.model_validate(cached) if model else cached
+
+        self._count(endpoint, "misses")
+        value = loader()
+
+        policy = TTL_POLICIES.get(endpoint, HOUR)
+        expires_at = policy(value) if callable(policy) else time.time() + policy
+        payload = value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+        self.store.set(key, payload, expires_at=expires_at, meta={"endpoint": endpoint, "params": normalized})
+        return value
+
+
+def cached_endpoint(endpoint: str, model: Optional[Type[BaseModel]] = None):
+    """Decorate a DataHub method so calls go through `self.cache` when enabled."""
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ResponseCache] = getattr(self, "cache", None)
+            if cache is None:
+                return fn(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k != "self"}
+            return cache.fetch(endpoint, params, lambda: fn(self, *args, **kwargs), model=model)
+
+        return wrapper
+
+    return decorator
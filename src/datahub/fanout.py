@@ -0,0 +1,77 @@
+"""Concurrent fan-out for independent data fetches (one task per requested field)."""
+from __future__ import annotations
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from src.util.permits import holding
+
+# Max in-flight requests per provider; keeps a wide fan-out under API rate limits
+DEFAULT_PROVIDER_LIMITS: Dict[str, int] = {"FMP": 6, "SEC": 2, "CapIQ": 2}
+
+
+@dataclass
+class FieldTask:
+    """A single independent fetch, tagged with the provider it hits."""
+
+    field: str
+    provider: str
+    fetch: Callable[[], Any]
+
+
+@dataclass
+class FieldResult:
+    """Outcome of a FieldTask: value or error, plus its own wall time."""
+
+    field: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    t_ms: int = 0
+
+
+def run_field_tasks(
+    tasks: List[FieldTask],
+    max_workers: Optional[int] = None,
+    provider_limits: Optional[Mapping[str, int]] = None,
+) -> Dict[str, FieldResult]:
+    """
+    Run tasks concurrently on a bounded worker pool.
+
+    Args:
+        tasks: Independent fetches to run
+        max_workers: Worker pool size (env FANOUT_MAX_WORKERS, default 8)
+        provider_limits: Per-provider concurrency caps (defaults to DEFAULT_PROVIDER_LIMITS)
+
+    Returns:
+        Dict of field -> FieldResult, in the same order as `tasks`.
+        Errors are captured per field, never raised here.
+    """
+    if not tasks:
+        return {}
+
+    workers = max_workers or int(os.getenv("FANOUT_MAX_WORKERS", "8"))
+    limits = dict(DEFAULT_PROVIDER_LIMITS)
+    limits.update(provider_limits or {})
+    gates = {
+        task.provider: threading.BoundedSemaphore(max(1, limits.get(task.provider, workers)))
+        for task in tasks
+    }
+
+    def run(task: FieldTask) -> FieldResult:
+        # Fetches that fan out further (util.permits.map_within_limit) draw on the same gate
+        with gates[task.provider], holding(task.provider, gates[task.provider]):
+            start = time.perf_counter()
+            try:
+                value = task.fetch()
+                error = None
+            except Exception as e:  # surfaced to caller via FieldResult.error
+                value, error = None, e
+            t_ms = int((time.perf_counter() - start) * 1000)
+        return FieldResult(field=task.field, value=value, error=error, t_ms=t_ms)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [(task.field, pool.submit(run, task)) for task in tasks]
+        return {field: future.result() for field, future in futures}
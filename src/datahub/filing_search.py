@@ -0,0 +1,251 @@
+"""Workspace-wide full-text index over downloaded filings (SQLite FTS5)."""
+from __future__ import annotations
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.util.workspace import workspace_cache_dir, workspace_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    filing_path TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    form TEXT NOT NULL,
+    filing_date TEXT NOT NULL,
+    accession TEXT NOT NULL,
+    cik TEXT,
+    kind TEXT NOT NULL,
+    section TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_filter ON docs (ticker, form, filing_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    body, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+# Ranked candidates fetched per requested hit when collapsing to one hit per
+# filing (a filing is clean.txt plus up to a handful of section files)
+_PER_FILING_FANOUT = 8
+_SNIPPET_TOKENS = 32
+
+
+def _normalize_form(form: str) -> str:
+    form = form.upper().replace("-", "")
+    return form[:2] + "-" + form[2:] if len(form) > 2 else form
+
+
+class FilingSearchIndex:
+    """
+    Full-text index of every filing under `data/sec/`, kept in one SQLite file.
+
+    Each complete filing directory (one with metadata.json) contributes its
+    clean.txt (kind "filing") and any extracted `sections/<name>.txt` (kind
+    "section"). `ingest()` is incremental: only files whose size or mtime
+    changed since the last run are re-tokenized, and files that vanished are
+    dropped. Queries use FTS5 syntax: phrases ("export controls"), boolean
+    operators (AND / OR / NOT), prefixes (semicond*) and proximity
+    (NEAR(export china, 10)), ranked by BM25.
+
+    Args:
+        db_path: SQLite database location
+        root: Directory holding `<TICKER>/<DATE>/<form>/` filing folders
+    """
+
+    def __init__(self, db_path: Path, root: Path):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+
+    @classmethod
+    def from_env(cls) -> "FilingSearchIndex":
+        """Index of WORKSPACE_ABS_PATH/data/sec stored under WORKSPACE_ABS_PATH/.cache/search."""
+        return cls(workspace_cache_dir("search") / "filings.db", workspace_dir() / "data" / "sec")
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # ---- Ingest ----
+
+    def _documents(self) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """(path, row fields) for every indexable file of every complete filing."""
+        for meta_path in sorted(self.root.glob("*/*/*/metadata.json")):
+            try:
+                metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            filing_dir = meta_path.parent
+            filing = {
+                "filing_path": str(filing_dir / "clean.txt"),
+                "ticker": metadata["ticker"].upper(),
+                "form": metadata["form"],
+                "filing_date": metadata["filing_date"],
+                "accession": metadata["accession"],
+                "cik": metadata.get("cik"),
+            }
+            files = [(filing_dir / "clean.txt", "filing", None)]
+            files += [(p, "section", p.stem) for p in sorted(filing_dir.glob("sections/*.txt"))]
+            for path, kind, section in files:
+                if path.exists():
+                    yield path, dict(filing, kind=kind, section=section)
+
+    def ingest(self) -> Dict[str, int]:
+        """
+        Bring the index in line with the files on disk.
+
+        Returns:
+            Counts: added, updated, removed, documents (total indexed)
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        conn = self._connect()
+        try:
+            # Take the write lock up front so concurrent ingests don't race
+            conn.execute("BEGIN IMMEDIATE")
+            known = {
+                row["path"]: (row["id"], row["size"], row["mtime_ns"])
+                for row in conn.execute("SELECT id, path, size, mtime_ns FROM docs")
+            }
+            for path, fields in self._documents():
+                stat = path.stat()
+                previous = known.pop(str(path), None)
+                if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if previous:
+                    self._delete(conn, previous[0])
+                cursor = conn.execute(
+                    "INSERT INTO docs (path, filing_path, ticker, form, filing_date, accession, cik,"
+                    " kind, section, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (str(path), fields["filing_path"], fields["ticker"], fields["form"],
+                     fields["filing_date"], fields["accession"], fields["cik"], fields["kind"],
+                     fields["section"], stat.st_size, stat.st_mtime_ns),
+                )
+                conn.execute(
+                    "INSERT INTO docs_fts (rowid, body) VALUES (?, ?)",
+                    (cursor.lastrowid, path.read_text(encoding="utf-8", errors="replace")),
+                )
+                counts["updated" if previous else "added"] += 1
+            for doc_id, _, _ in known.values():
+                self._delete(conn, doc_id)
+                counts["removed"] += 1
+            conn.execute("COMMIT")
+            counts["documents"] = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return counts
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, doc_id: int) -> None:
+        conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+
+    # ---- Query ----
+
+    def search(
+        self,
+        query: str,
+        tickers: Optional[Sequence[str]] = None,
+        forms: Optional[Sequence[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        kinds: Optional[Sequence[str]] = None,
+        limit: int = 20,
+        per_filing: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for an FTS5 `query` across all indexed filings.
+
+        Args:
+            query: FTS5 query (phrases, AND/OR/NOT, prefix*, NEAR(...))
+            tickers: Only these tickers
+            forms: Only these forms (10-K, 10Q, ...)
+            date_from: Earliest filing date (YYYY-MM-DD, inclusive)
+            date_to: Latest filing date (YYYY-MM-DD, inclusive)
+            kinds: "filing" (clean.txt) and/or "section" (extracted sections)
+            limit: Maximum hits returned
+            per_filing: Keep only the best hit per filing, listing where else it matched
+
+        Returns:
+            Hits, best first: ticker, form, filing_date, accession, kind, section,
+            path, filing_path, score (higher = more relevant), snippet, matched_in
+
+        Raises:
+            ValueError: If the query is not valid FTS5 syntax
+        """
+        where, params = ["docs_fts MATCH ?"], [query]
+        for column, values in (
+            ("ticker", [t.upper() for t in tickers or []]),
+            ("form", [_normalize_form(f) for f in forms or []]),
+            ("kind", list(kinds or [])),
+        ):
+            if values:
+                where.append(f"d.{column} IN ({', '.join('?' * len(values))})")
+                params += values
+        if date_from:
+            where.append("d.filing_date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("d.filing_date <= ?")
+            params.append(date_to)
+
+        fetch = limit * _PER_FILING_FANOUT if per_filing else limit
+        conn = self._connect()
+        try:
+            try:
+                rows = conn.execute(
+                    "SELECT d.*, bm25(docs_fts) AS rank FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid"
+                    f" WHERE {' AND '.join(where)} ORDER BY rank LIMIT ?",
+                    params + [fetch],
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query {query!r}: {e}") from e
+
+            hits: Dict[Any, Dict[str, Any]] = {}
+            for row in rows:
+                key = row["accession"] if per_filing else row["id"]
+                label = row["section"] or row["kind"]
+                if key in hits:
+                    hits[key]["matched_in"].append(label)
+                    continue
+                if len(hits) == limit:
+                    continue
+                hits[key] = {
+                    "id": row["id"],
+                    "ticker": row["ticker"],
+                    "form": row["form"],
+                    "filing_date": row["filing_date"],
+                    "accession": row["accession"],
+                    "kind": row["kind"],
+                    "section": row["section"],
+                    "path": row["path"],
+                    "filing_path": row["filing_path"],
+                    "score": round(-row["rank"], 3),
+                    "matched_in": [label],
+                }
+
+            # Snippets only for the hits actually returned
+            ids = [hit["id"] for hit in hits.values()]
+            snippets = dict(conn.execute(
+                f"SELECT rowid, snippet(docs_fts, 0, '[', ']', ' … ', {_SNIPPET_TOKENS}) FROM docs_fts"
+                f" WHERE docs_fts MATCH ? AND rowid IN ({', '.join('?' * len(ids))})",
+                [query] + ids,
+            ).fetchall()) if ids else {}
+        finally:
+            conn.close()
+
+        results = []
+        for hit in hits.values():
+            hit["snippet"] = snippets.get(hit.pop("id"), "")
+            results.append(hit)
+        return results
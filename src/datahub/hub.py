@@ -6,10 +6,14 @@ from decimal import Decimal
 from src.providers.fmp import FmpProvider
 from src.providers.sec import SecProvider
 from src.providers.capiq import CapIQProvider
+from .cache import ResponseCache, cached_endpoint
+from .prices import PriceStore
+from .filing_search import FilingSearchIndex
 from src.domain.models import (
     FundamentalsQuarterly,
     FilingRef,
     PriceSeries,
+    PriceColumns,
     Estimates,
     EstimatePoint,
     CompanyInfo,
@@ -25,10 +29,22 @@ class DataHub:
         fmp: Optional[FmpProvider] = None,
         sec: Optional[SecProvider] = None,
         capiq: Optional[CapIQProvider] = None,
+        cache: Optional[ResponseCache] = None,
+        prices: Optional[PriceStore] = None,
+        filing_search: Optional[FilingSearchIndex] = None,
     ):
-        """Initialize DataHub with provider instances or create defaults."""
+        """Initialize DataHub with provider instances or create defaults.
+
+        FMP responses are served from `cache` (default: workspace response cache,
+        see ResponseCache.from_env) while fresh under their endpoint's TTL.
+        Daily bars go through the incremental `prices` store (PriceStore.from_env).
+        Cross-filing search uses `filing_search` (FilingSearchIndex.from_env).
+        """
         self.fmp = fmp or FmpProvider()
         self.sec = sec or SecProvider()
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+        self.prices = prices if prices is not None else PriceStore.from_env()
+        self.filing_search = filing_search or FilingSearchIndex.from_env()
         
         # CapIQ is optional (requires credentials)
         try:
@@ -38,6 +54,7 @@ class DataHub:
 
     # ---- Fundamentals ----
 
+    @cached_endpoint("fundamentals_quarterly", model=FundamentalsQuarterly)
     def fundamentals_quarterly(
         self, ticker: str, limit: int = 8
     ) -> FundamentalsQuarterly:
@@ -61,6 +78,9 @@ class DataHub:
         """
         Fetch historical prices from FMP.
 
+        With the price store enabled only bars outside the already-stored
+        span are downloaded; the requested window is served from disk.
+
         Args:
             ticker: Stock ticker symbol
             from_date: Start date in YYYY-MM-DD format (optional)
@@ -69,26 +89,50 @@ class DataHub:
         Returns:
             PriceSeries domain object with validated price data
         """
-        return self.fmp.get_historical_prices(ticker, from_date=from_date, to_date=to_date)
+        if self.prices is None:
+            return self.fmp.get_historical_prices(ticker, from_date=from_date, to_date=to_date)
+        return self.prices.series(ticker, from_date, to_date, self.fmp.get_historical_prices)
+
+    def price_columns(
+        self, ticker: str, from_date: Optional[str] = None, to_date: Optional[str] = None
+    ) -> PriceColumns:
+        """
+        Historical prices as array-backed columns (no per-row models).
+
+        Args:
+            ticker: Stock ticker symbol
+            from_date: Start date in YYYY-MM-DD format (optional)
+            to_date: End date in YYYY-MM-DD format (optional)
+
+        Returns:
+            PriceColumns, oldest bar first
+        """
+        if self.prices is None:
+            series = self.fmp.get_historical_prices(ticker, from_date=from_date, to_date=to_date)
+            return PriceColumns.from_series(series)
+        return self.prices.columns(ticker, from_date, to_date, self.fmp.get_historical_prices)
 
     # ---- SEC Filings ----
 
     def latest_filing(
-        self, ticker: str, form_type: str = "10-K", exhibit_limit: int = 25
+        self, ticker: str, form_type: str = "10-K", exhibit_limit: int = 25, refresh: bool = True
     ) -> FilingRef:
         """
         Fetch latest SEC filing for a ticker.
 
+        An accession already on disk is never downloaded again.
+
         Args:
             ticker: Stock ticker symbol
             form_type: Filing type (10-K, 10-Q, 8-K, 20-F, 40-F)
             exhibit_limit: Maximum number of exhibits to extract
+            refresh: Ask EDGAR for the latest accession (False = newest local copy if any)
 
         Returns:
             FilingRef domain object with paths to downloaded files
         """
         return self.sec.get_latest_filing(
-            ticker, form_type=form_type, exhibit_limit=exhibit_limit
+            ticker, form_type=form_type, exhibit_limit=exhibit_limit, refresh=refresh
         )
 
     def extract_filing_sections(
@@ -161,6 +205,75 @@ class DataHub:
             snippet_min_words=snippet_min_words,
         )
 
+    def search_filing_ranked(
+        self,
+        filing_ref: FilingRef,
+        keywords: List[str],
+        passage_words: int = 200,
+        max_words: int = 2000,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Top BM25-ranked passages of a filing for keyword phrases, within a budget.
+
+        Unlike search_filing_keywords, which returns every merged window,
+        only the best non-overlapping passages are kept, so the output size
+        is bounded by the budget rather than by how common the terms are.
+
+        Args:
+            filing_ref: FilingRef from latest_filing()
+            keywords: Query phrases (whole words, case-insensitive)
+            passage_words: Words per passage
+            max_words: Word budget across all passages
+            max_tokens: Token budget (the tighter of the two applies)
+            top_k: Maximum number of passages
+
+        Returns:
+            Dict with passages (document order; rank, score, start_word,
+            end_word, hits, text) and filing_words
+        """
+        return self.sec.search_ranked(
+            filing_ref,
+            keywords,
+            passage_words=passage_words,
+            max_words=max_words,
+            max_tokens=max_tokens,
+            top_k=top_k,
+        )
+
+    def search_filings(
+        self,
+        query: str,
+        tickers: Optional[List[str]] = None,
+        forms: Optional[List[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        limit: int = 20,
+        refresh_index: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Full-text search across every downloaded filing and extracted section.
+
+        Args:
+            query: FTS5 query, e.g. '"export controls" AND china' or 'NEAR(tariff margin, 10)'
+            tickers: Restrict to these tickers
+            forms: Restrict to these forms (10-K, 10-Q, ...)
+            date_from: Earliest filing date (YYYY-MM-DD)
+            date_to: Latest filing date (YYYY-MM-DD)
+            limit: Maximum filings returned (best hit per filing)
+            refresh_index: Ingest new/changed filings before searching
+
+        Returns:
+            Dict with hits (ticker, form, filing_date, accession, filing_path,
+            score, snippet, matched_in) and indexed (ingest counts)
+        """
+        indexed = self.filing_search.ingest() if refresh_index else {}
+        hits = self.filing_search.search(
+            query, tickers=tickers, forms=forms, date_from=date_from, date_to=date_to, limit=limit
+        )
+        return {"hits": hits, "indexed": indexed}
+
     # ---- CapIQ Estimates ----
 
     def estimates(
@@ -184,19 +297,59 @@ class DataHub:
         Returns:
             Estimates domain object with analyst consensus estimates
         """
+        return self.estimates_batch(
+            [ticker], [estimate_type], years_future, years_past, currency
+        )[ticker][estimate_type]
+
+    def estimates_batch(
+        self,
+        tickers: List[str],
+        estimate_types: List[str],
+        years_future: int = 5,
+        years_past: int = 0,
+        currency: str = "original",
+    ) -> Dict[str, Dict[str, Estimates]]:
+        """
+        Fetch analyst estimates for several tickers and metrics in one CapIQ bulk query.
+
+        Args:
+            tickers: Stock ticker symbols
+            estimate_types: Types (revenue, eps, ebitda, ebit, free_cash_flow, etc.)
+            years_future: Number of future years
+            years_past: Number of past years
+            currency: "original" or "usd"
+
+        Returns:
+            Estimates by ticker, then by estimate type (in request order);
+            tickers CapIQ has no data for get empty `points`
+        """
         if not self.capiq:
             raise ValueError(
                 "CapIQ provider not available. Set CIQ_LOGIN and CIQ_PASSWORD in .env"
             )
 
-        data_points = self.capiq.get_estimates(
-            identifiers=[ticker],
-            estimate_type=estimate_type,
+        by_ticker = self.capiq.get_estimates_batch(
+            identifiers=tickers,
+            estimate_types=estimate_types,
             years_future=years_future,
             years_past=years_past,
             currency=currency,
         )
 
+        return {
+            ticker: {
+                estimate_type: self._estimates_from_points(
+                    ticker, estimate_type, data_points, years_future, currency
+                )
+                for estimate_type, data_points in by_type.items()
+            }
+            for ticker, by_type in by_ticker.items()
+        }
+
+    @staticmethod
+    def _estimates_from_points(
+        ticker: str, estimate_type: str, data_points: list, years_future: int, currency: str
+    ) -> Estimates:
         # Group by period and mnemonic
         by_period: dict = {}
         for dp in data_points:
@@ -272,128 +425,155 @@ class DataHub:
 
     # ---- FMP Extended Methods (Raw JSON) ----
 
+    @cached_endpoint("company_profile")
     def company_profile(self, ticker: str) -> Dict[str, Any]:
         """Fetch company profile from FMP (returns raw JSON)."""
         return self.fmp.get_company_profile(ticker)
 
+    @cached_endpoint("key_executives")
     def key_executives(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch key executives from FMP (returns raw JSON)."""
         return self.fmp.get_key_executives(ticker)
 
+    @cached_endpoint("market_cap")
     def market_cap(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch current market capitalization from FMP (returns raw JSON)."""
         return self.fmp.get_market_capitalization(ticker)
 
+    @cached_endpoint("key_metrics")
     def key_metrics(
         self, ticker: str, period: str = "annual", limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fetch key financial metrics from FMP (P/E, ROE, etc) (returns raw JSON)."""
         return self.fmp.get_key_metrics(ticker, period=period, limit=limit)
 
+    @cached_endpoint("key_metrics_ttm")
     def key_metrics_ttm(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch trailing twelve month metrics from FMP (returns raw JSON)."""
         return self.fmp.get_key_metrics_ttm(ticker)
 
+    @cached_endpoint("financial_ratios")
     def financial_ratios(
         self, ticker: str, period: str = "annual", limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fetch financial ratios from FMP (liquidity, profitability, etc) (returns raw JSON)."""
         return self.fmp.get_financial_ratios(ticker, period=period, limit=limit)
 
+    @cached_endpoint("enterprise_values")
     def enterprise_values(
         self, ticker: str, period: str = "annual", limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fetch enterprise value data from FMP (returns raw JSON)."""
         return self.fmp.get_enterprise_values(ticker, period=period, limit=limit)
 
+    @cached_endpoint("financial_growth")
     def financial_growth(
         self, ticker: str, period: str = "annual", limit: int = 5
     ) -> List[Dict[str, Any]]:
         """Fetch financial growth metrics from FMP (revenue growth, net income growth) (returns raw JSON)."""
         return self.fmp.get_financial_growth(ticker, period=period, limit=limit)
 
+    @cached_endpoint("income_statement_growth")
     def income_statement_growth(
         self, ticker: str, period: str = "annual", limit: int = 5
     ) -> List[Dict[str, Any]]:
         """Fetch income statement growth rates from FMP (returns raw JSON)."""
         return self.fmp.get_income_statement_growth(ticker, period=period, limit=limit)
 
+    @cached_endpoint("owner_earnings")
     def owner_earnings(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch owner earnings (Buffett-style metric) from FMP (returns raw JSON)."""
         return self.fmp.get_owner_earnings(ticker)
 
+    @cached_endpoint("analyst_estimates")
     def analyst_estimates(
         self, ticker: str, period: str = "annual", limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fetch analyst estimates from FMP (revenue, EPS forecasts) (returns raw JSON)."""
         return self.fmp.get_analyst_estimates(ticker, period=period, limit=limit)
 
+    @cached_endpoint("analyst_recommendations")
     def analyst_recommendations(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch analyst buy/sell/hold recommendations from FMP (returns raw JSON)."""
         return self.fmp.get_analyst_recommendations(ticker)
 
+    @cached_endpoint("upgrades_downgrades")
     def upgrades_downgrades(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch analyst upgrades and downgrades from FMP (returns raw JSON)."""
         return self.fmp.get_upgrades_downgrades(ticker)
 
+    @cached_endpoint("earnings_surprises")
     def earnings_surprises(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch historical earnings surprises from FMP (returns raw JSON)."""
         return self.fmp.get_earnings_surprises(ticker)
 
+    @cached_endpoint("price_target")
     def price_target(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch analyst price targets from FMP (returns raw JSON)."""
         return self.fmp.get_price_target(ticker)
 
+    @cached_endpoint("stock_peers")
     def stock_peers(self, ticker: str) -> List[str]:
         """Fetch peer companies from FMP (returns list of ticker symbols)."""
         return self.fmp.get_stock_peers(ticker)
 
+    @cached_endpoint("institutional_ownership")
     def institutional_ownership(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch institutional ownership from FMP (returns raw JSON)."""
         return self.fmp.get_institutional_ownership(ticker)
 
+    @cached_endpoint("insider_trading")
     def insider_trading(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch insider trading statistics from FMP (returns raw JSON)."""
         return self.fmp.get_insider_trading(ticker)
 
+    @cached_endpoint("dividends")
     def dividends(self, ticker: str) -> Dict[str, Any]:
         """Fetch dividend history from FMP (returns raw JSON)."""
         return self.fmp.get_dividends(ticker)
 
+    @cached_endpoint("stock_splits")
     def stock_splits(self, ticker: str) -> Dict[str, Any]:
         """Fetch stock split history from FMP (returns raw JSON)."""
         return self.fmp.get_stock_splits(ticker)
 
+    @cached_endpoint("revenue_segments_by_product")
     def revenue_segments_by_product(
         self, ticker: str, period: str = "annual"
     ) -> List[Dict[str, Any]]:
         """Fetch revenue segmentation by product from FMP (returns raw JSON)."""
         return self.fmp.get_revenue_segments_by_product(ticker, period=period)
 
+    @cached_endpoint("revenue_segments_by_geography")
     def revenue_segments_by_geography(
         self, ticker: str, period: str = "annual"
     ) -> List[Dict[str, Any]]:
         """Fetch revenue segmentation by geography from FMP (returns raw JSON)."""
         return self.fmp.get_revenue_segments_by_geography(ticker, period=period)
 
+    @cached_endpoint("sec_filings_list")
     def sec_filings_list(
         self, ticker: str, filing_type: Optional[str] = None, page: int = 0
     ) -> List[Dict[str, Any]]:
         """Fetch SEC filings list from FMP (returns raw JSON)."""
         return self.fmp.get_sec_filings(ticker, filing_type=filing_type, page=page)
 
+    @cached_endpoint("esg_ratings")
     def esg_ratings(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch ESG ratings from FMP (returns raw JSON)."""
         return self.fmp.get_esg_ratings(ticker)
 
+    @cached_endpoint("executive_compensation")
     def executive_compensation(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch executive compensation from FMP (returns raw JSON)."""
         return self.fmp.get_executive_compensation(ticker)
 
+    @cached_endpoint("quote")
     def quote(self, ticker: str) -> List[Dict[str, Any]]:
         """Fetch real-time quote from FMP (returns raw JSON)."""
         return self.fmp.get_quote(ticker)
 
+    @cached_endpoint("stock_screener")
     def stock_screener(
         self,
         market_cap_min: Optional[int] = None,
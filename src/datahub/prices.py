@@ -0,0 +1,247 @@
+"""Price range resolution and the incremental per-ticker price store."""
+from __future__ import annotations
+import os
+import re
+import math
+import time
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.domain.models import PriceColumns, PriceSeries, Provenance
+from src.util.workspace import workspace_cache_dir
+
+_CUSTOM_RANGE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}):(\d{4}-\d{2}-\d{2})$")
+_PRESET_RE = re.compile(r"^(\d+)\s*([dwmy])$")
+
+# Don't re-check for a new bar more often than this when asking for "today"
+LATEST_BAR_REFRESH_SECONDS = 15 * 60
+# Tail fetches re-read this many settled days; a changed close there means FMP
+# re-based its (split/dividend adjusted) history and the store is refetched
+OVERLAP_DAYS = 7
+
+
+def resolve_price_range(
+    range_str: str, today: Optional[date] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Turn a range preset into (from_date, to_date) ISO bounds.
+
+    Accepts "YYYY-MM-DD:YYYY-MM-DD", "<N>d|w|m|y" (e.g. "30d", "3m", "5y"),
+    "ytd" and "max" (no lower bound).
+    """
+    value = (range_str or "1y").strip().lower()
+    today = today or date.today()
+
+    match = _CUSTOM_RANGE_RE.match(value)
+    if match:
+        return match.group(1), match.group(2)
+    if value == "max":
+        return None, today.isoformat()
+    if value == "ytd":
+        return date(today.year, 1, 1).isoformat(), today.isoformat()
+
+    match = _PRESET_RE.match(value)
+    if not match:
+        raise ValueError(
+            f"Invalid range: {range_str!r}. Use e.g. 30d, 3m, 1y, 5y, ytd, max or YYYY-MM-DD:YYYY-MM-DD"
+        )
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        start = today - timedelta(days=n)
+    elif unit == "w":
+        start = today - timedelta(weeks=n)
+    else:
+        months = n * 12 if unit == "y" else n
+        year, month = divmod(today.month - 1 - months, 12)
+        year += today.year
+        month += 1
+        # Clamp day for shorter months (e.g. Mar 31 - 1m -> Feb 28/29)
+        day = today.day
+        while True:
+            try:
+                start = date(year, month, day)
+                break
+            except ValueError:
+                day -= 1
+    return start.isoformat(), today.isoformat()
+
+
+def _day_before(iso: str, days: int = 1) -> str:
+    return (datetime.strptime(iso, "%Y-%m-%d").date() - timedelta(days=days)).isoformat()
+
+
+class PriceStore:
+    """
+    Per-ticker daily bar store that only downloads what it doesn't have.
+
+    Each ticker keeps its bars (compact PriceColumns encoding, `<TICKER>.pxc`)
+    plus the date span already fetched (`covered_from`..`covered_to`). A
+    request fetches only the missing head and/or tail of that span, merges it
+    in and serves the slice from disk. FMP closes are split-adjusted, so when
+    a tail fetch shows settled closes that no longer match the stored ones
+    (a split or adjustment since), the whole stored span is fetched again.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["PriceStore"]:
+        """Workspace store (WORKSPACE_ABS_PATH/.cache/prices); DATAHUB_CACHE=0 disables."""
+        root = workspace_cache_dir("prices", "DATAHUB_CACHE")
+        return cls(root) if root is not None else None
+
+    # ---- Persistence ----
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.upper()}.pxc"
+
+    def load(self, ticker: str) -> Tuple[PriceColumns, Dict]:
+        """Stored bars and coverage state (empty state if nothing stored yet)."""
+        try:
+            return PriceColumns.from_bytes(self._path(ticker).read_bytes())
+        except (OSError, ValueError):
+            empty = PriceColumns.from_rows(ticker.upper(), [])
+            return empty, {"covered_from": None, "covered_to": None,
+                           "complete_history": False, "checked_at": 0}
+
+    def save(self, columns: PriceColumns, state: Dict) -> None:
+        path = self._path(columns.ticker)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(columns.to_bytes(meta=state))
+        os.replace(tmp, path)
+
+    # ---- Fetch planning ----
+
+    @staticmethod
+    def _missing_spans(
+        state: Dict, from_date: Optional[str], to_date: str
+    ) -> List[Tuple[Optional[str], str]]:
+        """Date spans (inclusive) that must be downloaded to cover the request."""
+        lo, hi = state["covered_from"], state["covered_to"]
+        if hi is None:
+            return [(from_date, to_date)]
+
+        spans = []
+        needs_head = (from_date is None and not state["complete_history"]) or (
+            from_date is not None and not state["complete_history"] and from_date < lo
+        )
+        if needs_head:
+            spans.append((from_date, _day_before(lo)))
+
+        stale = time.time() - state["checked_at"] > LATEST_BAR_REFRESH_SECONDS
+        if to_date > hi or (to_date == hi and to_date >= date.today().isoformat() and stale):
+            # Re-fetch the last covered day (its bar may have been intraday) and a
+            # few settled days before it to detect re-based history
+            spans.append((_day_before(hi, OVERLAP_DAYS), to_date))
+        return spans
+
+    @staticmethod
+    def _rebased(columns: PriceColumns, series: PriceSeries, covered_to: Optional[str]) -> bool:
+        """True if a fetched bar before `covered_to` disagrees with the stored close."""
+        if covered_to is None:
+            return False
+        closes = columns.column("close")
+        stored = {columns.date_iso(i): closes[i] for i in range(len(columns))}
+        for p in series.points:
+            if p.date < covered_to and p.date in stored and p.close is not None:
+                if not math.isclose(float(p.close), stored[p.date], rel_tol=1e-6):
+                    return True
+        return False
+
+    @staticmethod
+    def _merge(columns: PriceColumns, series: PriceSeries) -> PriceColumns:
+        """Union of stored and fetched bars; fetched bars win on the same date."""
+        fields = PriceColumns.PRICE_FIELDS
+        by_date = {
+            columns.date_iso(i): {"date": columns.date_iso(i), "volume": columns.volume[i],
+                                  **{f: columns.column(f)[i] for f in fields}}
+            for i in range(len(columns))
+        }
+        for p in series.points:
+            by_date[p.date] = {"date": p.date, "open": p.open, "high": p.high,
+                               "low": p.low, "close": p.close, "volume": p.volume}
+        return PriceColumns.from_rows(columns.ticker, by_date.values())
+
+    def columns(
+        self,
+        ticker: str,
+        from_date: Optional[str],
+        to_date: Optional[str],
+        fetch: Callable[..., PriceSeries],
+    ) -> PriceColumns:
+        """
+        Serve [from_date, to_date] as PriceColumns (oldest first), downloading only gaps.
+
+        Args:
+            ticker: Stock ticker symbol
+            from_date: Inclusive start (None = full history)
+            to_date: Inclusive end (None = today)
+            fetch: Provider call `fetch(ticker, from_date=..., to_date=...)`
+        """
+        ticker = ticker.upper()
+        today = date.today().isoformat()
+        to_date = min(to_date or today, today)
+
+        with self._lock:
+            stored, state = self.load(ticker)
+            spans = self._missing_spans(state, from_date, to_date)
+            fetched_bars = 0
+            rebased = False
+            for span_from, span_to in spans:
+                part = fetch(ticker, from_date=span_from, to_date=span_to)
+                fetched_bars += len(part.points)
+                rebased = rebased or self._rebased(stored, part, state["covered_to"])
+                stored = self._merge(stored, part)
+                lo = state["covered_from"]
+                if span_from is None:
+                    # Open-ended fetch: complete only if it reached past what we had
+                    earliest = min((p.date for p in part.points), default=None)
+                    if earliest is not None and (lo is None or earliest < lo):
+                        state["complete_history"] = True
+                        state["covered_from"] = earliest
+                elif lo is None or span_from < lo:
+                    state["covered_from"] = span_from
+                if state["covered_to"] is None or span_to > state["covered_to"]:
+                    state["covered_to"] = span_to
+            if rebased:
+                # Old bars are on the previous adjustment basis: replace them all
+                span = (state["covered_from"], state["covered_to"])
+                part = fetch(ticker, from_date=span[0], to_date=span[1])
+                fetched_bars += len(part.points)
+                stored = self._merge(PriceColumns.from_rows(ticker, []), part)
+                spans.append(span)
+            if spans:
+                state["checked_at"] = time.time()
+                self.save(stored, state)
+
+        window = stored.window(from_date, to_date)
+        window.provenance = Provenance(
+            source="FMP",
+            fetched_at=datetime.utcnow().isoformat(),
+            meta={
+                "endpoint": "historical-price-full",
+                "from": from_date,
+                "to": to_date,
+                "fetched_spans": [list(s) for s in spans],
+                "bars_fetched": fetched_bars,
+                "rebased": rebased,
+            },
+        )
+        return window
+
+    def series(
+        self,
+        ticker: str,
+        from_date: Optional[str],
+        to_date: Optional[str],
+        fetch: Callable[..., PriceSeries],
+    ) -> PriceSeries:
+        """Same as `columns()` but as a PriceSeries (newest first, like FMP)."""
+        return self.columns(ticker, from_date, to_date, fetch).to_series()
@@ -1,10 +1,21 @@
 """Core domain models - small, reusable, token-efficient."""
 from __future__ import annotations
+import sys
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from math import isnan
+from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Literal
+from typing import Iterable, List, Optional, Literal, Tuple, Union
 from .types import Ticker, ISODate, Currency, Money
 from decimal import Decimal
 
+try:  # optional: zero-copy column views for vectorized math
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 
 class Provenance(BaseModel):
     """Track data source and metadata."""
@@ -77,6 +88,190 @@ class PriceSeries(BaseModel):
     provenance: Provenance
 
 
+class PriceColumns:
+    """
+    Columnar price series: parallel OHLCV arrays plus an int date column.
+
+    Rows are chronological (oldest first). Dates are YYYYMMDD ints, prices
+    float64 with NaN for missing values, volume int64 with -1 for missing.
+    Columns are memoryviews, so `window()` slices and `from_bytes()` loads
+    share memory instead of copying; `numpy()` wraps a column without a
+    copy when NumPy is installed. Convert with `from_series()`/`to_series()`
+    where the pydantic model is needed.
+    """
+
+    PRICE_FIELDS = ("open", "high", "low", "close")
+    MAGIC = b"PXC1"
+
+    __slots__ = ("ticker", "currency", "dates", "open", "high", "low", "close",
+                 "volume", "provenance")
+
+    def __init__(self, ticker: str, currency: str, dates, open, high, low, close, volume,
+                 provenance: Optional[Provenance] = None):
+        self.ticker = ticker
+        self.currency = currency
+        self.dates = memoryview(dates)
+        self.open = memoryview(open)
+        self.high = memoryview(high)
+        self.low = memoryview(low)
+        self.close = memoryview(close)
+        self.volume = memoryview(volume)
+        self.provenance = provenance
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    # ---- Construction ----
+
+    @classmethod
+    def from_rows(cls, ticker: str, rows: Iterable[dict], currency: str = "USD",
+                  provenance: Optional[Provenance] = None) -> "PriceColumns":
+        """Build from dict rows (FMP `historical` or dumped PricePoints), any order."""
+        cols = {"dates": array("i"), "volume": array("q")}
+        cols.update({f: array("d") for f in cls.PRICE_FIELDS})
+        nan = float("nan")
+        for r in sorted(rows, key=lambda r: r["date"]):
+            cols["dates"].append(int(r["date"].replace("-", "")))
+            for f in cls.PRICE_FIELDS:
+                v = r.get(f)
+                cols[f].append(float(v) if v is not None else nan)
+            v = r.get("volume")
+            cols["volume"].append(int(v) if v is not None else -1)
+        return cls(ticker, currency, provenance=provenance, **cols)
+
+    @classmethod
+    def from_series(cls, series: PriceSeries) -> "PriceColumns":
+        return cls.from_rows(
+            series.ticker,
+            ({"date": p.date, "open": p.open, "high": p.high, "low": p.low,
+              "close": p.close, "volume": p.volume} for p in series.points),
+            currency=series.currency,
+            provenance=series.provenance,
+        )
+
+    def to_series(self, newest_first: bool = True) -> PriceSeries:
+        """Materialize the pydantic model (FMP order, newest first, by default)."""
+        def money(v: float) -> Optional[Decimal]:
+            return None if isnan(v) else Decimal(repr(v))
+
+        order = range(len(self) - 1, -1, -1) if newest_first else range(len(self))
+        points = [
+            PricePoint(
+                date=self.date_iso(i),
+                close=Decimal(repr(self.close[i])),
+                open=money(self.open[i]),
+                high=money(self.high[i]),
+                low=money(self.low[i]),
+                volume=self.volume[i] if self.volume[i] >= 0 else None,
+            )
+            for i in order
+        ]
+        return PriceSeries(ticker=self.ticker, currency=self.currency, points=points,
+                           provenance=self.provenance or Provenance(source="FMP"))
+
+    # ---- Access ----
+
+    def date_iso(self, i: int) -> str:
+        d = self.dates[i]
+        return f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}"
+
+    def column(self, name: str) -> memoryview:
+        if name not in self.PRICE_FIELDS + ("dates", "volume"):
+            raise ValueError(f"Unknown price column: {name}")
+        return getattr(self, name)
+
+    def numpy(self, name: str):
+        """Zero-copy NumPy view of a column (requires numpy)."""
+        if np is None:
+            raise ImportError("numpy is not installed")
+        return np.frombuffer(self.column(name), dtype=self.column(name).format)
+
+    def window(self, from_date: Optional[str] = None, to_date: Optional[str] = None) -> "PriceColumns":
+        """Rows with from_date <= date <= to_date, as views over the same buffers."""
+        lo = bisect_left(self.dates, int(from_date.replace("-", ""))) if from_date else 0
+        hi = bisect_right(self.dates, int(to_date.replace("-", ""))) if to_date else len(self)
+        return PriceColumns(
+            self.ticker, self.currency, self.dates[lo:hi], self.open[lo:hi], self.high[lo:hi],
+            self.low[lo:hi], self.close[lo:hi], self.volume[lo:hi], provenance=self.provenance,
+        )
+
+    # ---- Compact encoding ----
+
+    _COLUMN_ORDER = ("dates", "open", "high", "low", "close", "volume")
+
+    def to_bytes(self, meta: Optional[dict] = None) -> bytes:
+        """
+        Encode as MAGIC + u32 header length + JSON header + raw columns.
+
+        The header is padded so every column starts 8-byte aligned. ~36 bytes
+        per row versus ~160 for the JSON PriceSeries.
+        """
+        header = {
+            "ticker": self.ticker,
+            "currency": self.currency,
+            "rows": len(self),
+            "byteorder": sys.byteorder,
+            "provenance": self.provenance.model_dump(mode="json") if self.provenance else None,
+            "meta": meta or {},
+        }
+        blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        blob += b" " * (-len(blob) % 8)  # magic + length are 8 bytes already
+        parts = [self.MAGIC, len(blob).to_bytes(4, "little"), blob]
+        for name in self._COLUMN_ORDER:
+            col = getattr(self, name)
+            parts.append(col.tobytes())
+            if name == "dates" and len(self) % 2:
+                parts.append(b"\0" * 4)  # keep following float columns aligned
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data) -> Tuple["PriceColumns", dict]:
+        """Decode `to_bytes()` output; columns are views into `data` when byte order matches."""
+        buf = memoryview(data)
+        if bytes(buf[:4]) != cls.MAGIC:
+            raise ValueError("Not a PriceColumns blob")
+        hlen = int.from_bytes(buf[4:8], "little")
+        header = json.loads(bytes(buf[8:8 + hlen]))
+        n = header["rows"]
+        offset = 8 + hlen
+        cols = {}
+        for name in cls._COLUMN_ORDER:
+            code, size = {"dates": ("i", 4), "volume": ("q", 8)}.get(name, ("d", 8))
+            view = buf[offset:offset + n * size]
+            if header["byteorder"] != sys.byteorder:
+                swapped = array(code, view.tobytes())
+                swapped.byteswap()
+                cols[name] = swapped
+            else:
+                cols[name] = view.cast(code)
+            offset += n * size
+            if name == "dates" and n % 2:
+                offset += 4
+        prov = header.get("provenance")
+        columns = cls(header["ticker"], header["currency"],
+                      provenance=Provenance.model_validate(prov) if prov else None, **cols)
+        return columns, header.get("meta") or {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PriceColumns":
+        """
+        Read a price file written by mf-market-get: the compact `.pxc` encoding,
+        a dumped PriceSeries JSON, or a raw FMP `historical-price-full` payload.
+        """
+        data = Path(path).read_bytes()
+        if data[:4] == cls.MAGIC:
+            return cls.from_bytes(data)[0]
+        payload = json.loads(data)
+        rows = payload.get("points") or payload.get("historical") or []
+        prov = payload.get("provenance")
+        return cls.from_rows(
+            payload.get("ticker") or payload.get("symbol") or "",
+            rows,
+            currency=payload.get("currency", "USD"),
+            provenance=Provenance.model_validate(prov) if prov else None,
+        )
+
+
 class EstimatePoint(BaseModel):
     """Single estimate data point."""
     model_config = ConfigDict(extra='forbid')
@@ -395,7 +395,7 @@ Purpose: One-stop shop for ALL FMP financial data. Fetch fundamentals, prices, m
 
 Input (basic)
 
-{"ticker":"AAPL","fields":["fundamentals","prices"],"range":"1y|2y|5y|10y|YYYY-MM-DD:YYYY-MM-DD","format":"concise"}
+{"ticker":"AAPL","fields":["fundamentals","prices"],"range":"30d|3m|ytd|1y|2y|5y|10y|max|YYYY-MM-DD:YYYY-MM-DD","format":"concise"}
 
 Input (advanced - with all parameters)
 
@@ -448,7 +448,7 @@ Available fields (38 total - combine any you need):
 Parameters:
 	• ticker (required) - stock ticker symbol
 	• fields (optional) - array of data types to fetch. Default: ["prices"]
-	• range (optional) - date range for prices/fundamentals. Default: "1y"
+	• range (optional) - date range for prices/fundamentals (e.g. "30d", "3m", "ytd", "1y", "5y", "max"). Default: "1y"
 	• period (optional) - "annual" or "quarter" for metrics/ratios. Default: "annual"
 	• limit (optional) - number of historical records. Default: varies by field
 	• filing_type (optional) - for sec_filings field (e.g., "10-K", "10-Q")
@@ -489,9 +489,14 @@ Input
 
 {"ticker":"AAPL","metric":"revenue|eps|ebitda|...","years_future":5,"years_past":0,"currency":"original|usd","format":"concise"}
 
+Peer group (one call for all tickers × metrics):
+{"tickers":["AAPL","MSFT","GOOGL"],"metrics":["revenue","eps"],"years_future":3,"split":false}
+
 Output
 	•	result.estimates → /workspace/data/market/<TICKER>/estimates_<metric>.json
+	•	peer group: result.estimates → one consolidated file (rows[] of ticker/metric/period/value/num_estimates plus estimates{ticker:{metric:…}}); result.missing lists tickers with no data; "split":true also writes the per-ticker files
 	•	provenance[] from CapIQ
+	•	metrics.cache → cell-cache hits/misses (repeat or overlapping requests are served from cache)
 
 Use for: forward‐looking consensus & counts.
 
@@ -501,12 +506,13 @@ Use for: forward‐looking consensus & counts.
 
 Input
 
-{"type":"10-K|10-Q|8-K|20-F|40-F","ticker":"AAPL","exhibit_limit":25,"format":"concise"}
+{"type":"10-K|10-Q|8-K|20-F|40-F","ticker":"AAPL","exhibit_limit":25,"refresh":true,"format":"concise"}
 
 Output
 	•	result.main_text (cleaned, HTML-stripped), result.exhibits_index under /workspace/data/sec/<TICKER>/<DATE>/<form>/
 	•	metadata includes raw_path (original) and clean_path (HTML-stripped)
-	•	metrics.bytes (main file size)
+	•	metrics.bytes (main file size), metrics.cache_hit (true = filing was already on disk, nothing downloaded)
+	•	"refresh": false returns the newest filing already downloaded without checking EDGAR
 
 Use for: source filings for narrative/risk comparisons. Text is automatically cleaned for easier reading.
 
@@ -520,6 +526,7 @@ Modes:
 • extract_sections → get Item sections with XML tags
 • search_keywords → find exact phrases with word-window context
 • search_regex → pattern matching with word-window context
+• search_ranked → best BM25-ranked passages for keywords, capped by a word/token budget
 
 Input (extract_sections)
 
@@ -539,10 +546,34 @@ Input (search_regex)
 
 Output: snippets saved to /workspace/.../searches/regex_*.txt
 
+Input (search_ranked)
+
+{"filing_path":"/abs/path/clean.txt","mode":"search_ranked","keywords":["export controls","China"],"max_tokens":3000,"passage_words":200}
+
+Output: top non-overlapping passages saved to /workspace/.../searches/ranked_*.txt (document order, each headed by rank/score/matched phrases); metrics.est_tokens and metrics.filing_words. Optional: max_words (default 2000), top_k. Prefer this over search_keywords before mf-qa: its size is bounded by the budget, not by how common the terms are.
+
 Use for: Focused extraction from filings WITHOUT LLM cost. Extract sections or search before using mf-qa.
 
 ⸻
 
+3b) mf-filings-search — Search ALL downloaded filings at once (FREE, no LLM cost)
+
+Purpose: Cross-company / cross-period full-text search over every filing fetched with mf-documents-get (plus extracted sections). New filings are indexed automatically.
+
+Input
+
+{"query":"\"export controls\" AND china","tickers":["NVDA","AMD","INTC"],"forms":["10-K"],"date_from":"2024-01-01","limit":10}
+
+Query syntax: "exact phrase", AND / OR / NOT, prefix* (semicond*), NEAR(tariff margin, 10)
+
+Output
+	•	result.hits[] → ticker, form, filing_date, filing_path (clean.txt, usable with mf-filing-extract), snippet ([matched terms] bracketed), score, matched_in (clean text and/or section names)
+	•	one hit per filing, best first
+
+Use for: "Which of these companies mention X?" in ONE call instead of one search per filing. Download the filings first, then drill into hits with mf-filing-extract.
+
+⸻
+
 4) mf-json-inspect — FREE schema preview for JSON files
 
 Input
@@ -583,6 +614,10 @@ Growth (dates must be ISO YYYY-MM-DD)
 
 {"op":"growth","series":[{"date":"2024-06-29","value":85777000000},{"date":"2025-06-28","value":94036000000}],"period":"yoy"}
 
+Statistics over a price file (sum/average/statistics accept prices_path instead of values)
+
+{"op":"statistics","prices_path":"/abs/raw/market/AAPL/prices_1y.pxc","column":"close","from":"2025-01-01","metrics":["mean","min","max"]}
+
 Output: result with deltas/growth; growth saves JSON under /workspace/analysis/calculations/.
 
 Use for: YoY/QoQ, sums, averages—never use LLM for math.
@@ -593,11 +628,15 @@ Use for: YoY/QoQ, sums, averages—never use LLM for math.
 
 Input
 
-{"document1":"/abs/a.txt","document2":"/abs/b.txt","section":"Risk Factors","type":"line|char|both","format":"concise"}
+{"document1":"/abs/2023/clean.txt","document2":"/abs/2024/clean.txt","section":"Risk Factors","min_similarity":0.5}
+
+	•	document1 = older, document2 = newer; clean.txt from mf-documents-get or sections/*.txt from mf-filing-extract
+	•	section (optional): "Risk Factors", "mda", "business", or an Item label ("1A", "Item 7"); omit to diff every Item
+	•	Paragraphs are normalized and hashed; sections are paired by Item heading (deterministic, ~0.5s per full 10-K pair)
 
-Output: result.diff_summary, plus saved diff JSON under /workspace/analysis/diffs/.
+Output: result.diff_summary (unchanged/added/removed/modified/moved paragraph counts, similarity), result.sections (changed Items only), result.changes → text file under /workspace/analysis/diffs/ listing only the changes (modified paragraphs as BEFORE/AFTER with a similarity score); full diff JSON saved alongside.
 
-Use for: risk factor YoY diffs; guidance changes.
+Use for: risk factor YoY diffs; guidance changes. Hand result.changes (not the two filings) to mf-qa.
 
 ⸻
 
@@ -635,8 +674,10 @@ Input (UNSTRUCTURED OUTPUT - totally fine!)
 
 Output
 	•	result: Structured JSON (if output_schema provided) OR unstructured text/markdown
-	•	paths: [answer file saved to disk - always present]
-	•	metrics: {chunks, t_ms, bytes, input_tokens, output_tokens, cost_usd}
+	•	paths: [answer file saved to disk - always present, then the partials directory (one JSON per chunk / reduce group)]
+	•	metrics: {chunks, chunks_dropped, cached, cached_partials, api_calls, retries, reduce_levels, t_ms, bytes, input_tokens, output_tokens, cache_creation_input_tokens, cache_read_input_tokens, cost_usd, cache_savings_usd}
+
+Documents are chunked at Item, paragraph and sentence boundaries ("max_chunk_tokens", default 3750); contents pages, cover pages and other boilerplate-only chunks are skipped (metrics.chunks_dropped). Every chunk is headed with its file and section, so citations point back to the source; the partials directory's chunks.json maps each chunk to its character offsets. Chunks are analyzed in parallel ("concurrency", default 4) with automatic retry on rate limits; when the partial answers are too large for one call they are merged in rounds ("reduce_budget_tokens", default 50000), so large documents never overflow the final step. The instruction and output_schema are prompt-cached across chunks, so a long instruction or schema is paid in full once per run rather than once per chunk. Answers are cached by document contents + instruction + schema + model + chunking: asking the same question again returns the stored answer instantly (metrics.cached, with the original cost_usd), and after a document changes only its changed chunks are re-analyzed (metrics.cached_partials). Pass "cache": false to force a fresh run.
 
 Pattern (IMPORTANT - follow this):
 1. Extract section with mf-filing-extract (FREE)
@@ -665,6 +706,10 @@ Input (line/bar/area charts)
 
 {"chart_type":"line","series":[{"x":"Q1 2024","y":81797000000},{"x":"Q2 2024","y":85777000000}],"title":"Apple Quarterly Revenue","x_label":"Quarter","y_label":"Revenue ($)","series_name":"Revenue","format_y":"currency","ticker":"AAPL"}
 
+Input (price chart straight from an mf-market-get price file)
+
+{"chart_type":"line","prices_path":"/abs/raw/market/AAPL/prices_1y.pxc","column":"close","max_points":250,"title":"AAPL Close","format_y":"currency","ticker":"AAPL"}
+
 Input (pie chart)
 
 {"chart_type":"pie","series":[{"name":"iPhone","value":200.5},{"name":"Services","value":85.2},{"name":"Mac","value":29.4}],"title":"Revenue by Segment (FY2024)","format_y":"currency","ticker":"AAPL"}
@@ -753,6 +798,7 @@ Decision Rules (pick the right action fast)
 	3.	Need a filing? → mf-documents-get → main_text path (cleaned by default).
 	4.	Need specific filing sections? → mf-filing-extract with mode=extract_sections (FREE, no LLM).
 	5.	Search filing for keywords/topics? → mf-filing-extract with mode=search_keywords or search_regex (FREE).
+		• Same question across several companies/filings? → mf-filings-search (FREE, one call).
 	6.	Have a JSON file?
 		• Unsure of fields? → mf-json-inspect (FREE) → look at path_hints.
 		• Know the field? → mf-extract-json with path (FREE).
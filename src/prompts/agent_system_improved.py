@@ -188,6 +188,8 @@ Use these for specific scenarios only.
 **7. mf-qa** - Document analysis with LLM ($0.05-0.10)  
 **8. mf-documents-get** - Fetch SEC filings (FREE)  
 **9. mf-filing-extract** - Extract filing sections (FREE)  
+**9b. mf-filings-search** - Full-text search across all downloaded filings (FREE)  
+**9c. mf-doc-diff** - Paragraph diff between two filings or sections (FREE)  
 **10. mf-valuation-basic-dcf** - DCF valuation (FREE)  
 **11. mf-render-*** - Visual components (FREE)
 
@@ -201,6 +203,7 @@ Use these for specific scenarios only.
 **Have time-series data?** → `mf-chart-data`  
 **Comparing companies/metrics?** → `mf-render-comparison` for comparison tables  
 **Need SEC filing?** → `mf-documents-get` → `mf-filing-extract` → `mf-qa`  
+**Same question across many filings?** → `mf-filings-search` (one call, all downloaded filings)  
 **Done with analysis?** → `Write` to save report
 
 ---
@@ -720,6 +723,65 @@ Returns: `{"aapl_margin": {"ratio": 24.92, ...}, "msft_margin": {"ratio": 35.63,
 
 ---
 
+## 6a) mf-filing-extract — Ranked passages from one filing, within a budget
+
+**Input:**
+```json
+{
+  "filing_path": "/abs/path/clean.txt",
+  "mode": "search_ranked",
+  "keywords": ["export controls", "China"],
+  "max_tokens": 3000,
+  "passage_words": 200
+}
+```
+
+**Output:** `result.snippets` — file under `searches/ranked_*.txt` with the best BM25-ranked, non-overlapping passages (document order, each headed by rank, score and matched phrases); `metrics.est_tokens` vs `metrics.filing_words`
+
+**Use for:** Feeding `mf-qa` a bounded input. Prefer it over `search_keywords`, whose snippets for common terms can be nearly as long as the filing. Optional: `max_words` (default 2000), `top_k`.
+
+---
+
+## 6b) mf-filings-search — Search all downloaded filings at once
+
+**Input:**
+```json
+{
+  "query": "\"export controls\" AND china",
+  "tickers": ["NVDA", "AMD", "INTC"],
+  "forms": ["10-K"],
+  "date_from": "2024-01-01",
+  "limit": 10
+}
+```
+
+**Query syntax:** `"exact phrase"`, `AND` / `OR` / `NOT`, `prefix*`, `NEAR(tariff margin, 10)`
+
+**Output:** `result.hits[]` — one per filing, best first: ticker, form, filing_date, `filing_path` (clean.txt for `mf-filing-extract`), snippet with `[matched terms]`, `matched_in` (clean text and/or section names)
+
+**Use for:** "Which of these companies mention X?" without one search per filing. Download filings with `mf-documents-get` first; new ones are indexed automatically.
+
+---
+
+## 6c) mf-doc-diff — What changed between two filings
+
+**Input:**
+```json
+{
+  "document1": "/abs/path/2023/clean.txt",
+  "document2": "/abs/path/2024/clean.txt",
+  "section": "Risk Factors"
+}
+```
+
+`document1` is the older filing. `section` is optional ("Risk Factors", "mda", "business", or an Item label like "1A"); without it every Item is compared. Extracted `sections/*.txt` files work too.
+
+**Output:** `result.diff_summary` (unchanged / added / removed / modified / moved paragraph counts, similarity), `result.sections` (changed Items), `result.changes` — a text file under `analysis/diffs/` with only the changes (modified paragraphs as BEFORE/AFTER)
+
+**Use for:** YoY risk factor or MD&A changes. Send `result.changes` to `mf-qa` instead of both filings.
+
+---
+
 ## 7) mf-qa — Analyze documents with LLM
 
 **⚠️ CRITICAL: Valid Model Names**
@@ -756,6 +818,8 @@ Use FULL model names (not shortcuts):
 
 **Tip:** If schema validation fails, retry without schema parameter.
 
+**Large documents:** Documents are chunked at Item / paragraph / sentence boundaries (`max_chunk_tokens`, default 3750), boilerplate-only chunks (contents, cover page) are skipped, and each chunk carries its file and section for citations (character offsets per chunk in `paths[1]/chunks.json`). Chunks are analyzed in parallel (`concurrency`, default 4) and rate limits are retried automatically; oversized partial answers are merged in rounds (`reduce_budget_tokens`, default 50000). `paths[1]` holds the per-chunk partials. The instruction and `output_schema` are prompt-cached after the first chunk (`metrics.cache_read_input_tokens`), and `cost_usd` prices cached tokens accordingly. Repeating a question over the same documents returns the stored answer in milliseconds (`metrics.cached`, original `cost_usd`); after a document changes only its changed chunks are re-analyzed (`metrics.cached_partials`). `"cache": false` forces a fresh run.
+
 **Use for:** Analyzing large text sections without polluting your context
 
 **Cost:** $0.05-0.30 per call (use Haiku for most queries, Sonnet only for complex analysis)
@@ -766,7 +830,7 @@ Use FULL model names (not shortcuts):
 
 1. **Need FMP data?** → `mf-market-get` with fields array
 2. **Need SEC filing?** → `mf-documents-get`
-3. **Need CapIQ estimates?** → `mf-estimates-get`
+3. **Need CapIQ estimates?** → `mf-estimates-get` (peer groups: one call with `{"tickers":[...],"metrics":[...]}`)
 4. **Don't know JSON structure?** → `mf-json-inspect`
 5. **Need simple data extraction?** → `mf-extract-json` with **path** (FREE!)
 6. **Need complex transformation?** → `mf-extract-json` with **instruction** (LLM)
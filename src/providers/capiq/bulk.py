@@ -0,0 +1,165 @@
+"""Concurrent, adaptively sized dispatch of CapIQ bulk request lists."""
+from __future__ import annotations
+import os
+import time
+import random
+import threading
+import http.client
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_RETRIES = 3
+# Chunks are sized so one call takes about this long
+TARGET_CHUNK_SECONDS = 2.0
+MIN_CHUNK_SIZE = 10
+# Recent (requests, seconds) observations the latency model is fitted to
+_SAMPLE_WINDOW = 16
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 15.0
+
+
+def max_in_flight_from_env() -> int:
+    """CAPIQ_MAX_IN_FLIGHT, default DEFAULT_MAX_IN_FLIGHT."""
+    return max(1, int(os.getenv("CAPIQ_MAX_IN_FLIGHT", str(DEFAULT_MAX_IN_FLIGHT))))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, 5xx, timeouts and dropped connections; not 4xx or bad payloads."""
+    if isinstance(error, HTTPError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def _retry_delay(error: BaseException, attempt: int) -> float:
+    headers = getattr(error, "headers", None)
+    if headers is not None:
+        try:
+            return min(float(headers.get("retry-after")), _BACKOFF_CAP)
+        except (TypeError, ValueError):
+            pass
+    return min(_BACKOFF_BASE * 2 ** attempt, _BACKOFF_CAP) * random.uniform(0.5, 1.0)
+
+
+class ChunkSizer:
+    """
+    Next chunk size from a latency model fitted to completed calls.
+
+    Call latency is modelled as `overhead + per_request * n` (least squares
+    over recent calls; latency includes transferring the response, so large
+    responses count). The next chunk holds as many requests as fit
+    `target_seconds`, between `min_size` and the API's `max_size`; when the
+    fixed overhead alone exceeds the target, smaller chunks would only add
+    calls, so the size stays at `max_size`. Until calls of two different sizes
+    have been seen the two terms can't be told apart: a call slower than the
+    target then halves the size once, as a probe. A failed call halves the size.
+
+    Args:
+        max_size: Largest chunk the API accepts
+        target_seconds: Desired duration of one call
+        min_size: Smallest chunk (failed chunks still split below it)
+    """
+
+    def __init__(self, max_size: int, target_seconds: float = TARGET_CHUNK_SECONDS, min_size: int = MIN_CHUNK_SIZE):
+        self.max_size = max(1, max_size)
+        self.target_seconds = target_seconds
+        self.min_size = min(max(1, min_size), self.max_size)
+        self.size = self.max_size
+        self.overhead: Optional[float] = None
+        self.per_request: Optional[float] = None
+        self._samples: Deque[Tuple[int, float]] = deque(maxlen=_SAMPLE_WINDOW)
+        self._lock = threading.Lock()
+
+    def _fit(self) -> Optional[Tuple[float, float]]:
+        """(overhead, per_request) seconds, or None while all samples share one size."""
+        n = len(self._samples)
+        mean_x = sum(x for x, _ in self._samples) / n
+        mean_y = sum(y for _, y in self._samples) / n
+        var = sum((x - mean_x) ** 2 for x, _ in self._samples)
+        if var == 0:
+            return None
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in self._samples) / var
+        slope = max(0.0, slope)
+        return max(0.0, mean_y - slope * mean_x), slope
+
+    def observe(self, requests: int, seconds: float) -> None:
+        with self._lock:
+            self._samples.append((max(1, requests), seconds))
+            fit = self._fit()
+            if fit is None:
+                if seconds > self.target_seconds and requests == self.size:
+                    self.size = max(self.min_size, self.size // 2)
+                return
+            self.overhead, self.per_request = fit
+            spare = self.target_seconds - self.overhead
+            if self.per_request <= 0 or spare <= 0:
+                self.size = self.max_size
+            else:
+                self.size = max(self.min_size, min(self.max_size, int(spare / self.per_request)))
+
+    def failed(self) -> None:
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+
+def dispatch(
+    requests: List[Any],
+    call: Callable[[List[Any]], List[Any]],
+    sizer: ChunkSizer,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Tuple[List[Any], Dict[str, int]]:
+    """
+    Send `requests` in chunks of `sizer.size`, up to `max_in_flight` at a time.
+
+    A chunk that fails with a retryable error is retried on its own after a
+    backoff, split in two when it holds more than one request, so successful
+    chunks are never re-sent and a slow or oversized chunk gets smaller.
+    Other errors, and retryable ones after `max_retries`, are raised.
+
+    Returns:
+        (results of all chunks concatenated in request order, stats with
+        calls, retries and final chunk_size)
+    """
+    stats = {"calls": 0, "retries": 0, "chunk_size": sizer.size}
+    results: Dict[int, List[Any]] = {}
+    pending: Dict[Future, Tuple[int, int, int]] = {}  # future -> (start, end, attempt)
+
+    def run(start: int, end: int, delay: float) -> Tuple[List[Any], float]:
+        if delay:
+            time.sleep(delay)
+        began = time.perf_counter()
+        out = call(requests[start:end])
+        return out, time.perf_counter() - began
+
+    cursor = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        while cursor < len(requests) or pending:
+            while cursor < len(requests) and len(pending) < max_in_flight:
+                end = min(len(requests), cursor + sizer.size)
+                pending[pool.submit(run, cursor, end, 0.0)] = (cursor, end, 0)
+                cursor = end
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end, attempt = pending.pop(future)
+                stats["calls"] += 1
+                try:
+                    out, seconds = future.result()
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= max_retries:
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    sizer.failed()
+                    stats["retries"] += 1
+                    delay = _retry_delay(e, attempt)
+                    spans = [(start, end)] if end - start == 1 else [(start, (start + end) // 2), ((start + end) // 2, end)]
+                    for s, t in spans:
+                        pending[pool.submit(run, s, t, delay)] = (s, t, attempt + 1)
+                    continue
+                results[start] = out
+                sizer.observe(end - start, seconds)
+    stats["chunk_size"] = sizer.size
+    return [item for start in sorted(results) for item in results[start]], stats
@@ -0,0 +1,90 @@
+"""Cell-level cache for CapIQ GDSP requests (identifier x mnemonic x properties)."""
+from __future__ import annotations
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.util.disk_cache import DiskCache, cache_key
+from src.util.workspace import workspace_cache_dir
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Consensus estimates move as analysts revise; multiples also move with the price
+ESTIMATE_TTLS: Dict[str, float] = {
+    "revenue": 12 * HOUR,
+    "eps": 12 * HOUR,
+    "ebitda": 12 * HOUR,
+    "ebit": 12 * HOUR,
+    "free_cash_flow": 12 * HOUR,
+    "gross_margin": 12 * HOUR,
+    "roa": 12 * HOUR,
+    "net_income": 12 * HOUR,
+    "net_debt": 12 * HOUR,
+    "cash_from_oper": 12 * HOUR,
+    "lt_growth": DAY,
+    "tev_ebitda": HOUR,
+    "peg_ratio": HOUR,
+    "forward_pe": HOUR,
+}
+# Reported actuals change only with new filings (relative periods roll at fiscal year end)
+PAST_VALUES_TTL = DAY
+COMPANY_INFO_TTL = 7 * DAY
+# Cells that came back empty (Data Unavailable, unknown identifier) are re-asked sooner
+EMPTY_CELL_TTL = HOUR
+
+
+def cell_key(request: Mapping[str, Any]) -> str:
+    """Key of one GDSP request: function, identifier, mnemonic and all properties."""
+    return cache_key(
+        request.get("function", "GDSP"),
+        str(request["identifier"]).strip().upper(),
+        request["mnemonic"],
+        dict(sorted(request.get("properties", {}).items())),
+    )
+
+
+class CellCache:
+    """
+    DiskCache of GDSP results, one entry per requested cell.
+
+    A cell's value is the list of data points (as dicts) its request
+    returned, possibly empty. Tracks hits/misses for tool metrics.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.store = DiskCache(Path(root), max_bytes=max_bytes)
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["CellCache"]:
+        """Workspace cache (WORKSPACE_ABS_PATH/.cache/capiq/cells); CAPIQ_CELL_CACHE=0 disables."""
+        root = workspace_cache_dir("capiq/cells", "CAPIQ_CELL_CACHE")
+        if root is None:
+            return None
+        max_mb = int(os.getenv("CAPIQ_CELL_CACHE_MAX_MB", "64"))
+        return cls(root, max_bytes=max_mb * 1024 * 1024)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def get_many(self, requests: List[Mapping[str, Any]]) -> List[Optional[List[Dict[str, Any]]]]:
+        """Cached points for each request, None where the cell is missing or stale."""
+        missing = object()
+        cells = []
+        for request in requests:
+            value = self.store.get(cell_key(request), missing)
+            cells.append(None if value is missing else value)
+        hits = sum(cell is not None for cell in cells)
+        with self._lock:
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(cells) - hits
+        return cells
+
+    def put(self, request: Mapping[str, Any], points: List[Dict[str, Any]], ttl: float) -> None:
+        self.store.set(cell_key(request), points, ttl=ttl if points else min(ttl, EMPTY_CELL_TTL),
+                       meta={"identifier": request["identifier"], "mnemonic": request["mnemonic"]})
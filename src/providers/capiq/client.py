@@ -1,15 +1,14 @@
 """CapIQ provider client with typed responses."""
 from __future__ import annotations
 import os
-import json
 import time
 import re
-from typing import List, Optional, Sequence, Dict, Any, Mapping
+import threading
+from typing import List, Optional, Sequence, Dict, Any, Mapping, Tuple, Union
 from datetime import datetime, timedelta
 import calendar
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError
 from decimal import Decimal
+from urllib.error import HTTPError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +18,10 @@ from .types import (
     CapIQGDSResponse,
     CapIQDataPoint,
 )
+from .bulk import ChunkSizer, dispatch, max_in_flight_from_env
+from .cells import COMPANY_INFO_TTL, ESTIMATE_TTLS, PAST_VALUES_TTL, CellCache
+from .tokens import TokenRecord, TokenStore
+from src.providers.http import HttpTransport, default_transport
 from src.domain.models import (
     FundamentalsQuarterly,
     QuarterFundamentals,
@@ -51,8 +54,37 @@ def last_weekday_of_december(year: int) -> str:
     return d.strftime("%m/%d/%Y")
 
 
+# Consensus value and analyst count mnemonics per estimate type
+ESTIMATE_MNEMONICS: Dict[str, List[str]] = {
+    "revenue": ["IQ_REVENUE_EST_CIQ", "IQ_REVENUE_NUM_EST_CIQ"],
+    "eps": ["IQ_EPS_EST_CIQ", "IQ_EPS_NUM_EST_CIQ"],
+    "ebitda": ["IQ_EBITDA_EST_CIQ", "IQ_EBITDA_NUM_EST_CIQ"],
+    "ebit": ["IQ_EBIT_EST_CIQ", "IQ_EBIT_NUM_EST_CIQ"],
+    "tev_ebitda": ["IQ_TEV_EBITDA_FWD"],
+    "peg_ratio": ["IQ_PEG_FWD_CIQ"],
+    "lt_growth": ["IQ_EST_EPS_GROWTH_5YR_CIQ"],
+    "forward_pe": ["IQ_PE_EXCL_FWD_CIQ"],
+    "free_cash_flow": ["IQ_FCF_EST_CIQ", "IQ_FCF_NUM_EST_CIQ"],
+    "gross_margin": ["IQ_GROSS_MARGIN_EST_CIQ", "IQ_GROSS_MARGIN_NUM_EST_CIQ"],
+    "roa": ["IQ_RETURN_ASSETS_EST_CIQ", "IQ_RETURN_ASSETS_NUM_EST_CIQ"],
+    "net_income": ["IQ_NI_REPORTED_EST_CIQ", "IQ_NI_REPORTED_NUM_EST_CIQ"],
+    "net_debt": ["IQ_NET_DEBT_EST_CIQ", "IQ_NET_DEBT_NUM_EST_CIQ"],
+    "cash_from_oper": ["IQ_CASH_OPER_EST_CIQ", "IQ_CASH_OPER_NUM_EST_CIQ"],
+}
+
+
 class CapIQProvider:
-    """Typed wrapper around S&P Capital IQ API."""
+    """
+    Typed wrapper around S&P Capital IQ API.
+
+    Tokens are shared through `token_store` (default: the workspace store,
+    see TokenStore.from_env), so successive and parallel CLI processes reuse
+    one valid token instead of each logging in. `bulk_query` sends its
+    chunks concurrently, at most `max_in_flight` at a time (default
+    CAPIQ_MAX_IN_FLIGHT or 4). Cells already in `cell_cache` (default: the
+    workspace cache, see CellCache.from_env) are not requested again while
+    fresh under their method's staleness policy.
+    """
 
     def __init__(
         self,
@@ -60,6 +92,10 @@ class CapIQProvider:
         password: Optional[str] = None,
         auth_base_url: str = "https://api-ciq.marketintelligence.spglobal.com/gdsapi/rest/authenticate",
         data_base_url: str = "https://api-ciq.marketintelligence.spglobal.com/gdsapi/rest/v3/clientservice.json",
+        transport: Optional[HttpTransport] = None,
+        token_store: Optional[TokenStore] = None,
+        max_in_flight: Optional[int] = None,
+        cell_cache: Optional[CellCache] = None,
     ):
         self.username = username or os.getenv("CIQ_LOGIN")
         self.password = password or os.getenv("CIQ_PASSWORD")
@@ -73,22 +109,20 @@ class CapIQProvider:
         self.refresh_token: Optional[str] = None
         self.token_type: str = "Bearer"
         self.token_expiry_epoch: float = 0.0
+        self.transport = transport or default_transport()
+        self.token_store = token_store if token_store is not None else TokenStore.from_env(
+            self.username, self.auth_base_url
+        )
+        self.max_in_flight = max_in_flight or max_in_flight_from_env()
+        self.cell_cache = cell_cache if cell_cache is not None else CellCache.from_env()
+        # Chunk sizing learned across bulk queries; calls/retries summed for tool metrics
+        self._sizer: Optional[ChunkSizer] = None
+        self.stats: Dict[str, int] = {"gds_calls": 0, "gds_retries": 0}
+        self._token_lock = threading.Lock()
 
     def _http_post(self, url: str, data: Any, headers: Dict[str, str]) -> dict:
-        """Make HTTP POST request and return JSON response."""
-        if isinstance(data, dict):
-            data = json.dumps(data).encode('utf-8')
-        elif isinstance(data, str):
-            data = data.encode('utf-8')
-        
-        req = Request(url, data=data, headers=headers)
-        
-        with urlopen(req) as response:
-            if response.getcode() >= 400:
-                raise HTTPError(
-                    url, response.getcode(), f"HTTP {response.getcode()}", {}, None
-                )
-            return json.loads(response.read().decode('utf-8'))
+        """Make HTTP POST request over the pooled transport and return JSON response."""
+        return self.transport.post(url, data, headers=headers).json()
 
     def _save_token_info(self, token_data: dict):
         """Save token response to instance variables."""
@@ -104,6 +138,32 @@ class CapIQProvider:
         
         self.token_expiry_epoch = time.time() + expires_in
 
+    def _token_record(self) -> TokenRecord:
+        return {
+            "token_type": self.token_type,
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expires_at": self.token_expiry_epoch,
+        }
+
+    def _use_token_record(self, record: TokenRecord) -> None:
+        self.token_type = record.get("token_type", "Bearer")
+        self.access_token = record["access_token"]
+        self.refresh_token = record.get("refresh_token")
+        self.token_expiry_epoch = record["expires_at"]
+
+    def _renew(self, stale: Optional[TokenRecord]) -> TokenRecord:
+        """Refresh the stale stored token if possible, else log in; returns the new record."""
+        if stale and stale.get("refresh_token"):
+            self.refresh_token = stale["refresh_token"]
+            try:
+                self.refresh_access_token()
+                return self._token_record()
+            except Exception:
+                pass
+        self.authenticate()
+        return self._token_record()
+
     def authenticate(self):
         """Authenticate and retrieve access token."""
         url = f"{self.auth_base_url}/api/v1/token"
@@ -127,8 +187,18 @@ class CapIQProvider:
         token_data = self._http_post(url, payload, headers)
         self._save_token_info(token_data)
 
-    def _ensure_valid_token(self):
-        """Ensure access token is valid, refresh or re-authenticate if needed."""
+    def _ensure_valid_token(self) -> Optional[str]:
+        """Ensure access token is valid, refresh or re-authenticate if needed; returns it."""
+        with self._token_lock:  # bulk_query chunks run on several threads
+            self._ensure_valid_token_locked()
+            return self.access_token
+
+    def _ensure_valid_token_locked(self):
+        if self.token_store is not None:
+            if not self.token_store.valid(self._token_record()):
+                self._use_token_record(self.token_store.get(self._renew))
+            return
+
         current_time = time.time()
         
         if current_time >= self.token_expiry_epoch:
@@ -150,32 +220,66 @@ class CapIQProvider:
         Returns:
             List of parsed CapIQDataPoint objects
         """
-        self._ensure_valid_token()
-        
+        return self._parse_gds_response(self._gds_response(payload))
+
+    def _gds_response(self, payload: dict) -> CapIQGDSResponse:
+        token = self._ensure_valid_token()
+        try:
+            response = self._post_gdsapi(payload, token)
+        except HTTPError as e:
+            # A stored token can be revoked before it expires: drop it and log in again once
+            if e.code != 401 or self.token_store is None:
+                raise
+            with self._token_lock:
+                # Another chunk may already have replaced the rejected token
+                self.token_store.invalidate(token)
+                if self.access_token == token:
+                    self.token_expiry_epoch = 0.0
+                self._ensure_valid_token_locked()
+                token = self.access_token
+            response = self._post_gdsapi(payload, token)
+        
+        return CapIQGDSResponse.model_validate(response)
+
+    def _call_cells(self, requests: List[dict]) -> List[Tuple[List[CapIQDataPoint], bool]]:
+        """
+        One GDS call; (points, cacheable) per request, aligned with `requests`.
+
+        Errored cells are not cacheable. If the response doesn't line up with
+        the requests, all points go to the first slot and nothing is cached.
+        """
+        items = self._parse_gds_items(self._gds_response({"inputRequests": requests}))
+        if len(items) != len(requests):
+            points = [p for cell in items if cell for p in cell]
+            return [(points, False)] + [([], False)] * (len(requests) - 1)
+        return [(cell or [], cell is not None) for cell in items]
+
+    def _post_gdsapi(self, payload: dict, token: Optional[str]) -> dict:
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        
-        response = self._http_post(self.data_base_url, payload, headers)
-        
-        # Parse and validate response
-        gds_response = CapIQGDSResponse.model_validate(response)
-        
-        # Convert to data points
-        return self._parse_gds_response(gds_response)
+        return self._http_post(self.data_base_url, payload, headers)
 
     def _parse_gds_response(self, response: CapIQGDSResponse) -> List[CapIQDataPoint]:
         """Parse GDS response into data points."""
-        results: List[CapIQDataPoint] = []
+        return [dp for cell in self._parse_gds_items(response) if cell for dp in cell]
+
+    def _parse_gds_items(self, response: CapIQGDSResponse) -> List[Optional[List[CapIQDataPoint]]]:
+        """Data points per response item; None for items skipped with an error."""
+        cells: List[Optional[List[CapIQDataPoint]]] = []
+        found = False
         
         for item in response.GDSSDKResponse:
             # Skip items with errors (except InvalidIdentifier which we handle)
             if item.ErrMsg and item.ErrMsg != "InvalidIdentifier":
-                if not results:  # Only raise on first item error
+                if not found:  # Only raise on first item error
                     raise Exception(f"CapIQ API error: {item.ErrMsg}")
+                cells.append(None)
                 continue
             
+            results: List[CapIQDataPoint] = []
+            cells.append(results)
             if item.ErrMsg == "InvalidIdentifier":
                 continue
             
@@ -207,8 +311,9 @@ class CapIQProvider:
                     asofdate=asofdate if asofdate else None,
                 )
                 results.append(dp)
+                found = True
         
-        return results
+        return cells
 
     def bulk_query(
         self,
@@ -220,6 +325,7 @@ class CapIQProvider:
         per_mnemonic_properties: Optional[Mapping[str, Mapping[str, Any]]] = None,
         timing_variants: Optional[Sequence[Mapping[str, Any]]] = None,
         chunk_limit: int = 500,
+        cache_ttl: Optional[Union[float, Mapping[str, float]]] = None,
     ) -> List[CapIQDataPoint]:
         """
         Build and execute bulk query as cartesian product of identifiers × mnemonics × timing.
@@ -232,11 +338,39 @@ class CapIQProvider:
             base_properties: Base properties for all requests
             per_mnemonic_properties: Per-mnemonic property overrides
             timing_variants: Custom timing variants (overrides periods/as_of_dates)
-            chunk_limit: Max requests per API call
+            chunk_limit: Max requests per API call; chunks shrink below it
+                when calls are slow (ChunkSizer) and are sent concurrently
+            cache_ttl: Seconds fetched cells stay fresh in the cell cache,
+                or a per-mnemonic mapping (None = bypass the cache)
             
         Returns:
             List of CapIQDataPoint objects
         """
+        cells = self.bulk_query_cells(
+            identifiers, mnemonics, periods, as_of_dates, base_properties,
+            per_mnemonic_properties, timing_variants, chunk_limit, cache_ttl,
+        )
+        return [dp for _, points in cells for dp in points]
+
+    def bulk_query_cells(
+        self,
+        identifiers: Sequence[str],
+        mnemonics: Sequence[str],
+        periods: Optional[Sequence[str]] = None,
+        as_of_dates: Optional[Sequence[str]] = None,
+        base_properties: Optional[Mapping[str, Any]] = None,
+        per_mnemonic_properties: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        timing_variants: Optional[Sequence[Mapping[str, Any]]] = None,
+        chunk_limit: int = 500,
+        cache_ttl: Optional[Union[float, Mapping[str, float]]] = None,
+    ) -> List[Tuple[dict, List[CapIQDataPoint]]]:
+        """
+        Like bulk_query, but each request keeps its own points.
+        
+        Returns:
+            (request, points) per GDSP request, in request order; group results
+            by the request rather than the identifier CapIQ echoes back
+        """
         if not identifiers or not mnemonics:
             raise ValueError("identifiers and mnemonics must be non-empty")
         
@@ -292,13 +426,34 @@ class CapIQProvider:
                         "properties": props,
                     })
         
-        # Chunk and call
-        out: List[CapIQDataPoint] = []
-        for start in range(0, len(flat), chunk_limit):
-            payload = {"inputRequests": flat[start : start + chunk_limit]}
-            out.extend(self.call_gdsapi(payload))
-        
-        return out
+        # Known cells come from the cache; only the missing ones are requested
+        cache = self.cell_cache if cache_ttl is not None else None
+        cells: List[Optional[List[CapIQDataPoint]]] = [None] * len(flat)
+        if cache is not None:
+            for i, cached in enumerate(cache.get_many(flat)):
+                if cached is not None:
+                    cells[i] = [CapIQDataPoint.model_validate(dp) for dp in cached]
+        missing = [i for i, cell in enumerate(cells) if cell is None]
+        
+        # Chunk and call concurrently; results come back in request order
+        if missing:
+            if self._sizer is None or self._sizer.max_size != chunk_limit:
+                self._sizer = ChunkSizer(chunk_limit)
+            fetched, stats = dispatch(
+                [flat[i] for i in missing],
+                self._call_cells,
+                self._sizer,
+                max_in_flight=self.max_in_flight,
+            )
+            self.stats["gds_calls"] += stats["calls"]
+            self.stats["gds_retries"] += stats["retries"]
+            for i, (points, cacheable) in zip(missing, fetched):
+                cells[i] = points
+                if cache is not None and cacheable:
+                    ttl = cache_ttl[flat[i]["mnemonic"]] if isinstance(cache_ttl, Mapping) else cache_ttl
+                    cache.put(flat[i], [dp.model_dump(mode="json") for dp in points], ttl=ttl)
+        
+        return list(zip(flat, cells))
 
     def get_estimates(
         self,
@@ -323,25 +478,39 @@ class CapIQProvider:
         Returns:
             List of estimate data points
         """
-        mnemonics_map = {
-            "revenue": ["IQ_REVENUE_EST_CIQ", "IQ_REVENUE_NUM_EST_CIQ"],
-            "eps": ["IQ_EPS_EST_CIQ", "IQ_EPS_NUM_EST_CIQ"],
-            "ebitda": ["IQ_EBITDA_EST_CIQ", "IQ_EBITDA_NUM_EST_CIQ"],
-            "ebit": ["IQ_EBIT_EST_CIQ", "IQ_EBIT_NUM_EST_CIQ"],
-            "tev_ebitda": ["IQ_TEV_EBITDA_FWD"],
-            "peg_ratio": ["IQ_PEG_FWD_CIQ"],
-            "lt_growth": ["IQ_EST_EPS_GROWTH_5YR_CIQ"],
-            "forward_pe": ["IQ_PE_EXCL_FWD_CIQ"],
-            "free_cash_flow": ["IQ_FCF_EST_CIQ", "IQ_FCF_NUM_EST_CIQ"],
-            "gross_margin": ["IQ_GROSS_MARGIN_EST_CIQ", "IQ_GROSS_MARGIN_NUM_EST_CIQ"],
-            "roa": ["IQ_RETURN_ASSETS_EST_CIQ", "IQ_RETURN_ASSETS_NUM_EST_CIQ"],
-            "net_income": ["IQ_NI_REPORTED_EST_CIQ", "IQ_NI_REPORTED_NUM_EST_CIQ"],
-            "net_debt": ["IQ_NET_DEBT_EST_CIQ", "IQ_NET_DEBT_NUM_EST_CIQ"],
-            "cash_from_oper": ["IQ_CASH_OPER_EST_CIQ", "IQ_CASH_OPER_NUM_EST_CIQ"],
-        }
+        by_identifier = self.get_estimates_batch(
+            identifiers, [estimate_type], years_future, years_past, include_curr_year, currency
+        )
+        return [dp for by_type in by_identifier.values() for dp in by_type[estimate_type]]
+
+    def get_estimates_batch(
+        self,
+        identifiers: Sequence[str],
+        estimate_types: Sequence[str],
+        years_future: int = 5,
+        years_past: int = 0,
+        include_curr_year: bool = False,
+        currency: str = "original",
+    ) -> Dict[str, Dict[str, List[CapIQDataPoint]]]:
+        """
+        Get analyst estimates for several identifiers and metrics in one bulk query.
         
-        if estimate_type not in mnemonics_map:
-            raise ValueError(f"Unsupported estimate type: {estimate_type}")
+        Args:
+            identifiers: List of tickers/ISINs
+            estimate_types: Types of estimate (see ESTIMATE_MNEMONICS)
+            years_future: Number of future years to fetch
+            years_past: Number of past years to fetch
+            include_curr_year: Include current year
+            currency: Currency conversion ("original" or "usd")
+            
+        Returns:
+            Estimate data points by identifier (as requested), then by estimate type
+        """
+        for estimate_type in estimate_types:
+            if estimate_type not in ESTIMATE_MNEMONICS:
+                raise ValueError(f"Unsupported estimate type: {estimate_type}")
+        types = list(dict.fromkeys(estimate_types))
+        identifiers = list(dict.fromkeys(identifiers))
         
         periods: List[str] = []
         for y in range(years_past, 0, -1):
@@ -358,12 +527,21 @@ class CapIQProvider:
                 "currencyConversionModeId": "HISTORICAL",
             }
         
-        return self.bulk_query(
+        type_of = {m: t for t in types for m in ESTIMATE_MNEMONICS[t]}
+        cells = self.bulk_query_cells(
             identifiers=identifiers,
-            mnemonics=mnemonics_map[estimate_type],
+            mnemonics=list(type_of),
             periods=periods,
             base_properties={"restatementTypeId": "LC", **currency_props},
+            cache_ttl={m: ESTIMATE_TTLS[t] for m, t in type_of.items()},
         )
+        
+        found: Dict[str, Dict[str, List[CapIQDataPoint]]] = {
+            ident: {t: [] for t in types} for ident in identifiers
+        }
+        for request, points in cells:
+            found[request["identifier"]][type_of[request["mnemonic"]]].extend(points)
+        return found
 
     def get_past_values(
         self,
@@ -430,6 +608,7 @@ class CapIQProvider:
             mnemonics=[metrics_map[metric_type]],
             periods=periods,
             base_properties={"restatementTypeId": restatement_type, **currency_props},
+            cache_ttl=PAST_VALUES_TTL,
         )
 
     def get_company_info(
@@ -461,5 +640,6 @@ class CapIQProvider:
             mnemonics=[metrics_map[info_type]],
             periods=["IQ_FY"],
             base_properties={},
+            cache_ttl=COMPANY_INFO_TTL,
         )
 
@@ -0,0 +1,99 @@
+"""CapIQ access tokens shared by all processes on a host."""
+from __future__ import annotations
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.util.filelock import FileLock
+from src.util.workspace import workspace_cache_dir
+
+# Renew this long before the stated expiry, so a token can't lapse mid-request
+EXPIRY_MARGIN_SECONDS = 60.0
+
+TokenRecord = Dict[str, Any]
+
+
+class TokenStore:
+    """
+    CapIQ token record in a small JSON file guarded by a file lock.
+
+    `get()` returns the stored record while it is still valid. Otherwise it
+    calls `renew(stale_record)` (refresh, falling back to a fresh login)
+    while holding the lock and saves the result, so when several processes
+    find the token expired at the same time, one renews it and the others
+    wait and reuse the new token. The file holds credentials: it is written
+    atomically with owner-only permissions.
+
+    Args:
+        path: Token file shared by all participants
+        margin: Seconds before `expires_at` at which a token counts as expired
+    """
+
+    def __init__(self, path: Path, margin: float = EXPIRY_MARGIN_SECONDS):
+        self.path = Path(path)
+        self.margin = margin
+        self._lock = FileLock(self.path.with_suffix(self.path.suffix + ".lock"))
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"reused": 0, "renewed": 0}
+
+    @classmethod
+    def from_env(cls, username: str, auth_base_url: str) -> Optional["TokenStore"]:
+        """
+        Store under WORKSPACE_ABS_PATH/.cache/capiq, one file per login and auth endpoint.
+
+        CAPIQ_TOKEN_CACHE=0 disables it (tokens then live only on the provider instance).
+        """
+        root = workspace_cache_dir("capiq", "CAPIQ_TOKEN_CACHE")
+        if root is None:
+            return None
+        account = hashlib.sha256(f"{username}\n{auth_base_url}".encode("utf-8")).hexdigest()[:16]
+        return cls(root / f"token_{account}.json")
+
+    def valid(self, record: Optional[TokenRecord]) -> bool:
+        return bool(record and record.get("access_token")) and time.time() < record["expires_at"] - self.margin
+
+    def load(self) -> Optional[TokenRecord]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, record: TokenRecord) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")  # created 0600
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, self.path)
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def get(self, renew: Callable[[Optional[TokenRecord]], TokenRecord]) -> TokenRecord:
+        """A valid token record, renewed via `renew(stale_record_or_None)` if needed."""
+        record = self.load()
+        if self.valid(record):
+            self._count("reused")
+            return record
+        with self._lock:
+            record = self.load()  # another process may have renewed it while we waited
+            if self.valid(record):
+                self._count("reused")
+                return record
+            record = renew(record)
+            self._save(record)
+        self._count("renewed")
+        return record
+
+    def invalidate(self, access_token: str) -> None:
+        """Forget `access_token` (e.g. the API rejected it) unless it was already replaced."""
+        with self._lock:
+            record = self.load()
+            if record and record.get("access_token") == access_token:
+                record["expires_at"] = 0
+                self._save(record)
@@ -1,11 +1,8 @@
 """FMP provider client with typed responses."""
 from __future__ import annotations
 import os
-import json
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError
 from decimal import Decimal
 from dotenv import load_dotenv
 
@@ -13,6 +10,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from .types import FmpIncomeRow, FmpBalanceRow, FmpCashflowRow, FmpPriceRow
+from src.providers.http import HttpTransport, default_transport
+from src.util.permits import map_within_limit
 from src.domain.models import (
     FundamentalsQuarterly,
     QuarterFundamentals,
@@ -26,22 +25,18 @@ from src.domain.types import Ticker
 class FmpProvider:
     """Typed wrapper around FMP API."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self, api_key: Optional[str] = None, transport: Optional[HttpTransport] = None
+    ):
         self.api_key = api_key or os.getenv("FMP_API_KEY")
         if not self.api_key:
             raise ValueError("FMP_API_KEY not set")
         self.base_url = "https://financialmodelingprep.com/api/v3"
+        self.transport = transport or default_transport()
 
     def _get_json(self, url: str) -> dict | list:
-        """Fetch and parse JSON from FMP API."""
-        req = Request(url)
-        with urlopen(req) as response:
-            if response.getcode() >= 400:
-                raise HTTPError(
-                    url, response.getcode(), f"HTTP {response.getcode()}", {}, None
-                )
-            data = response.read().decode("utf-8")
-            return json.loads(data)
+        """Fetch and parse JSON from FMP API over the pooled transport."""
+        return self.transport.get_json(url)
 
     def get_quarterly_fundamentals(
         self, ticker: str, limit: int = 8
@@ -52,9 +47,11 @@ class FmpProvider:
         balance_url = f"{self.base_url}/balance-sheet-statement/{ticker}?period=quarter&limit={limit}&apikey={self.api_key}"
         cashflow_url = f"{self.base_url}/cash-flow-statement/{ticker}?period=quarter&limit={limit}&apikey={self.api_key}"
 
-        income_data = self._get_json(income_url)
-        balance_data = self._get_json(balance_url)
-        cashflow_data = self._get_json(cashflow_url)
+        # Statements are independent - fetch them concurrently, within the
+        # FMP cap when this runs as one task of a field fan-out
+        income_data, balance_data, cashflow_data = map_within_limit(
+            "FMP", self._get_json, [income_url, balance_url, cashflow_url]
+        )
 
         # Validate and parse
         income_rows = [FmpIncomeRow.model_validate(r) for r in income_data]
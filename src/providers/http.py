@@ -0,0 +1,303 @@
+"""Shared keep-alive HTTP transport used by all provider clients."""
+from __future__ import annotations
+import os
+import ssl
+import json
+import gzip
+import zlib
+import threading
+import http.client
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, urljoin
+from urllib.error import HTTPError, URLError
+
+# Errors that mean a pooled connection was closed by the server while idle
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+PoolKey = Tuple[str, str, int]
+
+
+class HttpResponse:
+    """Fully-read HTTP response (body already decompressed)."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding)
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+class HttpTransport:
+    """
+    Thread-safe HTTP/1.1 client with per-host keep-alive connection pools.
+
+    Each (scheme, host, port) keeps up to `pool_size` idle connections, so
+    repeated calls to the same API pay the TCP + TLS handshake once.
+    Responses are requested with gzip/deflate encoding and decoded here.
+
+    Args:
+        pool_size: Max idle connections kept per host (env HTTP_POOL_SIZE, default 8)
+        timeout: Socket timeout in seconds (env HTTP_TIMEOUT, default 30)
+        ssl_context: Custom SSL context (defaults to system trust store)
+        max_redirects: Redirects followed before giving up
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_redirects: int = 5,
+    ):
+        self.pool_size = int(pool_size or os.getenv("HTTP_POOL_SIZE", "8"))
+        self.timeout = float(timeout or os.getenv("HTTP_TIMEOUT", "30"))
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.max_redirects = max_redirects
+        self._pools: Dict[PoolKey, Deque[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    # ---- Connection pool ----
+
+    def _new_connection(self, key: PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        with self._lock:
+            self.stats["connections_opened"] += 1
+        return conn
+
+    def _acquire(self, key: PoolKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused) - an idle pooled connection if available."""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool:
+                self.stats["connections_reused"] += 1
+                return pool.pop(), True
+        return self._new_connection(key), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) < self.pool_size:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close all idle pooled connections."""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for conn in pool:
+                conn.close()
+
+    # ---- Requests ----
+
+    @staticmethod
+    def _pool_key(url: str) -> Tuple[PoolKey, str]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise URLError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        return (scheme, parts.hostname or "", port), target
+
+    @staticmethod
+    def _decode(body: bytes, encoding: str) -> bytes:
+        encoding = encoding.lower()
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        return body
+
+    def _open(
+        self, method: str, key: PoolKey, target: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send the request and read the status line; retry once on a stale pooled connection."""
+        send_headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        send_headers.update(headers)
+
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, target, body=body, headers=send_headers)
+            return conn, conn.getresponse()
+        except _STALE_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            # Server dropped the idle connection - retry once on a fresh one
+            conn = self._new_connection(key)
+            try:
+                conn.request(method, target, body=body, headers=send_headers)
+                return conn, conn.getresponse()
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+    def _finish(self, key: PoolKey, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        """Return a fully-read connection to the pool (or close it)."""
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def _send_once(
+        self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> HttpResponse:
+        key, target = self._pool_key(url)
+        conn, resp = self._open(method, key, target, body, headers)
+        try:
+            raw = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        self._finish(key, conn, resp)
+
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        data = self._decode(raw, resp_headers.get("content-encoding", ""))
+        return HttpResponse(url, resp.status, resp_headers, data)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> HttpResponse:
+        """Send a request, following redirects; raise HTTPError on 4xx/5xx."""
+        headers = dict(headers or {})
+        for _ in range(self.max_redirects + 1):
+            response = self._send_once(method, url, body, headers)
+            if response.status in _REDIRECT_CODES and "location" in response.headers:
+                url = urljoin(url, response.headers["location"])
+                if response.status == 303:
+                    method, body = "GET", None
+                continue
+            if response.status >= 400:
+                raise HTTPError(
+                    url, response.status, f"HTTP {response.status}", response.headers, None
+                )
+            return response
+        raise URLError(f"Too many redirects for {url}")
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        return self.request("GET", url, headers=headers)
+
+    def post(
+        self, url: str, data: Any, headers: Optional[Dict[str, str]] = None
+    ) -> HttpResponse:
+        if isinstance(data, dict):
+            data = json.dumps(data).encode("utf-8")
+        elif isinstance(data, str):
+            data = data.encode("utf-8")
+        return self.request("POST", url, body=data, headers=headers)
+
+    def get_json(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        return self.get(url, headers=headers).json()
+
+    def stream(
+        self, url: str, headers: Optional[Dict[str, str]] = None, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """
+        GET `url` and yield the (decompressed) body in chunks of ~`chunk_size`.
+
+        Memory stays bounded by the chunk size. The connection goes back to
+        the pool once the body is exhausted; stopping early closes it.
+        """
+        headers = dict(headers or {})
+        for _ in range(self.max_redirects + 1):
+            key, target = self._pool_key(url)
+            conn, resp = self._open("GET", key, target, None, headers)
+            location = resp.getheader("location")
+            if resp.status in _REDIRECT_CODES and location:
+                resp.read()
+                self._finish(key, conn, resp)
+                url = urljoin(url, location)
+                continue
+            if resp.status >= 400:
+                resp.read()
+                self._finish(key, conn, resp)
+                raise HTTPError(url, resp.status, f"HTTP {resp.status}", resp.headers, None)
+
+            encoding = (resp.getheader("content-encoding") or "").lower()
+            # wbits 32+MAX: auto-detect gzip or zlib-wrapped deflate
+            decoder = zlib.decompressobj(32 + zlib.MAX_WBITS) if encoding in ("gzip", "deflate") else None
+            # Body bytes read before the zlib header is confirmed; raw deflate
+            # (no header, as some servers send) fails that check and restarts
+            head = b"" if encoding == "deflate" else None
+            done = False
+            try:
+                while True:
+                    chunk = resp.read(chunk_size)
+                    if not chunk:
+                        break
+                    if head is not None:
+                        head += chunk
+                        try:
+                            chunk = decoder.decompress(chunk)
+                        except zlib.error:
+                            decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+                            chunk = decoder.decompress(head)
+                            head = None
+                        else:
+                            head = head if len(head) < 2 else None
+                    elif decoder is not None:
+                        chunk = decoder.decompress(chunk)
+                    if chunk:
+                        yield chunk
+                if decoder is not None:
+                    tail = decoder.flush()
+                    if tail:
+                        yield tail
+                done = True
+            finally:
+                if done:
+                    self._finish(key, conn, resp)
+                else:
+                    conn.close()
+            return
+        raise URLError(f"Too many redirects for {url}")
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> HttpTransport:
+    """Process-wide transport shared by providers that aren't given their own."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
@@ -0,0 +1,67 @@
+"""Token-bucket rate limiter shared by all processes on a host."""
+from __future__ import annotations
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.util.filelock import FileLock
+from src.util.workspace import workspace_cache_dir
+
+
+class FileTokenBucket:
+    """
+    Token bucket whose state lives in a small JSON file guarded by a file lock.
+
+    Every caller (thread or process) pointing at the same `path` draws from
+    one bucket. `acquire()` takes a token under the lock; if the bucket is
+    empty the token is borrowed (balance goes negative) and the caller sleeps
+    outside the lock until its slot comes up, so waiters queue fairly and
+    never hold the lock while sleeping. Idle callers don't wait at all.
+
+    Args:
+        path: State file shared by all participants
+        rate: Tokens added per second
+        capacity: Maximum burst size (default 1 = evenly spaced requests)
+    """
+
+    def __init__(self, path: Path, rate: float, capacity: float = 1.0):
+        self.path = Path(path)
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._lock = FileLock(self.path.with_suffix(self.path.suffix + ".lock"))
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {"requests": 0, "waited": 0, "wait_ms": 0.0}
+
+    @classmethod
+    def for_sec(cls) -> "FileTokenBucket":
+        """SEC EDGAR bucket under WORKSPACE_ABS_PATH/.cache (SEC_MAX_RPS, default 10)."""
+        rate = float(os.getenv("SEC_MAX_RPS", "10"))
+        return cls(workspace_cache_dir("ratelimit") / "sec.json", rate=rate)
+
+    def _read(self) -> Optional[Dict[str, float]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if needed. Returns seconds waited."""
+        with self._lock:
+            now = time.time()
+            state = self._read() or {"tokens": self.capacity, "updated": now}
+            elapsed = max(0.0, now - state["updated"])
+            tokens = min(self.capacity, state["tokens"] + elapsed * self.rate) - 1
+            self.path.write_text(json.dumps({"tokens": tokens, "updated": now}), encoding="utf-8")
+
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["waited"] += 1
+                self.stats["wait_ms"] += wait * 1000
+        return wait
@@ -0,0 +1,131 @@
+"""Local ticker -> CIK index built from SEC's company_tickers.json."""
+from __future__ import annotations
+import os
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.util.workspace import workspace_cache_dir
+
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers.json"
+
+# SEC adds/renames tickers continuously; a week-old map is fine for lookups
+DEFAULT_MAX_AGE_DAYS = 7
+
+
+def _normalize(ticker: str) -> str:
+    # SEC lists class shares with a dash (BRK-B); users often type BRK.B
+    return ticker.strip().upper().replace(".", "-")
+
+
+class CikIndex:
+    """
+    Lazily loaded ticker -> CIK map persisted as a compact TSV.
+
+    The TSV (`TICKER\\tCIK` per line) is rebuilt from `company_tickers.json`
+    when older than `max_age_days`. The source is either a local file
+    (`source_path`, e.g. a fixture or a pre-downloaded copy) or the SEC URL,
+    fetched through `fetch(url) -> str` so the provider's rate limiter and
+    connection pool apply. If a refresh fails, the stale index is kept.
+
+    Args:
+        path: TSV location
+        fetch: Callable returning the body of COMPANY_TICKERS_URL
+        source_path: Local company_tickers.json to build from instead of fetching
+        max_age_days: Rebuild the TSV once it is older than this
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fetch: Optional[Callable[[str], str]] = None,
+        source_path: Optional[Path] = None,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.path = Path(path)
+        self.fetch = fetch
+        self.source_path = Path(source_path) if source_path else None
+        self.max_age = max_age_days * 86400
+        self._map: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, fetch: Optional[Callable[[str], str]] = None) -> "CikIndex":
+        """Index under WORKSPACE_ABS_PATH/.cache/sec; SEC_TICKERS_FILE overrides the source."""
+        source = os.getenv("SEC_TICKERS_FILE")
+        return cls(workspace_cache_dir("sec") / "company_tickers.tsv", fetch=fetch,
+                   source_path=Path(source) if source else None)
+
+    # ---- Build / persist ----
+
+    def _is_stale(self) -> bool:
+        try:
+            return time.time() - self.path.stat().st_mtime > self.max_age
+        except OSError:
+            return True
+
+    def _read_source(self) -> str:
+        if self.source_path is not None:
+            return self.source_path.read_text(encoding="utf-8")
+        if self.fetch is None:
+            raise ValueError("No company_tickers.json source configured")
+        return self.fetch(COMPANY_TICKERS_URL)
+
+    @staticmethod
+    def parse(payload: str) -> Dict[str, str]:
+        """Map tickers to 10-digit CIKs from company_tickers.json content."""
+        data = json.loads(payload)
+        rows = data.values() if isinstance(data, dict) else data
+        return {
+            _normalize(row["ticker"]): f"{int(row['cik_str']):010d}"
+            for row in rows
+            if row.get("ticker") and row.get("cik_str") is not None
+        }
+
+    def _save(self, mapping: Dict[str, str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(f"{t}\t{int(c)}\n" for t, c in sorted(mapping.items()))
+        os.replace(tmp, self.path)
+
+    def _load_tsv(self) -> Dict[str, str]:
+        mapping = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                ticker, _, cik = line.rstrip("\n").partition("\t")
+                if cik:
+                    mapping[ticker] = f"{int(cik):010d}"
+        return mapping
+
+    def refresh(self) -> Dict[str, str]:
+        """Rebuild the TSV from the source and reload it."""
+        mapping = self.parse(self._read_source())
+        self._save(mapping)
+        self._map = mapping
+        return mapping
+
+    def _ensure_loaded(self) -> Dict[str, str]:
+        with self._lock:
+            if self._map is not None:
+                return self._map
+            if self._is_stale():
+                try:
+                    return self.refresh()
+                except Exception:
+                    if not self.path.exists():
+                        raise
+            self._map = self._load_tsv()
+            return self._map
+
+    # ---- Lookup ----
+
+    def lookup(self, ticker: str) -> Optional[str]:
+        """10-digit CIK for `ticker`, or None if SEC doesn't list it."""
+        return self._ensure_loaded().get(_normalize(ticker))
+
+    def __len__(self) -> int:
+        return len(self._ensure_loaded())
@@ -2,18 +2,24 @@
 from __future__ import annotations
 import os
 import re
-import time
+import codecs
 import json
+from functools import partial
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Iterator, Optional, List, Dict
 from datetime import datetime
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError
 
 from .types import SecFilingMeta, SecExhibit
+from .cik_index import CikIndex
+from .sgml import SgmlDocument, split_submission
+from src.providers.http import HttpTransport, default_transport
+from src.providers.ratelimit import FileTokenBucket
+from src.util.filelock import FileLock
+from src.util.filing_index import SentenceIndex, WordIndex
+from src.util.filing_sections import SectionIndex
 from src.domain.models import FilingRef, Provenance
 from src.util.filings_processor import (
-    clean_html_artifacts,
+    HtmlToText,
     extract_mda,
     extract_business,
     extract_risk_factors,
@@ -22,38 +28,49 @@ from src.util.filings_processor import (
     extract_rd_content,
     extract_keyword_context,
     extract_regex_context,
+    rank_passages,
 )
 
+# The cover page ("UNITED STATES SECURITIES AND EXCHANGE COMMISSION") is
+# expected within this much leading text; otherwise keep everything
+_COVER_LOOKAHEAD = 256 * 1024
+
 
 class SecProvider:
     """Typed wrapper around SEC EDGAR API."""
 
-    def __init__(self, user_agent: Optional[str] = None):
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        transport: Optional[HttpTransport] = None,
+        rate_limiter: Optional[FileTokenBucket] = None,
+        cik_index: Optional[CikIndex] = None,
+    ):
         self.user_agent = user_agent or "claude-finance/1.0 (contact@example.com)"
         self.workspace = Path(
             os.getenv("WORKSPACE_ABS_PATH", "./runtime/workspace")
         ).resolve()
+        self.transport = transport or default_transport()
+        # SEC allows ~10 req/s per host, shared by every process on this machine
+        self.rate_limiter = rate_limiter or FileTokenBucket.for_sec()
+        self.cik_index = cik_index or CikIndex.from_env(fetch=self._https_get)
 
     def _https_get(self, url: str) -> str:
-        """Fetch URL with proper headers and rate limiting."""
-        req = Request(url, headers={"User-Agent": self.user_agent})
-
-        # SEC rate limit: ~10 req/sec
-        time.sleep(0.15)
-
-        with urlopen(req) as response:
-            if response.getcode() in (301, 302):
-                return self._https_get(response.getheader("Location"))
+        """Fetch URL with proper headers and rate limiting (redirects handled by transport)."""
+        self.rate_limiter.acquire()
 
-            if response.getcode() >= 400:
-                raise HTTPError(
-                    url, response.getcode(), f"HTTP {response.getcode()}", {}, None
-                )
-
-            return response.read().decode("utf-8")
+        response = self.transport.get(url, headers={"User-Agent": self.user_agent})
+        return response.text()
 
     def _get_cik(self, ticker: str) -> str:
-        """Get CIK from ticker symbol."""
+        """Get CIK from ticker symbol (local index first, browse-edgar as fallback)."""
+        try:
+            cik = self.cik_index.lookup(ticker)
+        except Exception:
+            cik = None  # index unavailable (offline, no source); ask EDGAR directly
+        if cik:
+            return cik
+
         url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={ticker}&type=&dateb=&owner=exclude&count=1&output=atom"
         data = self._https_get(url)
 
@@ -83,94 +100,179 @@ class SecProvider:
             form_type=form_type,
         )
 
-    def _download_filing_content(self, cik: str, accession: str) -> str:
-        """Download raw filing content."""
+    def _https_stream(self, url: str) -> Iterator[bytes]:
+        """Stream URL body in chunks (one rate-limiter token per request)."""
+        self.rate_limiter.acquire()
+        yield from self.transport.stream(url, headers={"User-Agent": self.user_agent})
+
+    def _download_filing(self, cik: str, accession: str, filing_dir: Path) -> List[SgmlDocument]:
+        """Stream the submission to raw.txt, splitting documents into documents/."""
         acc_no_hyphens = accession.replace("-", "")
         txt_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{acc_no_hyphens}/{accession}.txt"
 
-        return self._https_get(txt_url)
-
-    def _extract_primary_document(self, raw_content: str, form_type: str) -> str:
-        """Extract the primary document from raw filing, stripping HTML."""
-        # Try to find the primary document section matching form type
-        pattern = rf"<DOCUMENT>.*?<TYPE>{form_type}.*?</DOCUMENT>"
-        document_match = re.search(pattern, raw_content, re.DOTALL)
-        
-        if not document_match:
-            # Fall back to first document
-            document_match = re.search(r"<DOCUMENT>.*?</DOCUMENT>", raw_content, re.DOTALL)
-        
-        if not document_match:
-            return raw_content
-        
-        document_content = document_match.group(0)
-        
-        # Remove HTML tags for cleaner text
-        text = re.sub(r"<[^>]+>", " ", document_content)
-        
-        # Clean up artifacts
-        text = clean_html_artifacts(text)
-        
-        # Look for "UNITED STATES" header and start from there
-        index = text.lower().find("united states")
-        if index != -1:
-            text = "UNITED STATES" + text[index + len("united states"):]
-        
-        return text
-
-    def _extract_exhibits(self, content: str, limit: int = 25) -> list[SecExhibit]:
-        """Extract exhibit metadata from filing content."""
-        exhibits = []
-        doc_matches = re.finditer(r"<DOCUMENT>([\s\S]*?)</DOCUMENT>", content)
-
-        for i, match in enumerate(doc_matches):
-            if i >= limit:
-                break
-
-            doc_content = match.group(1)
-            type_match = re.search(r"<TYPE>([^\n]+)", doc_content)
-            seq_match = re.search(r"<SEQUENCE>([^\n]+)", doc_content)
-            filename_match = re.search(r"<FILENAME>([^\n]+)", doc_content)
-
-            if type_match:
-                exhibits.append(
-                    SecExhibit(
-                        sequence=seq_match.group(1).strip() if seq_match else str(i + 1),
-                        type=type_match.group(1).strip(),
-                        filename=filename_match.group(1).strip()
-                        if filename_match
-                        else f"doc_{i + 1}.txt",
-                    )
-                )
-
-        return exhibits
-
-    def get_latest_filing(
-        self, ticker: str, form_type: str = "10-K", exhibit_limit: int = 25
-    ) -> FilingRef:
-        """Fetch latest filing and return typed reference with local paths."""
-        # Normalize form type
+        with open(filing_dir / "raw.txt", "wb") as raw:
+            return split_submission(self._https_stream(txt_url), filing_dir / "documents", raw=raw)
+
+    @staticmethod
+    def _primary_document(documents: List[SgmlDocument], form_type: str) -> Optional[SgmlDocument]:
+        """The document whose TYPE matches the form (first document as fallback)."""
+        for doc in documents:
+            if doc.type.upper().startswith(form_type) and doc.path:
+                return doc
+        return next((d for d in documents if d.path), None)
+
+    @staticmethod
+    def _clean_text_chunks(document: Optional[SgmlDocument]) -> Iterator[str]:
+        """Primary document body converted to text, 1 MB of HTML at a time."""
+        if document is None:
+            return
+        converter = HtmlToText()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with open(document.path, "rb") as src:
+            for chunk in iter(lambda: src.read(1 << 20), b""):
+                yield converter.feed(decoder.decode(chunk))
+        yield converter.feed(decoder.decode(b"", final=True)) + converter.close()
+
+    def _write_clean_text(self, document: Optional[SgmlDocument], clean_path: Path) -> None:
+        """Stream the primary document's text into clean.txt, starting at the cover page."""
+        located = False
+        buffered = ""
+        with open(clean_path, "w", encoding="utf-8") as out:
+            for text in self._clean_text_chunks(document):
+                if located:
+                    out.write(text)
+                    continue
+                # Look for "UNITED STATES" header and start from there
+                buffered += text
+                index = buffered.lower().find("united states")
+                if index != -1:
+                    out.write("UNITED STATES" + buffered[index + len("united states"):])
+                    located = True
+                elif len(buffered) > _COVER_LOOKAHEAD:
+                    out.write(buffered)
+                    located = True
+            if not located:
+                out.write(buffered)
+
+    # ---- Local filing store ----
+
+    @staticmethod
+    def _normalize_form(form_type: str) -> tuple[str, str]:
+        """Return (compact, display) form names, e.g. ("10K", "10-K")."""
         form_type = form_type.upper().replace("-", "")
         if form_type not in ["10K", "10Q", "8K", "20F", "40F"]:
             raise ValueError(
                 f"Invalid form type: {form_type}. Use 10-K, 10-Q, 8-K, 20-F, or 40-F"
             )
-
-        # Add hyphen back for display
         display_form = (
             form_type[:2] + "-" + form_type[2:] if len(form_type) > 2 else form_type
         )
+        return form_type, display_form
+
+    def _manifest_path(self, ticker: str) -> Path:
+        return self.workspace / "data" / "sec" / ticker / "manifest.json"
+
+    def load_manifest(self, ticker: str) -> Dict[str, List[Dict]]:
+        """All filings downloaded for `ticker`, by display form, newest first."""
+        try:
+            return json.loads(self._manifest_path(ticker).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _record_in_manifest(self, ticker: str, metadata: Dict, filing_dir: Path) -> None:
+        path = self._manifest_path(ticker)
+        with FileLock(path.with_suffix(".json.lock")):
+            manifest = self.load_manifest(ticker)
+            entries = [
+                e for e in manifest.get(metadata["form"], [])
+                if e["accession"] != metadata["accession"]
+            ]
+            entries.append({
+                "accession": metadata["accession"],
+                "filing_date": metadata["filing_date"],
+                "dir": str(filing_dir),
+                "downloaded_at": metadata["downloaded_at"],
+                "exhibit_count": metadata["exhibit_count"],
+            })
+            entries.sort(key=lambda e: (e["filing_date"], e["accession"]), reverse=True)
+            manifest[metadata["form"]] = entries
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+
+    def _stored_filing(self, filing_dir: Path, accession: Optional[str] = None) -> Optional[Dict]:
+        """metadata.json of a complete local copy (matching `accession` if given)."""
+        try:
+            metadata = json.loads((filing_dir / "metadata.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if accession and metadata.get("accession") != accession:
+            return None
+        for name in ("raw.txt", "clean.txt", "exhibits/index.json"):
+            if not (filing_dir / name).exists():
+                return None
+        return metadata
+
+    def _filing_ref(self, metadata: Dict, filing_dir: Path, cache_hit: bool, wait_ms: int = 0) -> FilingRef:
+        return FilingRef(
+            ticker=metadata["ticker"],
+            form=metadata["form"],
+            filing_date=metadata["filing_date"],
+            accession=metadata["accession"],
+            cik=metadata["cik"],
+            main_text_path=str(filing_dir / "clean.txt"),  # Use cleaned text by default
+            exhibits_index_path=str(filing_dir / "exhibits" / "index.json"),
+            provenance=Provenance(
+                source="SEC EDGAR",
+                fetched_at=metadata["downloaded_at"] if cache_hit else datetime.utcnow().isoformat(),
+                meta={
+                    "CIK": metadata["cik"],
+                    "accession": metadata["accession"],
+                    "rate_limited": True,
+                    "rate_limit_wait_ms": wait_ms,
+                    "cache_hit": cache_hit,
+                    "raw_path": str(filing_dir / "raw.txt"),
+                    "clean_path": str(filing_dir / "clean.txt"),
+                },
+            ),
+        )
+
+    def latest_known_filing(self, ticker: str, form_type: str = "10-K") -> Optional[FilingRef]:
+        """Newest filing of this form already on disk, without touching the network."""
+        _, display_form = self._normalize_form(form_type)
+        for entry in self.load_manifest(ticker).get(display_form, []):
+            metadata = self._stored_filing(Path(entry["dir"]), entry["accession"])
+            if metadata:
+                return self._filing_ref(metadata, Path(entry["dir"]), cache_hit=True)
+        return None
+
+    def get_latest_filing(
+        self, ticker: str, form_type: str = "10-K", exhibit_limit: int = 25, refresh: bool = True
+    ) -> FilingRef:
+        """
+        Fetch latest filing and return typed reference with local paths.
+
+        Filings are stored per accession; if the latest accession is already on
+        disk the existing copy is returned without downloading it again. With
+        `refresh=False` the newest filing in the local manifest is returned
+        without asking EDGAR at all (falling back to a fetch if none is known).
+        """
+        form_type, display_form = self._normalize_form(form_type)
+
+        if not refresh:
+            known = self.latest_known_filing(ticker, display_form)
+            if known:
+                return known
+
+        wait_ms_before = self.rate_limiter.stats["wait_ms"]
+
+        def waited() -> int:
+            return int(self.rate_limiter.stats["wait_ms"] - wait_ms_before)
 
         # Get CIK and filing metadata
         cik = self._get_cik(ticker)
         filing_meta = self._get_latest_filing_meta(cik, display_form)
 
-        # Download content
-        content = self._download_filing_content(cik, filing_meta.accession)
-
-        # Extract exhibits
-        exhibits = self._extract_exhibits(content, exhibit_limit)
-
         # Create directory structure
         normalized_form = form_type.lower()
         filing_dir = (
@@ -181,24 +283,47 @@ class SecProvider:
             / filing_meta.filing_date
             / normalized_form
         )
+
+        # Already downloaded this accession: reuse it
+        stored = self._stored_filing(filing_dir, filing_meta.accession)
+        if stored:
+            known = self.load_manifest(ticker).get(display_form, [])
+            if not any(e["accession"] == filing_meta.accession for e in known):
+                self._record_in_manifest(ticker, stored, filing_dir)  # pre-manifest download
+            return self._filing_ref(stored, filing_dir, cache_hit=True, wait_ms=waited())
+
+        # Drop stale metadata first so a half-written copy is never mistaken for complete
+        meta_path = filing_dir / "metadata.json"
+        meta_path.unlink(missing_ok=True)
+
+        # Stream the submission: raw.txt plus one file per <DOCUMENT> block
         exhibits_dir = filing_dir / "exhibits"
         exhibits_dir.mkdir(parents=True, exist_ok=True)
+        documents = self._download_filing(cik, filing_meta.accession, filing_dir)
+
+        exhibits = [
+            SecExhibit(
+                sequence=doc.sequence or str(i + 1),
+                type=doc.type,
+                filename=doc.filename or f"doc_{i + 1}.txt",
+                description=doc.description or None,
+                path=str(doc.path) if doc.path else None,
+            )
+            for i, doc in enumerate(documents[:exhibit_limit])
+            if doc.type
+        ]
 
-        # Save raw document
-        raw_path = filing_dir / "raw.txt"
-        raw_path.write_text(content, encoding="utf-8")
-
-        # Extract and save cleaned primary document
-        clean_text = self._extract_primary_document(content, display_form)
+        # Clean only the primary document
         clean_path = filing_dir / "clean.txt"
-        clean_path.write_text(clean_text, encoding="utf-8")
+        self._write_clean_text(self._primary_document(documents, display_form), clean_path)
+        WordIndex.for_file(clean_path)  # clean.words.idx, reused by every search
 
         # Save exhibits index
         exhibits_index_path = exhibits_dir / "index.json"
         exhibits_data = [e.model_dump() for e in exhibits]
         exhibits_index_path.write_text(json.dumps(exhibits_data, indent=2))
 
-        # Save metadata
+        # Save metadata last: its presence marks the copy as complete
         metadata = {
             "ticker": ticker,
             "cik": cik,
@@ -207,30 +332,12 @@ class SecProvider:
             "accession": filing_meta.accession,
             "downloaded_at": datetime.utcnow().isoformat(),
             "exhibit_count": len(exhibits),
+            "document_count": len(documents),
         }
-        meta_path = filing_dir / "metadata.json"
         meta_path.write_text(json.dumps(metadata, indent=2))
+        self._record_in_manifest(ticker, metadata, filing_dir)
 
-        return FilingRef(
-            ticker=ticker,
-            form=display_form,
-            filing_date=filing_meta.filing_date,
-            accession=filing_meta.accession,
-            cik=cik,
-            main_text_path=str(clean_path),  # Use cleaned text by default
-            exhibits_index_path=str(exhibits_index_path),
-            provenance=Provenance(
-                source="SEC EDGAR",
-                fetched_at=datetime.utcnow().isoformat(),
-                meta={
-                    "CIK": cik,
-                    "accession": filing_meta.accession,
-                    "rate_limited": True,
-                    "raw_path": str(raw_path),
-                    "clean_path": str(clean_path),
-                },
-            ),
-        )
+        return self._filing_ref(metadata, filing_dir, cache_hit=False, wait_ms=waited())
 
     def extract_sections(
         self,
@@ -248,17 +355,23 @@ class SecProvider:
         if sections is None:
             sections = ["mda", "business", "risk_factors"]
         
-        # Read the clean text
-        text = Path(filing_ref.main_text_path).read_text(encoding="utf-8")
+        # Read the clean text; Item sections are slices located by clean.sections.json,
+        # topic matches are placed in sentences via clean.sentences.idx
+        text_path = Path(filing_ref.main_text_path)
+        text = text_path.read_text(encoding="utf-8")
+        index = SectionIndex.for_file(text_path, text)
+        sentences = None
+        if {"ai_content", "rd_content"} & set(sections):
+            sentences = SentenceIndex.for_file(text_path, text)
         
         result = {}
         section_extractors = {
-            "mda": extract_mda,
-            "business": extract_business,
-            "risk_factors": extract_risk_factors,
-            "financial_statements": extract_financial_statements,
-            "ai_content": extract_ai_content,
-            "rd_content": extract_rd_content,
+            "mda": partial(extract_mda, sections=index),
+            "business": partial(extract_business, sections=index),
+            "risk_factors": partial(extract_risk_factors, sections=index),
+            "financial_statements": partial(extract_financial_statements, sections=index),
+            "ai_content": partial(extract_ai_content, sentences=sentences),
+            "rd_content": partial(extract_rd_content, sentences=sentences),
         }
         
         for section in sections:
@@ -285,8 +398,10 @@ class SecProvider:
         :param post_window: Words to include after each match
         :return: Merged snippets of context around matches
         """
-        text = Path(filing_ref.main_text_path).read_text(encoding="utf-8")
-        return extract_keyword_context(text, keywords, pre_window, post_window)
+        text_path = Path(filing_ref.main_text_path)
+        text = text_path.read_text(encoding="utf-8")
+        index = WordIndex.for_file(text_path, text)
+        return extract_keyword_context(text, keywords, pre_window, post_window, index=index)
 
     def search_regex(
         self,
@@ -306,9 +421,40 @@ class SecProvider:
         :param snippet_min_words: Minimum words in snippet
         :return: List of context snippets around matches
         """
-        text = Path(filing_ref.main_text_path).read_text(encoding="utf-8")
+        text_path = Path(filing_ref.main_text_path)
+        text = text_path.read_text(encoding="utf-8")
+        index = WordIndex.for_file(text_path, text)
         return extract_regex_context(
-            text, pattern, pre_window, post_window, snippet_min_words=snippet_min_words
+            text, pattern, pre_window, post_window, snippet_min_words=snippet_min_words, index=index
+        )
+
+    def search_ranked(
+        self,
+        filing_ref: FilingRef,
+        keywords: List[str],
+        passage_words: int = 200,
+        max_words: int = 2000,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict:
+        """
+        Rank passages for keyword phrases with BM25 and keep the best within a budget.
+        
+        :param filing_ref: FilingRef object from get_latest_filing
+        :param keywords: Query phrases (whole words, case-insensitive)
+        :param passage_words: Words per passage
+        :param max_words: Word budget for all passages together
+        :param max_tokens: Token budget (the tighter of the two applies)
+        :param top_k: Maximum number of passages
+        :return: Dict with passages (document order) and filing_words
+        """
+        text_path = Path(filing_ref.main_text_path)
+        text = text_path.read_text(encoding="utf-8")
+        index = WordIndex.for_file(text_path, text)
+        passages = rank_passages(
+            text, keywords, passage_words=passage_words, max_words=max_words,
+            max_tokens=max_tokens, top_k=top_k, index=index,
         )
+        return {"passages": passages, "filing_words": len(index)}
 
 
@@ -0,0 +1,156 @@
+"""Streaming splitter for EDGAR SGML submissions (`<accession>.txt`)."""
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+_TEXT_END = b"</TEXT>"
+_HEADER_TAGS = {b"TYPE": "type", b"SEQUENCE": "sequence", b"FILENAME": "filename", b"DESCRIPTION": "description"}
+_HEADER_RE = re.compile(rb"^<(TYPE|SEQUENCE|FILENAME|DESCRIPTION)>(.*)$")
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# A header line longer than this is garbage; drop it rather than grow the buffer
+_MAX_LINE = 1024 * 1024
+
+
+@dataclass
+class SgmlDocument:
+    """One `<DOCUMENT>` block of a submission, with its body written to `path`."""
+    type: str = ""
+    sequence: str = ""
+    filename: str = ""
+    description: str = ""
+    path: Optional[Path] = None
+    bytes: int = 0
+
+
+class SgmlSplitter:
+    """
+    Incremental one-pass splitter: feed() response chunks, close() for the result.
+
+    Outside `<TEXT>` the input is handled line by line (headers are short);
+    inside, the buffer is scanned only for `</TEXT>` and everything before
+    it is written straight to the document file, so memory stays bounded
+    by the chunk size no matter how large the submission is. Every byte is
+    also copied to `raw` when given.
+
+    Args:
+        out_dir: Directory for per-document bodies (`<sequence>-<filename>`)
+        raw: Optional binary file receiving the untouched submission
+    """
+
+    def __init__(self, out_dir: Path, raw: Optional[BinaryIO] = None):
+        self.out_dir = Path(out_dir)
+        self.raw = raw
+        self.documents: List[SgmlDocument] = []
+        self._buf = b""
+        self._state = "outside"  # outside | header | text
+        self._doc: Optional[SgmlDocument] = None
+        self._out: Optional[BinaryIO] = None
+
+    def feed(self, chunk: bytes) -> None:
+        if self.raw is not None:
+            self.raw.write(chunk)
+        self._buf += chunk
+        self._drain(final=False)
+
+    def close(self) -> List[SgmlDocument]:
+        """Flush what's left (tolerating a truncated last document) and return all documents."""
+        self._drain(final=True)
+        if self._state == "text":
+            self._write(self._buf)
+            self._buf = b""
+        self._end_document()
+        return self.documents
+
+    # ---- State machine ----
+
+    def _drain(self, final: bool) -> None:
+        buf, pos = self._buf, 0  # walk with an offset; slice the buffer once at the end
+        while True:
+            if self._state == "text":
+                end = buf.find(_TEXT_END, pos)
+                if end < 0:
+                    # Keep a tail that might be the start of a split "</TEXT>"
+                    keep = 0 if final else len(_TEXT_END) - 1
+                    cut = max(pos, len(buf) - keep)
+                    self._write(buf[pos:cut])
+                    pos = cut
+                    break
+                self._write(buf[pos:end])
+                pos = end + len(_TEXT_END)
+                self._close_body()
+                self._state = "outside"
+                continue
+
+            nl = buf.find(b"\n", pos)
+            if nl < 0:
+                if not final or pos >= len(buf):
+                    if len(buf) - pos > _MAX_LINE:
+                        pos = len(buf)
+                    break
+                nl = len(buf)
+            start, pos = pos, nl + 1
+            if self._line(buf[start:nl].rstrip(b"\r")):
+                # Body may start on the <TEXT> line itself
+                body = buf.find(b"<TEXT>", start, nl) + len(b"<TEXT>")
+                if buf[body:nl].strip():
+                    pos = body
+        self._buf = buf[pos:]
+
+    def _line(self, line: bytes) -> bool:
+        """Handle one line outside a body; True when a `<TEXT>` body starts."""
+        stripped = line.strip()
+        if stripped == b"<DOCUMENT>":
+            self._end_document()
+            self._doc = SgmlDocument()
+            self._state = "header"
+        elif stripped == b"</DOCUMENT>":
+            self._end_document()
+            self._state = "outside"
+        elif self._state == "header":
+            if stripped.startswith(b"<TEXT>"):
+                self._open_body()
+                self._state = "text"
+                return True
+            match = _HEADER_RE.match(stripped)
+            if match:
+                value = match.group(2).decode("utf-8", "replace").strip()
+                setattr(self._doc, _HEADER_TAGS[match.group(1)], value)
+        return False
+
+    # ---- Document bodies ----
+
+    def _open_body(self) -> None:
+        doc = self._doc
+        index = len(self.documents) + 1
+        name = doc.filename or f"doc_{index}.txt"
+        safe = _UNSAFE_NAME_RE.sub("_", f"{doc.sequence or index}-{name}")
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        doc.path = self.out_dir / safe
+        self._out = open(doc.path, "wb")
+
+    def _write(self, data: bytes) -> None:
+        if self._out is not None and data:
+            self._out.write(data)
+            self._doc.bytes += len(data)
+
+    def _close_body(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def _end_document(self) -> None:
+        self._close_body()
+        if self._doc is not None:
+            self.documents.append(self._doc)
+            self._doc = None
+
+
+def split_submission(chunks, out_dir: Path, raw: Optional[BinaryIO] = None) -> List[SgmlDocument]:
+    """Split an iterable of byte chunks into documents under `out_dir`."""
+    splitter = SgmlSplitter(out_dir, raw=raw)
+    for chunk in chunks:
+        splitter.feed(chunk)
+    return splitter.close()
@@ -17,5 +17,7 @@ class SecExhibit(BaseModel):
     sequence: str
     type: str
     filename: str
+    description: Optional[str] = None
+    path: Optional[str] = None  # extracted document body on disk
 
 
@@ -0,0 +1,169 @@
+"""Size-bounded on-disk JSON cache with per-entry expiry and LRU eviction."""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .filelock import FileLock
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable hex digest for any JSON-serializable key parts."""
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    One JSON file per entry under `root`, sharded by key prefix.
+
+    Entries carry an absolute `expires_at` (None = never). Reads touch the
+    file mtime, so eviction (oldest mtime first) approximates LRU. Writes are
+    atomic (temp file + rename), so concurrent CLI processes can share a root.
+    The running total size is kept in `root/size` (file-locked), so a process
+    doesn't walk the directory before its first write; eviction rescans and
+    corrects it.
+
+    Args:
+        root: Cache directory
+        max_bytes: Total size budget; exceeding it evicts down to 90%
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._size_lock = FileLock(self.root / "size.lock")
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _read_size(self) -> Optional[int]:
+        try:
+            return int((self.root / "size").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, size: int) -> None:
+        (self.root / "size").write_text(str(max(0, size)))
+
+    def size(self) -> int:
+        """Total bytes of stored entries (running total)."""
+        with self._size_lock:
+            size = self._read_size()
+            return self._scan_size() if size is None else size
+
+    def _adjust_size(self, delta: int) -> int:
+        """Add `delta` bytes (already on disk) to the running total and return it."""
+        with self._size_lock:
+            size = self._read_size()
+            # No total yet (new or pre-existing root): one scan, which already sees the change
+            size = self._scan_size() if size is None else max(0, size + delta)
+            self._write_size(size)
+        return size
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        self._adjust_size(-size)
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[stat] += n
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, or `default` if missing or expired."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count("misses")
+            return default
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(path)
+            self._count("misses")
+            return default
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        self._count("hits")
+        return entry["value"]
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the raw entry (value, stored_at, expires_at, meta) without touching stats."""
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store a value; `ttl` seconds from now or an absolute `expires_at`."""
+        now = time.time()
+        if expires_at is None and ttl is not None:
+            expires_at = now + ttl
+        entry = {"stored_at": now, "expires_at": expires_at, "meta": meta or {}, "value": value}
+        data = json.dumps(entry, default=str).encode("utf-8")
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        self._count("stores")
+        if self._adjust_size(len(data) - replaced) > self.max_bytes:
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    def _entries(self):
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under 90% of the budget."""
+        with self._size_lock:
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            evicted = 0
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+            self._write_size(total)
+        self._count("evictions", evicted)
@@ -0,0 +1,419 @@
+"""Paragraph-level diff of two filings (or filing sections), aligned by Item."""
+from __future__ import annotations
+import re
+import hashlib
+from collections import Counter
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.util.filing_index import SENTENCE_BREAK_RE
+from src.util.filing_sections import SECTION_TITLES, SectionIndex
+
+# Paragraphs longer than this (e.g. whitespace-collapsed section files) are
+# compared sentence by sentence instead
+_MAX_PARAGRAPH_WORDS = 400
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_BULLET_RE = re.compile(r"^(?:[-|] )+")
+# Removed/added paragraphs within one changed block are paired only with
+# counterparts near the same relative position
+_PAIR_WINDOW = 25
+_MIN_SECTION_CHARS = 100
+
+DEFAULT_MIN_SIMILARITY = 0.5
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Non-empty lines of `text`, whitespace-collapsed; over-long ones split into sentences.
+
+    Lines without a letter (page numbers, table rules) are dropped so page
+    breaks that move between years don't show up as changes.
+    """
+    paragraphs = []
+    for line in text.splitlines():
+        words = line.split()
+        if not words:
+            continue
+        parts = SENTENCE_BREAK_RE.split(line) if len(words) > _MAX_PARAGRAPH_WORDS else [line]
+        for part in parts:
+            part = " ".join(part.split())
+            if part and _LETTER_RE.search(part):
+                paragraphs.append(part)
+    return paragraphs
+
+
+def paragraph_hash(paragraph: str) -> bytes:
+    """Hash of the normalized paragraph: case, spacing and leading bullets ignored."""
+    normalized = _BULLET_RE.sub("", " ".join(paragraph.lower().split()))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+
+def similarity(a: str, b: str) -> float:
+    """Dice coefficient of the two paragraphs' word multisets (0..1)."""
+    return _dice(_bag(a), _bag(b))
+
+
+def _bag(paragraph: str) -> Tuple[Counter, int]:
+    words = paragraph.lower().split()
+    return Counter(words), len(words)
+
+
+def _dice(a: Tuple[Counter, int], b: Tuple[Counter, int]) -> float:
+    (counts_a, n_a), (counts_b, n_b) = a, b
+    if not n_a or not n_b:
+        return 0.0
+    common = sum((counts_a & counts_b).values())
+    return 2 * common / (n_a + n_b)
+
+
+def _pair_block(
+    removed: List[Tuple[int, str]],
+    added: List[Tuple[int, str]],
+    min_similarity: float,
+) -> List[Tuple[int, int, float]]:
+    """(removed pos, added pos, similarity) pairs: each removed paragraph's best match nearby."""
+    pairs = []
+    used = set()
+    added_bags = [_bag(after) for _, after in added]
+    for r, (_, before) in enumerate(removed):
+        bag = _bag(before)
+        centre = r * len(added) // max(len(removed), 1)
+        best, best_score = None, min_similarity
+        for a in range(max(0, centre - _PAIR_WINDOW), min(len(added), centre + _PAIR_WINDOW + 1)):
+            if a in used:
+                continue
+            # Dice can't exceed the word-count ratio bound; skip the multiset intersection
+            shorter, longer = sorted((bag[1], added_bags[a][1]))
+            if not longer or 2 * shorter / (shorter + longer) < best_score:
+                continue
+            score = _dice(bag, added_bags[a])
+            if score >= best_score:
+                best, best_score = a, score
+        if best is not None:
+            used.add(best)
+            pairs.append((r, best, best_score))
+    return pairs
+
+
+def _anchors(a: Sequence[bytes], b: Sequence[bytes], a0: int, a1: int, b0: int, b1: int) -> List[Tuple[int, int]]:
+    """Longest in-order chain of items that occur exactly once in both a[a0:a1] and b[b0:b1]."""
+    seen_a: Dict[bytes, int] = {}
+    for i in range(a0, a1):
+        seen_a[a[i]] = -1 if a[i] in seen_a else i
+    seen_b: Dict[bytes, int] = {}
+    for j in range(b0, b1):
+        if seen_a.get(b[j], -1) >= 0:
+            seen_b[b[j]] = -1 if b[j] in seen_b else j
+    pairs = sorted((seen_a[h], j) for h, j in seen_b.items() if j >= 0)
+    # Longest increasing subsequence of the b positions (patience sorting)
+    tails: List[int] = []
+    tail_at: List[int] = []
+    back: List[int] = []
+    for n, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        back.append(tail_at[k - 1] if k else -1)
+        if k == len(tails):
+            tails.append(j)
+            tail_at.append(n)
+        else:
+            tails[k], tail_at[k] = j, n
+    chain = []
+    n = tail_at[-1] if tail_at else -1
+    while n >= 0:
+        chain.append(pairs[n])
+        n = back[n]
+    return chain[::-1]
+
+
+def align(a: Sequence[bytes], b: Sequence[bytes]) -> List[Tuple[str, int, int, int, int]]:
+    """
+    difflib-style opcodes ("equal", "replace", "delete", "insert") aligning `a` to `b`.
+
+    Patience alignment: items unique to both sides anchor the match, common
+    prefixes and suffixes extend each anchor, and the gaps between anchors
+    are aligned the same way with uniqueness counted within the gap. Every
+    level is a linear pass plus an O(n log n) chain search, so repeated
+    boilerplate ("Table of Contents") can't blow up the cost the way it can
+    with difflib's longest-match search.
+    """
+    opcodes: List[Tuple[str, int, int, int, int]] = []
+
+    def emit(tag: str, i1: int, i2: int, j1: int, j2: int) -> None:
+        if i1 == i2 and j1 == j2:
+            return
+        if opcodes and (opcodes[-1][0] == tag or "equal" not in (tag, opcodes[-1][0])):
+            # Adjacent changes form one block, so removed/added text can be paired
+            _, p1, _, q1, _ = opcodes[-1]
+            if tag != "equal":
+                tag = "replace" if p1 < i2 and q1 < j2 else "delete" if p1 < i2 else "insert"
+            opcodes[-1] = (tag, p1, i2, q1, j2)
+        else:
+            opcodes.append((tag, i1, i2, j1, j2))
+
+    # Work items: ("align", a0, a1, b0, b1) or ("equal", ...) for a deferred suffix
+    stack = [("align", 0, len(a), 0, len(b))]
+    while stack:
+        tag, a0, a1, b0, b1 = stack.pop()
+        if tag == "equal":
+            emit(tag, a0, a1, b0, b1)
+            continue
+        prefix_a, prefix_b = a0, b0
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0, b0 = a0 + 1, b0 + 1
+        emit("equal", prefix_a, a0, prefix_b, b0)
+        suffix_a, suffix_b = a1, b1
+        while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+            a1, b1 = a1 - 1, b1 - 1
+
+        chain = _anchors(a, b, a0, a1, b0, b1) if a0 < a1 and b0 < b1 else []
+        if not chain:
+            emit("replace" if a0 < a1 and b0 < b1 else "delete" if a0 < a1 else "insert", a0, a1, b0, b1)
+            emit("equal", a1, suffix_a, b1, suffix_b)
+            continue
+        # Each anchor starts the next gap's common prefix; push right to left
+        stack.append(("equal", a1, suffix_a, b1, suffix_b))
+        bounds = [(a0, b0)] + chain + [(a1, b1)]
+        for (i1, j1), (i2, j2) in reversed(list(zip(bounds, bounds[1:]))):
+            stack.append(("align", i1, i2, j1, j2))
+    return opcodes
+
+
+def diff_paragraphs(
+    paragraphs_a: List[str],
+    paragraphs_b: List[str],
+    min_similarity: float = DEFAULT_MIN_SIMILARITY,
+) -> Dict:
+    """
+    Align two paragraph lists by hash and classify what changed.
+
+    The hash sequences are aligned with `align()`. Inside each changed
+    block a paragraph whose hash occurs on the other side too is `moved`;
+    a removed paragraph is otherwise paired with the most similar nearby
+    added one (`modified`, if at least `min_similarity`), and whatever is
+    left is `removed` / `added`.
+
+    Args:
+        paragraphs_a: Paragraphs of the old document
+        paragraphs_b: Paragraphs of the new document
+        min_similarity: Lowest word similarity that still counts as a modification
+
+    Returns:
+        Dict with counts (unchanged, added, removed, modified, moved),
+        similarity (0..1) and changes (in new-document order)
+    """
+    hashes_a = [paragraph_hash(p) for p in paragraphs_a]
+    hashes_b = [paragraph_hash(p) for p in paragraphs_b]
+    set_a, set_b = set(hashes_a), set(hashes_b)
+    counts = dict.fromkeys(("unchanged", "added", "removed", "modified", "moved"), 0)
+    changes: List[Dict] = []
+    matched = 0.0
+
+    for tag, i1, i2, j1, j2 in align(hashes_a, hashes_b):
+        if tag == "equal":
+            counts["unchanged"] += i2 - i1
+            matched += 2 * (i2 - i1)
+            continue
+        removed = []
+        for i in range(i1, i2):
+            if hashes_a[i] in set_b:
+                counts["moved"] += 1
+                matched += 1
+            else:
+                removed.append((i, paragraphs_a[i]))
+        added = []
+        for j in range(j1, j2):
+            if hashes_b[j] in set_a:
+                changes.append({"type": "moved", "b_index": j, "text": paragraphs_b[j]})
+                matched += 1
+            else:
+                added.append((j, paragraphs_b[j]))
+
+        pairs = _pair_block(removed, added, min_similarity)
+        paired_removed = {r for r, _, _ in pairs}
+        paired_added = {a for _, a, _ in pairs}
+        for r, a, score in pairs:
+            changes.append({
+                "type": "modified",
+                "a_index": removed[r][0],
+                "b_index": added[a][0],
+                "similarity": round(score, 3),
+                "before": removed[r][1],
+                "after": added[a][1],
+            })
+            matched += 2 * score
+        for r, (i, text) in enumerate(removed):
+            if r not in paired_removed:
+                changes.append({"type": "removed", "a_index": i, "b_index": j1, "text": text})
+        for a, (j, text) in enumerate(added):
+            if a not in paired_added:
+                changes.append({"type": "added", "b_index": j, "text": text})
+        counts["modified"] += len(pairs)
+        counts["removed"] += len(removed) - len(pairs)
+        counts["added"] += len(added) - len(pairs)
+
+    changes.sort(key=lambda c: (c["b_index"], c["type"] != "removed"))
+    total = len(paragraphs_a) + len(paragraphs_b)
+    return {
+        "counts": counts,
+        "similarity": round(matched / total, 3) if total else 1.0,
+        "changes": changes,
+    }
+
+
+# ---- Section alignment ----
+
+def _resolve_section(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """("risk_factors", None) for a known section name, (None, "1A") for an Item label."""
+    key = "_".join(name.lower().replace("'", "").replace("&", "and").split())
+    key = {"md_and_a": "mda", "mdanda": "mda", "managements_discussion_and_analysis": "mda"}.get(key, key)
+    if key in SECTION_TITLES:
+        return key, None
+    return None, re.sub(r"^item_?", "", key).upper()
+
+
+def section_span(text: str, name: str, index: Optional[SectionIndex] = None) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of section `name` in `text`, body before table of contents.
+
+    Args:
+        text: Filing text
+        name: A SECTION_TITLES name or title ("Risk Factors", "mda") or an Item label ("1A", "Item 7")
+        index: SectionIndex of `text` (built on the fly if omitted)
+
+    Returns:
+        Character span, or None if the filing has no such section
+    """
+    if index is None:
+        index = SectionIndex.build(text)
+    known, item = _resolve_section(name)
+    if known:
+        headings = index.find(known)
+    else:
+        headings = sorted((h for h in index.headings if h["item"] == item), key=lambda h: h["toc"])
+    for heading in headings:
+        if len(text[heading["start"]:heading["end"]].strip()) > _MIN_SECTION_CHARS:
+            return heading["start"], heading["end"]
+    return None
+
+
+def split_sections(text: str, index: Optional[SectionIndex] = None) -> List[Tuple[str, str]]:
+    """
+    (label, text) for each body Item of a filing, in order.
+
+    Text before the first body Item (cover page, contents) is "Preamble". A
+    text without Item headings (e.g. an extracted section file) is one
+    "Document" section. Items that repeat (10-Q Part I / Part II) are
+    labelled with their part.
+    """
+    if index is None:
+        index = SectionIndex.build(text)
+    body = [h for h in index.headings if h["item"] and not h["toc"]]
+    if not body:
+        return [("Document", text)]
+    repeated = {item for item, n in Counter(h["item"] for h in body).items() if n > 1}
+    sections = [("Preamble", text[:body[0]["start"]])]
+    for heading, following in zip(body, body[1:] + [None]):
+        label = f"Item {heading['item']}"
+        if heading["item"] in repeated and heading["part"]:
+            label = f"Part {heading['part']} {label}"
+        sections.append((label, text[heading["start"]:following["start"] if following else len(text)]))
+    return sections
+
+
+def _by_label(sections: List[Tuple[str, str]]) -> Dict[str, str]:
+    merged: Dict[str, str] = {}
+    for label, text in sections:
+        merged[label] = merged[label] + "\n" + text if label in merged else text
+    return merged
+
+
+def diff_documents(
+    text_a: str,
+    text_b: str,
+    section: Optional[str] = None,
+    min_similarity: float = DEFAULT_MIN_SIMILARITY,
+) -> Dict:
+    """
+    Paragraph diff of two filings, section by section.
+
+    Both texts are cut at their Item headings and sections are paired by
+    Item label, so a change in one Item never aligns against another;
+    Items present on one side only are reported whole. With `section`,
+    only that section of each text is compared (a text without Item
+    headings is taken to be the section already).
+
+    Args:
+        text_a: Old document (e.g. last year's clean.txt or risk_factors.txt)
+        text_b: New document
+        section: Section name or Item label to restrict the diff to
+        min_similarity: Lowest word similarity that still counts as a modification
+
+    Returns:
+        Dict with summary (paragraph counts, overall similarity) and
+        sections (label, status, counts, similarity, changes)
+
+    Raises:
+        ValueError: If `section` is given but found in neither text
+    """
+    if section:
+        pairs = []
+        for text in (text_a, text_b):
+            index = SectionIndex.build(text)
+            span = section_span(text, section, index)
+            if span is None and any(h["item"] for h in index.headings):
+                pairs.append(None)
+            else:
+                pairs.append(text[span[0]:span[1]] if span else text)
+        if pairs == [None, None]:
+            raise ValueError(f"Section {section!r} not found in either document")
+        sections_a = [(section, pairs[0])] if pairs[0] is not None else []
+        sections_b = [(section, pairs[1])] if pairs[1] is not None else []
+    else:
+        sections_a, sections_b = split_sections(text_a), split_sections(text_b)
+
+    old, new = _by_label(sections_a), _by_label(sections_b)
+    labels = list(new) + [label for label in old if label not in new]
+
+    summary = dict.fromkeys(("unchanged", "added", "removed", "modified", "moved"), 0)
+    summary.update(paragraphs_a=0, paragraphs_b=0)
+    results = []
+    matched = 0.0
+    for label in labels:
+        paragraphs_a = split_paragraphs(old.get(label, ""))
+        paragraphs_b = split_paragraphs(new.get(label, ""))
+        diff = diff_paragraphs(paragraphs_a, paragraphs_b, min_similarity)
+        status = "added" if label not in old else "removed" if label not in new else (
+            "unchanged" if diff["counts"]["unchanged"] == max(len(paragraphs_a), len(paragraphs_b)) else "changed"
+        )
+        results.append(dict(section=label, status=status, **diff))
+        for key, value in diff["counts"].items():
+            summary[key] += value
+        summary["paragraphs_a"] += len(paragraphs_a)
+        summary["paragraphs_b"] += len(paragraphs_b)
+        matched += diff["similarity"] * (len(paragraphs_a) + len(paragraphs_b))
+
+    total = summary["paragraphs_a"] + summary["paragraphs_b"]
+    summary["similarity"] = round(matched / total, 3) if total else 1.0
+    return {"summary": summary, "sections": results}
+
+
+def render_changes(diff: Dict) -> str:
+    """Plain-text listing of the changes only, compact enough to hand to an LLM."""
+    lines = []
+    for section in diff["sections"]:
+        if section["status"] == "unchanged":
+            continue
+        counts = section["counts"]
+        lines.append(
+            f"## {section['section']} ({section['status']}: +{counts['added']} -{counts['removed']} "
+            f"~{counts['modified']} moved {counts['moved']}, similarity {section['similarity']})"
+        )
+        for change in section["changes"]:
+            if change["type"] == "modified":
+                lines.append(f"~ MODIFIED (similarity {change['similarity']})")
+                lines.append(f"  BEFORE: {change['before']}")
+                lines.append(f"  AFTER:  {change['after']}")
+            elif change["type"] != "moved":
+                lines.append(f"{'+ ADDED' if change['type'] == 'added' else '- REMOVED'}: {change['text']}")
+        lines.append("")
+    return "\n".join(lines)
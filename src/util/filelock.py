@@ -0,0 +1,69 @@
+"""Advisory inter-process file lock (flock on POSIX, msvcrt on Windows)."""
+import os
+import time
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive lock on `path`, usable as a context manager.
+
+    Every acquisition opens its own descriptor, so the lock also serializes
+    threads of the same process. The lock file is created if missing and is
+    never deleted (deleting it would let two holders lock different inodes).
+
+    Args:
+        path: Lock file location (parent directories are created)
+        timeout: Seconds to wait before raising TimeoutError (None = forever)
+    """
+
+    def __init__(self, path: Path, timeout: float = None):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_EX if deadline is None else fcntl.LOCK_EX | fcntl.LOCK_NB
+                    fcntl.flock(fd, flags)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.005)
+        self._local.fd = fd
+
+    def release(self) -> None:
+        fd = getattr(self._local, "fd", None)
+        if fd is None:
+            return
+        self._local.fd = None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
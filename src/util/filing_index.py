@@ -0,0 +1,196 @@
+"""Persisted word and sentence offset indexes for filing text (sidecars of `clean.txt`)."""
+from __future__ import annotations
+import os
+import re
+import sys
+import abc
+import mmap
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from operator import add
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+# Magic, padding, source size, source mtime_ns, entry count; then u32 LE offsets
+_HEADER = struct.Struct("<4s4xQqQ")
+_GAP_RE = re.compile(r"\s+")
+# A period + whitespace ends a sentence, except after common abbreviations.
+# The period comes first so the regex engine can jump between periods.
+SENTENCE_BREAK_RE = re.compile(
+    r"\.(?<!Mr\.)(?<!Mrs\.)(?<!Ms\.)(?<!Dr\.)(?<!\bU\.S\.)(?<!\bInc\.)(?<!\bCorp\.)(?<!\bLtd\.)\s+"
+)
+
+
+class OffsetIndex(abc.ABC):
+    """
+    Ascending character offsets into a text, persisted as a sidecar file.
+
+    Subclasses define `build()` plus the sidecar `SUFFIX` and `MAGIC`. On
+    disk the offsets are a flat little-endian uint32 array that `load()`
+    memory-maps; the header records the size and mtime of the source text
+    so a rewritten `clean.txt` invalidates the index.
+
+    Args:
+        starts: Start offset of each entry, ascending
+    """
+
+    SUFFIX = ".idx"
+    MAGIC = b"OIX1"
+
+    def __init__(self, starts: Sequence[int]):
+        self.starts = starts
+
+    @classmethod
+    @abc.abstractmethod
+    def build(cls, text: str) -> "OffsetIndex":
+        """Index of `text`."""
+
+    @classmethod
+    def path_for(cls, text_path: Path) -> Path:
+        """Index location for a text file, e.g. `clean.txt` -> `clean.words.idx`."""
+        text_path = Path(text_path)
+        return text_path.with_name(f"{text_path.stem}{cls.SUFFIX}")
+
+    @classmethod
+    def for_file(cls, text_path: Path, text: Optional[str] = None) -> "OffsetIndex":
+        """
+        Load the index for `text_path`, building and saving it when missing or stale.
+
+        Args:
+            text_path: The indexed text file (e.g. clean.txt)
+            text: Its content, if the caller already read it
+
+        Returns:
+            Index of the file's current content
+        """
+        text_path = Path(text_path)
+        stat = text_path.stat()
+        index = cls.load(cls.path_for(text_path), stat)
+        if index is not None:
+            return index
+        if text is None:
+            text = text_path.read_text(encoding="utf-8")
+        index = cls.build(text)
+        try:
+            index.save(cls.path_for(text_path), stat)
+        except OSError:
+            pass  # read-only filing directory: the in-memory index still works
+        return index
+
+    # ---- Persistence ----
+
+    def save(self, path: Path, source: os.stat_result) -> None:
+        """Write atomically, stamped with the source file's size and mtime."""
+        starts = array("I", self.starts)
+        if sys.byteorder != "little":
+            starts.byteswap()
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(self.MAGIC, source.st_size, source.st_mtime_ns, len(starts)))
+            f.write(starts.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, source: os.stat_result) -> Optional["OffsetIndex"]:
+        """Memory-map `path`; None if absent, corrupt, or built from other content."""
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return None
+        if len(mapped) < _HEADER.size:
+            return None
+        magic, size, mtime_ns, count = _HEADER.unpack_from(mapped)
+        end = _HEADER.size + 4 * count
+        if magic != cls.MAGIC or len(mapped) != end or (size, mtime_ns) != (source.st_size, source.st_mtime_ns):
+            return None
+        starts = memoryview(mapped)[_HEADER.size:end].cast("I")
+        if sys.byteorder != "little":
+            starts = array("I", starts)
+            starts.byteswap()
+        return cls(starts)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _entry_at(self, offset: int) -> int:
+        idx = bisect_right(self.starts, offset) - 1
+        return max(min(idx, len(self.starts) - 1), 0)
+
+
+class WordIndex(OffsetIndex):
+    """
+    Character offset of every whitespace-delimited word in a text.
+
+    Word `i` of `text.split()` starts at `starts[i]`, so a regex match maps
+    to its word with one bisect and a word window is a single slice of the
+    text — no re-tokenizing per search. Stored as `clean.words.idx`.
+    """
+
+    SUFFIX = ".words.idx"
+    MAGIC = b"WIX1"
+
+    @classmethod
+    def build(cls, text: str) -> "WordIndex":
+        """Index `text` (split/findall/accumulate all run at C speed)."""
+        lengths = array("I", map(len, text.split()))
+        lead = len(text) - len(text.lstrip())
+        gaps = map(len, _GAP_RE.findall(text.strip()))
+        starts = array("I", accumulate(map(add, lengths, gaps), initial=lead)) if lengths else array("I")
+        return cls(starts)
+
+    def word_at(self, offset: int) -> int:
+        """Index of the word containing (or last word before) character `offset`."""
+        return self._entry_at(offset)
+
+    def span(self, start: int, end: int) -> Tuple[int, Optional[int]]:
+        """Slice bounds covering words `start`..`end - 1` (None = to the end of the text)."""
+        stop = self.starts[end] if end < len(self.starts) else None
+        return self.starts[start], stop
+
+    def words(self, text: str, start: int, end: int) -> str:
+        """Words `start`..`end - 1` joined by single spaces, like `" ".join(text.split()[start:end])`."""
+        begin, stop = self.span(start, end)
+        return " ".join(text[begin:stop].split())
+
+
+class SentenceIndex(OffsetIndex):
+    """
+    Start offset of every sentence in a text, split as `split_into_sentences` does.
+
+    Sentence `i` is `text[starts[i]:starts[i + 1]].strip()`. Topic extractors
+    search the full text once and bisect here for the sentence and its
+    neighbours, so only matched sentences are ever materialized. Stored as
+    `clean.sentences.idx`.
+    """
+
+    SUFFIX = ".sentences.idx"
+    MAGIC = b"SIX1"
+
+    @classmethod
+    def build(cls, text: str) -> "SentenceIndex":
+        """Index `text`: one scan for sentence breaks."""
+        lead = len(text) - len(text.lstrip())
+        starts = array("I", [lead] if lead < len(text) else [])
+        starts.extend(m.end() for m in SENTENCE_BREAK_RE.finditer(text))
+        if len(starts) > 1 and starts[-1] >= len(text):
+            starts.pop()  # text ended with a break: no trailing sentence
+        return cls(starts)
+
+    def sentence_at(self, offset: int) -> int:
+        """Index of the sentence containing character `offset`."""
+        return self._entry_at(offset)
+
+    def sentence(self, text: str, i: int) -> str:
+        """Text of sentence `i`."""
+        stop = self.starts[i + 1] if i + 1 < len(self.starts) else None
+        return text[self.starts[i]:stop].strip()
+
+    def context(self, text: str, i: int, size: int = 2) -> str:
+        """Sentence `i` with `size` sentences on each side, like `get_sentence_context`."""
+        first, last = max(0, i - size), min(len(self.starts), i + size + 1)
+        return " ".join(self.sentence(text, j) for j in range(first, last))
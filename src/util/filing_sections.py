@@ -0,0 +1,191 @@
+"""Item heading index for 10-K/10-Q text (`clean.sections.json` next to `clean.txt`)."""
+from __future__ import annotations
+import os
+import re
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# "PART II" / "Item 7." / "ITEM 1A:" at the start of a line (table cells included)
+_HEADING_RE = re.compile(
+    r"^[ \t|]*(?:part[ \t]+(iv|iii|ii|i)\b|item[ \t]*(\d{1,2}[a-c]?)\b[ \t]*[.:\-]?)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Texts cleaned before block tags became line breaks may have headings mid-line
+_INLINE_HEADING_RE = re.compile(r"\b(?:PART|Part)\s+(IV|III|II|I)\b|\b(?:ITEM|Item)\s*(\d{1,2}[A-Ca-c]?)\s*[.:]")
+
+# Longer "Item ..." lines, or ones going on in lowercase / after a comma
+# ("Part II, Item 7 of this report"), are prose that starts with the word
+_MAX_HEADING_LINE = 300
+_PROSE_RE = re.compile(r"[ \t]*(?:[a-z]|,)")
+_TITLE_CHARS = 160
+# A table of contents lists its items within a few lines of each other
+_TOC_MAX_GAP = 1500
+_MIN_SECTION_CHARS = 100
+
+# Section name -> (title prefixes, 10-K item used when a heading has no title)
+SECTION_TITLES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "business": (("business",), "1"),
+    "risk_factors": (("risk factors",), "1A"),
+    "mda": (("management's discussion", "managements discussion", "management discussion"), "7"),
+    "financial_statements": (("financial statements", "condensed consolidated financial statements",
+                              "consolidated financial statements"), "8"),
+}
+
+
+def _title(text: str, start: int) -> str:
+    title = text[start:start + _TITLE_CHARS]
+    return " ".join(title.replace("|", " ").split()).lstrip(".:-– ").lower()
+
+
+def _candidates(text: str) -> Iterator[Tuple[int, int, Optional[str], Optional[str]]]:
+    """(start, end, part, item) for every heading-like match."""
+    for match in _HEADING_RE.finditer(text):
+        line_end = text.find("\n", match.end())
+        if line_end < 0:
+            line_end = len(text)
+        if line_end - match.start() <= _MAX_HEADING_LINE and not _PROSE_RE.match(text, match.end()):
+            yield match.start(), match.end(), match.group(1), match.group(2)
+
+
+class SectionIndex:
+    """
+    Offsets of the PART / Item headings of a filing, found in one scan.
+
+    `build()` records every heading at the start of a short line, its part,
+    item label and title. The table of contents repeats the same headings
+    close together before the body, so the run of headings that ends where
+    the first heading reappears is flagged `toc` when it is compact. Each
+    heading's section runs to the next heading, so extracting a section is
+    a slice. The sidecar carries the size and mtime of the source text.
+
+    Args:
+        headings: Dicts with part, item, title, start, end and toc keys
+    """
+
+    VERSION = 1
+
+    def __init__(self, headings: List[Dict]):
+        self.headings = headings
+
+    # ---- Construction ----
+
+    @classmethod
+    def build(cls, text: str) -> "SectionIndex":
+        """Locate all headings in `text`."""
+        found = list(_candidates(text))
+        if not found:
+            found = [(m.start(), m.end(), m.group(1), m.group(2)) for m in _INLINE_HEADING_RE.finditer(text)]
+
+        headings: List[Dict] = []
+        part = None
+        for start, end, part_label, item in found:
+            if part_label:
+                part = part_label.upper()
+                headings.append({"part": part, "item": None, "title": "", "start": start})
+            else:
+                headings.append({"part": part, "item": item.upper(), "title": _title(text, end), "start": start})
+        for heading, following in zip(headings, headings[1:] + [None]):
+            heading["end"] = following["start"] if following else len(text)
+            heading["toc"] = False
+        cls._flag_toc(headings)
+        return cls(headings)
+
+    @staticmethod
+    def _flag_toc(headings: List[Dict]) -> None:
+        items = [h for h in headings if h["item"]]
+        if not items:
+            return
+        first = (items[0]["item"], items[0]["title"].split(" ", 1)[0])
+        repeat = next(
+            (i for i, h in enumerate(items[1:], 1) if (h["item"], h["title"].split(" ", 1)[0]) == first),
+            None,
+        )
+        if repeat is None or repeat < 3:
+            return
+        toc_end = items[repeat - 1]["start"]
+        if toc_end - items[0]["start"] > _TOC_MAX_GAP * repeat:
+            return  # too spread out to be a contents page
+        # PART lines between the last contents entry and the repeat open the body
+        for heading in headings:
+            heading["toc"] = heading["start"] <= toc_end
+
+    @staticmethod
+    def path_for(text_path: Path) -> Path:
+        """Sidecar location for a text file: `clean.txt` -> `clean.sections.json`."""
+        text_path = Path(text_path)
+        return text_path.with_name(f"{text_path.stem}.sections.json")
+
+    @classmethod
+    def for_file(cls, text_path: Path, text: Optional[str] = None) -> "SectionIndex":
+        """
+        Load the sidecar for `text_path`, building and saving it when missing or stale.
+
+        Args:
+            text_path: The indexed text file (e.g. clean.txt)
+            text: Its content, if the caller already read it
+
+        Returns:
+            SectionIndex for the file's current content
+        """
+        text_path = Path(text_path)
+        stat = text_path.stat()
+        index = cls.load(cls.path_for(text_path), stat)
+        if index is not None:
+            return index
+        if text is None:
+            text = text_path.read_text(encoding="utf-8")
+        index = cls.build(text)
+        try:
+            index.save(cls.path_for(text_path), stat)
+        except OSError:
+            pass  # read-only filing directory: the in-memory index still works
+        return index
+
+    # ---- Persistence ----
+
+    def save(self, path: Path, source: os.stat_result) -> None:
+        """Write atomically, stamped with the source file's size and mtime."""
+        payload = {
+            "version": self.VERSION,
+            "source": {"size": source.st_size, "mtime_ns": source.st_mtime_ns},
+            "headings": self.headings,
+        }
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, source: os.stat_result) -> Optional["SectionIndex"]:
+        """Read `path`; None if absent, corrupt, or built from other content."""
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != cls.VERSION or payload.get("source") != {
+            "size": source.st_size, "mtime_ns": source.st_mtime_ns
+        }:
+            return None
+        return cls(payload["headings"])
+
+    # ---- Lookup ----
+
+    def find(self, name: str) -> List[Dict]:
+        """Headings for section `name` (see SECTION_TITLES), body before contents."""
+        prefixes, item = SECTION_TITLES[name]
+        matches = [
+            h for h in self.headings
+            if h["item"] and (h["title"].startswith(prefixes) or (not h["title"] and h["item"] == item))
+        ]
+        return sorted(matches, key=lambda h: h["toc"])
+
+    def section(self, text: str, name: str) -> Optional[str]:
+        """Whitespace-collapsed text of section `name`, or None if no heading has a body."""
+        for heading in self.find(name):
+            body = " ".join(text[heading["start"]:heading["end"]].split())
+            if len(body) > _MIN_SECTION_CHARS:
+                return body
+        return None
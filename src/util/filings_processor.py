@@ -1,8 +1,12 @@
 """SEC filings content processing utilities."""
 import re
+import math
 import html
-from typing import List, Dict, Optional
-from bisect import bisect_right
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from src.util.filing_index import SENTENCE_BREAK_RE, SentenceIndex, WordIndex
+from src.util.filing_sections import SectionIndex
 
 
 def clean_html_artifacts(text: str) -> str:
@@ -34,13 +38,287 @@ def clean_html_artifacts(text: str) -> str:
     return text
 
 
+# ---- Streaming HTML -> text ----
+
+# Break markers used inside a chunk until whitespace is resolved
+_SP, _CELL, _LINE, _PARA = " ", "\x03", "\x01", "\x02"
+_BREAK_CHARS = " \x01\x02\x03"
+
+
+def _tag_markers() -> Dict[str, str]:
+    """Tag (with "/" prefix when closing) -> marker; other tags become a space."""
+    markers = {}
+    line = "br div tr li dt dd ul ol section article header footer blockquote pre title caption thead tbody tfoot center"
+    for name in line.split():
+        markers[name] = markers["/" + name] = _LINE
+    for name in "p h1 h2 h3 h4 h5 h6 table hr".split():
+        markers[name] = markers["/" + name] = _PARA
+    for name in ("td", "th"):
+        markers["/" + name] = _CELL
+    # Inline elements don't separate words when rendered ("Item&#160;7</span><span>.")
+    for name in "span a b i u em strong font sup sub small big ix:nonfraction ix:nonnumeric".split():
+        markers[name] = markers["/" + name] = ""
+    markers.update({k.upper(): v for k, v in markers.items()})
+    return markers
+
+
+_TAG_MARKERS = _tag_markers()
+_TAG_RE = re.compile(r"<!--.*?-->|<(/?[A-Za-z][\w:.-]*)[^>]*>|<[!?][^>]*>", re.S)
+# Elements whose content is not text (ix:header holds hidden inline-XBRL facts)
+_SKIP_OPEN_RE = re.compile(r"<(script|style|head|ix:header)\b", re.I)
+_SKIP_CLOSE_RE = {
+    name: re.compile(rf"</{name}\s*>", re.I) for name in ("script", "style", "head", "ix:header")
+}
+_SPACES_RE = re.compile(r" {2,}")
+_BREAK_RUN_RE = re.compile(r"[\x01\x02\x03][ \x01\x02\x03]*")
+
+# Entities that make up nearly all of EDGAR's; plain str.replace beats html.unescape.
+# None may decode to "&" (that would decode escaped entities twice)
+_COMMON_ENTITIES = (
+    ("&#160;", " "), ("&nbsp;", " "), ("&#8217;", "'"), ("&#8220;", '"'), ("&#8221;", '"'),
+    ("&#8211;", "-"), ("&#8212;", "-"), ("&#8226;", "- "), ("&#183;", "- "),
+)
+
+# Same normalizations as clean_html_artifacts, plus source newlines -> spaces
+_CHAR_MAP = str.maketrans({
+    "\u200b": None, "\x00": None, "\ufeff": None,
+    "\xa0": " ", "\n": " ", "\r": " ", "\t": " ", "\f": " ", "\v": " ",
+    "\u2019": "'", "\u2018": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-",
+    "\u2022": "- ", "\u00b7": "- ", "\u2023": "- ", "\u2219": "- ",
+})
+
+
+def _tag_marker(match: "re.Match") -> str:
+    name = match.group(1)
+    if name is None:
+        return ""  # comment, doctype, processing instruction
+    marker = _TAG_MARKERS.get(name)
+    if marker is None:
+        marker = _TAG_MARKERS.get(name.lower(), _SP)
+    return marker
+
+
+def _resolve_break(match: "re.Match") -> str:
+    run = match.group(0)
+    if _PARA in run:
+        return "\n\n"
+    if _LINE in run:
+        return "\n"
+    return " | "
+
+
+class HtmlToText:
+    """
+    Incremental HTML -> text converter for filing documents.
+
+    `feed()` takes HTML chunks and returns the text completed so far, so a
+    multi-MB document streams through with bounded memory. Each chunk is
+    tokenized once; entity decoding, quote/dash/space normalization, bullet
+    mapping and whitespace collapsing are applied to that chunk's text in
+    the same step. Block tags become line breaks (paragraph-level tags a
+    blank line), table cells are separated by " | ", and script/style/
+    head/ix:header content is dropped.
+    """
+
+    def __init__(self):
+        self._pending = ""  # unconsumed input (split tag or entity)
+        self._carry = ""  # trailing whitespace/markers not yet resolved
+        self._skip: Optional[str] = None
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        data = self._pending + chunk
+        # Hold back an unterminated tag or entity at the end of the chunk
+        cut = len(data)
+        lt = data.rfind("<")
+        if lt >= 0 and data.find(">", lt) < 0:
+            cut = lt
+        amp = data.rfind("&", max(0, cut - 12), cut)
+        if amp >= 0 and data.find(";", amp, cut) < 0:
+            cut = amp
+        self._pending = data[cut:]
+        return self._convert(data[:cut], final=False)
+
+    def close(self) -> str:
+        data, self._pending = self._pending, ""
+        return self._convert(data, final=True)
+
+    def _drop_skipped(self, data: str) -> str:
+        """Remove script/style/head/ix:header content (may span chunks)."""
+        parts = []
+        pos = 0
+        while pos < len(data):
+            if self._skip is not None:
+                end = _SKIP_CLOSE_RE[self._skip].search(data, pos)
+                if end is None:
+                    return "".join(parts)
+                pos = end.end()
+                self._skip = None
+            start = _SKIP_OPEN_RE.search(data, pos)
+            if start is None:
+                parts.append(data[pos:])
+                break
+            parts.append(data[pos:start.start()])
+            self._skip = start.group(1).lower()
+            pos = start.end()
+        return "".join(parts)
+
+    def _convert(self, data: str, final: bool) -> str:
+        text = _TAG_RE.sub(_tag_marker, self._drop_skipped(data))
+        if "&" in text:
+            for entity, char in _COMMON_ENTITIES:
+                text = text.replace(entity, char)
+            if "&" in text:
+                text = html.unescape(text)
+        text = _SPACES_RE.sub(" ", self._carry + text.translate(_CHAR_MAP))
+        for marker in (_LINE, _PARA, _CELL):
+            text = text.replace(" " + marker, marker)
+
+        # Keep the trailing whitespace/markers: the next chunk may extend the run
+        body = text.rstrip(_BREAK_CHARS)
+        self._carry = "" if final else text[len(body):]
+        if not self._started:
+            body = body.lstrip(_BREAK_CHARS)
+            self._started = bool(body)
+        return _BREAK_RUN_RE.sub(_resolve_break, body)
+
+
+def html_to_text(markup: str) -> str:
+    """Convert a whole HTML document to clean text (see HtmlToText)."""
+    converter = HtmlToText()
+    return (converter.feed(markup) + converter.close()).strip()
+
+
+# ---- Multi-phrase matching ----
+
+_BOUNDARY = r"\b"
+
+
+def _char_token(char: str) -> str:
+    return r"\s+" if char == " " else re.escape(char)
+
+
+def _phrase_end(ends: Set[Tuple[bool, bool]], group: Optional[int]) -> str:
+    """Regex for where phrases end; `ends` holds (leading, trailing) \\b flags."""
+    options = []
+    for lead, trail in sorted(ends):
+        tail = _BOUNDARY if trail else ""
+        # A leading \b was checked after the branch's first character: it set `group`
+        options.append(f"(?({group}){tail}|(?!))" if lead and group is not None else tail)
+    if "" in options:
+        return ""
+    return options[0] if len(options) == 1 else "(?:" + "|".join(options) + ")"
+
+
+def _trie_pattern(node: Dict, group: Optional[int] = None) -> str:
+    """Regex for a character trie; a None key marks phrase ends (see _phrase_end)."""
+    alternatives = []
+    for char in sorted(k for k in node if k is not None):
+        alternatives.append(_char_token(char) + _trie_pattern(node[char], group))
+    if None in node:
+        # Longer phrases first, so the end of a shorter one is the last resort
+        alternatives.append(_phrase_end(node[None], group))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def _leads(node: Dict) -> Set[bool]:
+    """Leading-\\b flags of all phrases under `node`."""
+    flags = {lead for lead, _ in node.get(None, ())}
+    for char, child in node.items():
+        if char is not None:
+            flags |= _leads(child)
+    return flags
+
+
+class PhraseMatcher:
+    """
+    Finds any of a set of phrases, case-insensitively, in one pass over the text.
+
+    The phrases are merged into a character trie and compiled into a single
+    regex, so shared prefixes are tested once and the scan cost depends on
+    the text length rather than on the number of phrases. A phrase wrapped
+    in `\\b` (e.g. `r"\\bai\\b"`) only matches as a whole word; either side
+    may carry the boundary. Spaces inside a phrase match any whitespace run.
+    Other characters are literal. Matches don't overlap; at one position the
+    longest phrase that matches wins, whatever its boundary flags.
+
+    Args:
+        phrases: Phrases to find, optionally wrapped in `\\b`
+        whole_words: Apply word boundaries to every phrase
+    """
+
+    def __init__(self, phrases: Iterable[str], whole_words: bool = False):
+        self.phrases: Dict[str, str] = {}  # normalized key -> phrase as given
+        trie: Dict = {}
+        for phrase in phrases:
+            lead, body, trail = self._parse(phrase)
+            lead, trail = lead or whole_words, trail or whole_words
+            key = self._key(body)
+            if not key:
+                continue
+            self.phrases.setdefault(key, phrase)
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node.setdefault(None, set()).add((lead, trail))
+        # Every top-level branch opens with a literal so the regex engine can
+        # skip ahead by first character; a leading \b goes after that
+        # character as a lookbehind ("a(?<!\wa)" rather than "\ba"). When a
+        # branch mixes phrases with and without it, the lookbehind only sets
+        # an empty group that the \b phrases' ends require
+        parts = []
+        groups = 0
+        for char in sorted(k for k in trie if k is not None):
+            head = _char_token(char)
+            check = rf"(?<!\w{head})" if re.match(r"\w", char) else rf"(?<=\w{head})"
+            leads = _leads(trie[char])
+            if leads == {True}:
+                parts.append(head + check + _trie_pattern(trie[char]))
+            elif leads == {False}:
+                parts.append(head + _trie_pattern(trie[char]))
+            else:
+                groups += 1
+                parts.append(head + f"(?:{check}()|)" + _trie_pattern(trie[char], groups))
+        source = "|".join(parts) or "(?!)"
+        self.pattern = re.compile(source, re.IGNORECASE)
+        # The trie is lowercase: a case-sensitive scan of text.lower() is ~5x faster
+        self._folded = re.compile(source)
+
+    @staticmethod
+    def _parse(phrase: str) -> Tuple[bool, str, bool]:
+        lead = phrase.startswith(_BOUNDARY)
+        trail = phrase.endswith(_BOUNDARY) and len(phrase) > 2
+        return lead, phrase[2 if lead else 0:len(phrase) - 2 if trail else None], trail
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _scanner(self, text: str) -> Tuple["re.Pattern", str]:
+        folded = text.lower()
+        if len(folded) == len(text):
+            return self._folded, folded
+        return self.pattern, text  # lower() changed offsets (e.g. "\u0130")
+
+    def finditer(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, phrase) for each match, in text order."""
+        pattern, scanned = self._scanner(text)
+        phrases = self.phrases
+        for match in pattern.finditer(scanned, pos, len(text) if endpos is None else endpos):
+            yield match.start(), match.end(), phrases.get(self._key(match.group()), match.group())
+
+    def search(self, text: str) -> bool:
+        """True if any phrase occurs in `text`."""
+        pattern, scanned = self._scanner(text)
+        return pattern.search(scanned) is not None
+
+
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences while handling common abbreviations."""
-    text = re.sub(
-        r"(?<!Mr)(?<!Mrs)(?<!Ms)(?<!Dr)(?<!\bU\.S)(?<!\bInc)(?<!\bCorp)(?<!\bLtd)\.\s+",
-        ".<SPLIT>",
-        text,
-    )
+    text = SENTENCE_BREAK_RE.sub(".<SPLIT>", text)
     return [s.strip() for s in text.split("<SPLIT>") if s.strip()]
 
 
@@ -53,20 +331,39 @@ def get_sentence_context(
     return " ".join(sentences[start_idx:end_idx])
 
 
-def extract_matches_with_context(text: str, pattern: str) -> List[Dict]:
-    """Extract sentences matching pattern with context."""
-    sentences = split_into_sentences(text)
-    matches = []
+def extract_matches_with_context(
+    text: str,
+    pattern: Union[str, PhraseMatcher],
+    sentences: Optional[SentenceIndex] = None,
+) -> List[Dict]:
+    """
+    Extract sentences matching pattern (regex or PhraseMatcher) with context.
 
-    for i, sentence in enumerate(sentences):
-        if re.search(f"(?i){pattern}", sentence):
-            matches.append(
-                {
-                    "target_sentence": sentence,
-                    "context": get_sentence_context(sentences, i),
-                    "position": i,
-                }
-            )
+    The pattern runs once over the whole text; each match is placed in its
+    sentence by bisecting the sentence offset index, and only the matched
+    sentences and their neighbours are sliced out.
+    """
+    if sentences is None:
+        sentences = SentenceIndex.build(text)
+    if isinstance(pattern, PhraseMatcher):
+        starts = (start for start, _, _ in pattern.finditer(text))
+    else:
+        starts = (m.start() for m in re.finditer(pattern, text, re.IGNORECASE))
+
+    matches = []
+    last = -1
+    for start in starts:
+        i = sentences.sentence_at(start)
+        if i == last:
+            continue  # one entry per sentence
+        last = i
+        matches.append(
+            {
+                "target_sentence": sentences.sentence(text, i),
+                "context": sentences.context(text, i),
+                "position": i,
+            }
+        )
 
     return matches
 
@@ -102,33 +399,42 @@ def extract_section(text: str, pattern: str, clean: bool = True) -> Optional[str
     return relevant_text[0] if relevant_text else None
 
 
-def extract_mda(text: str) -> Optional[str]:
+def _indexed_section(
+    text: str, name: str, legacy_pattern: str, sections: Optional[SectionIndex]
+) -> Optional[str]:
+    """Slice section `name` via the heading index; the lazy regex only if no heading has a body."""
+    if sections is None:
+        sections = SectionIndex.build(text)
+    return sections.section(text, name) or extract_section(text, legacy_pattern)
+
+
+def extract_mda(text: str, sections: Optional[SectionIndex] = None) -> Optional[str]:
     """Extract Management Discussion & Analysis section (Item 7)."""
     pattern = r"(?i)Item[^\n]*7\.[^\n]*Management\'s\s*Discussion.*?(?=Item[^\n]*7A|Item[^\n]*8)"
-    section = extract_section(text, pattern)
+    section = _indexed_section(text, "mda", pattern, sections)
     return f"<mda>\n{section}\n</mda>" if section else None
 
 
-def extract_business(text: str) -> Optional[str]:
+def extract_business(text: str, sections: Optional[SectionIndex] = None) -> Optional[str]:
     """Extract Business section (Item 1)."""
     pattern = r"(?i)Item[^\n]*1\.[^\n]*Business.*?(?=Item[^\n]*1A|Item[^\n]*2)"
-    section = extract_section(text, pattern)
+    section = _indexed_section(text, "business", pattern, sections)
     return f"<business>\n{section}\n</business>" if section else None
 
 
-def extract_risk_factors(text: str) -> Optional[str]:
+def extract_risk_factors(text: str, sections: Optional[SectionIndex] = None) -> Optional[str]:
     """Extract Risk Factors section (Item 1A)."""
     pattern = r"(?i)Item[^\n]*1A\.[^\n]*Risk\s*Factors.*?(?=Item[^\n]*1B|Item[^\n]*2)"
-    section = extract_section(text, pattern)
+    section = _indexed_section(text, "risk_factors", pattern, sections)
     return f"<risk_factors>\n{section}\n</risk_factors>" if section else None
 
 
-def extract_financial_statements(text: str) -> Optional[str]:
+def extract_financial_statements(text: str, sections: Optional[SectionIndex] = None) -> Optional[str]:
     """Extract Financial Statements section (Item 8)."""
     pattern = (
         r"(?is)Item\s*8\.\s*Financial\s*Statements[\s\S]*?(?=\s*Item\s*9|\s*Item\s*7)"
     )
-    section = extract_section(text, pattern)
+    section = _indexed_section(text, "financial_statements", pattern, sections)
     return (
         f"<financial_statements>\n{section}\n</financial_statements>"
         if section
@@ -137,7 +443,11 @@ def extract_financial_statements(text: str) -> Optional[str]:
 
 
 def extract_keyword_context(
-    text: str, phrases: List[str], pre_window: int = 1000, post_window: int = 1000
+    text: str,
+    phrases: List[str],
+    pre_window: int = 1000,
+    post_window: int = 1000,
+    index: Optional[WordIndex] = None,
 ) -> str:
     """
     For each exact phrase in `phrases`, find all occurrences (case-insensitive)
@@ -148,42 +458,28 @@ def extract_keyword_context(
     :param phrases: A list of phrases to match exactly. (e.g. ["Executive Compensation"])
     :param pre_window: Number of words to include before each match.
     :param post_window: Number of words to include after each match.
+    :param index: Word-offset index of `text` (built on the fly if omitted).
     :return: A string containing merged snippets separated by a delimiter.
     """
 
-    # 1) Split the entire text into words for indexing.
-    words = text.split()
-    total_words = len(words)
+    # 1) Map character offsets to words through the word-offset index
+    if index is None:
+        index = WordIndex.build(text)
+    total_words = len(index)
     if total_words == 0:
         return ""
 
-    # 2) Build a prefix sum array of character offsets
-    prefix_sum = [0]
-    running_length = 0
-    for w in words:
-        running_length += len(w) + 1
-        prefix_sum.append(running_length)
-
-    # 3) Helper to find which word index corresponds to a given character offset
-    def char_offset_to_word_index(offset):
-        idx = bisect_right(prefix_sum, offset) - 1
-        return max(min(idx, total_words - 1), 0)
-
-    # 4) Collect all word-based windows around each match for each phrase
+    # 2) Collect word-based windows around every match, all phrases in one pass
     segments = []
-    for phrase in phrases:
-        pattern = re.compile(re.escape(phrase), re.IGNORECASE)
-
-        for match in pattern.finditer(text):
-            start_char = match.start()
-            match_word_index = char_offset_to_word_index(start_char)
+    for start_char, _, _ in PhraseMatcher(phrases).finditer(text):
+        match_word_index = index.word_at(start_char)
 
-            start_index = max(match_word_index - pre_window, 0)
-            end_index = min(match_word_index + post_window + 1, total_words)
+        start_index = max(match_word_index - pre_window, 0)
+        end_index = min(match_word_index + post_window + 1, total_words)
 
-            segments.append((start_index, end_index))
+        segments.append((start_index, end_index))
 
-    # 5) Merge overlapping segments
+    # 3) Merge overlapping segments
     segments.sort(key=lambda seg: seg[0])
     merged_segments: List[tuple] = []
     for seg in segments:
@@ -196,14 +492,10 @@ def extract_keyword_context(
             else:
                 merged_segments.append(seg)
 
-    # 6) Reconstruct the text snippets from the merged segments
-    snippets = []
-    for start_i, end_i in merged_segments:
-        snippet_words = words[start_i:end_i]
-        snippet_text = " ".join(snippet_words)
-        snippets.append(snippet_text.strip())
+    # 4) Reconstruct the text snippets from the merged segments
+    snippets = [index.words(text, start_i, end_i) for start_i, end_i in merged_segments]
 
-    # 7) Return the merged snippets separated by a delimiter
+    # 5) Return the merged snippets separated by a delimiter
     return "\n\n--- SNIPPET BREAK ---\n\n".join(snippets)
 
 
@@ -214,6 +506,7 @@ def extract_regex_context(
     post_window: int = 500,
     seen_contexts: Optional[set] = None,
     snippet_min_words: int = 15,
+    index: Optional[WordIndex] = None,
 ) -> List[str]:
     """
     For each regex match in `regex_pattern`, find all occurrences (case-insensitive)
@@ -226,29 +519,21 @@ def extract_regex_context(
     :param post_window: Number of words to include after each match.
     :param seen_contexts: Optional set of already seen contexts for deduplication.
     :param snippet_min_words: Minimum words required in a snippet to include it.
+    :param index: Word-offset index of `text` (built on the fly if omitted).
     :return: A list of context snippets, deduplicated if seen_contexts is provided.
     """
 
-    words = text.split()
-    total_words = len(words)
+    if index is None:
+        index = WordIndex.build(text)
+    total_words = len(index)
     if total_words == 0:
         return []
 
-    prefix_sum = [0]
-    running_length = 0
-    for w in words:
-        running_length += len(w) + 1
-        prefix_sum.append(running_length)
-
-    def char_offset_to_word_index(offset):
-        idx = bisect_right(prefix_sum, offset) - 1
-        return max(min(idx, total_words - 1), 0)
-
     pattern = re.compile(regex_pattern, re.IGNORECASE)
     segments = []
 
     for match in pattern.finditer(text):
-        match_word_index = char_offset_to_word_index(match.start())
+        match_word_index = index.word_at(match.start())
 
         start_index = max(match_word_index - pre_window, 0)
         end_index = min(match_word_index + post_window + 1, total_words)
@@ -274,7 +559,7 @@ def extract_regex_context(
     # Join words to form the snippets and apply deduplication
     snippets = []
     for start, end in merged_segments:
-        snippet = " ".join(words[start:end]).strip()
+        snippet = index.words(text, start, end)
 
         # Apply deduplication if seen_contexts is provided
         if seen_contexts is not None:
@@ -283,7 +568,7 @@ def extract_regex_context(
             seen_contexts.add(snippet)
 
         # Skip very short extractions (likely fragments)
-        if len(snippet.split()) < snippet_min_words:
+        if end - start < snippet_min_words:
             continue
 
         snippets.append(snippet)
@@ -291,33 +576,133 @@ def extract_regex_context(
     return snippets
 
 
-def extract_ai_content(text: str) -> Optional[str]:
-    """Extract AI-related content with context."""
-    ai_keywords = [
-        r"artificial intelligence",
-        r"machine learning",
-        r"\bai\b",
-        r"neural network",
-        r"deep learning",
-        r"generative ai",
-        r"\bllm\b",
-        r"large language model",
-        r"computer vision",
-        r"natural language processing",
-        r"\bnlp\b",
+# Rough English prose rate, used to turn a token budget into a word budget
+TOKENS_PER_WORD = 1.3
+_BM25_K1 = 1.2
+
+
+def rank_passages(
+    text: str,
+    phrases: List[str],
+    passage_words: int = 200,
+    max_words: int = 2000,
+    max_tokens: Optional[int] = None,
+    top_k: Optional[int] = None,
+    index: Optional[WordIndex] = None,
+) -> List[Dict]:
+    """
+    Best non-overlapping passages for `phrases`, ranked by BM25, within a budget.
+
+    Every match (whole words, case-insensitive, all phrases in one pass)
+    proposes a `passage_words` window centred on it. Windows are scored
+    with BM25, each phrase being a query term whose document frequency is
+    counted over the filing cut into consecutive `passage_words` blocks;
+    all windows have the same length, so BM25's length normalisation drops
+    out. The highest-scoring windows are taken greedily, skipping any that
+    overlap one already taken, until `top_k` passages or the word budget
+    is reached.
+
+    :param text: The filing text.
+    :param phrases: Query phrases (e.g. ["export controls", "China"]).
+    :param passage_words: Words per passage.
+    :param max_words: Total words to return at most.
+    :param max_tokens: Token budget instead (converted at TOKENS_PER_WORD); the tighter budget wins.
+    :param top_k: Maximum number of passages.
+    :param index: Word-offset index of `text` (built on the fly if omitted).
+    :return: Passages in document order: rank, score, start_word, end_word, hits (phrase -> count), text.
+    """
+    if index is None:
+        index = WordIndex.build(text)
+    total_words = len(index)
+    if total_words == 0:
+        return []
+
+    # 1) Word positions of every match, per phrase (already ascending)
+    positions: Dict[str, List[int]] = {}
+    for start_char, _, phrase in PhraseMatcher(phrases, whole_words=True).finditer(text):
+        positions.setdefault(phrase, []).append(index.word_at(start_char))
+    if not positions:
+        return []
+
+    budget = max_words
+    if max_tokens is not None:
+        budget = min(budget, int(max_tokens / TOKENS_PER_WORD))
+    # A budget below one passage shrinks the passage rather than returning nothing
+    passage_words = max(1, min(passage_words, total_words, budget))
+
+    # 2) BM25 idf per phrase over the fixed passage grid
+    blocks = -(-total_words // passage_words)
+    idf = {}
+    for phrase, words in positions.items():
+        df = len({w // passage_words for w in words})
+        idf[phrase] = math.log(1 + (blocks - df + 0.5) / (df + 0.5))
+
+    # 3) Score one window per distinct match-centred start
+    half, last_start = passage_words // 2, total_words - passage_words
+    starts = {min(max(w - half, 0), last_start) for words in positions.values() for w in words}
+    scored = []
+    for start in starts:
+        end = start + passage_words
+        hits, score = {}, 0.0
+        for phrase, words in positions.items():
+            tf = bisect_left(words, end) - bisect_left(words, start)
+            if tf:
+                hits[phrase] = tf
+                score += idf[phrase] * tf * (_BM25_K1 + 1) / (tf + _BM25_K1)
+        scored.append((score, start, hits))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    # 4) Greedy selection of non-overlapping windows under the budget
+    taken: List[int] = []  # sorted window starts
+    chosen = []
+    for score, start, hits in scored:
+        if (top_k is not None and len(chosen) >= top_k) or (len(chosen) + 1) * passage_words > budget:
+            break
+        i = bisect_left(taken, start)
+        if (i and taken[i - 1] + passage_words > start) or (i < len(taken) and start + passage_words > taken[i]):
+            continue
+        taken.insert(i, start)
+        chosen.append((score, start, hits))
+
+    passages = [
+        {
+            "rank": rank,
+            "score": round(score, 3),
+            "start_word": start,
+            "end_word": start + passage_words,
+            "hits": hits,
+            "text": index.words(text, start, start + passage_words),
+        }
+        for rank, (score, start, hits) in enumerate(chosen, 1)
     ]
-    pattern = "|".join(ai_keywords)
-    matches = extract_matches_with_context(text, pattern)
+    return sorted(passages, key=lambda p: p["start_word"])
+
+
+_AI_MATCHER = PhraseMatcher([
+    "artificial intelligence",
+    "machine learning",
+    r"\bai\b",
+    "neural network",
+    "deep learning",
+    "generative ai",
+    r"\bllm\b",
+    "large language model",
+    "computer vision",
+    "natural language processing",
+    r"\bnlp\b",
+])
+
+# Only sentence selection matters, so the old optional "costs|expenses|..." suffix is moot
+_RD_MATCHER = PhraseMatcher(["research and development", "research & development", "r&d"])
+
+
+def extract_ai_content(text: str, sentences: Optional[SentenceIndex] = None) -> Optional[str]:
+    """Extract AI-related content with context."""
+    matches = extract_matches_with_context(text, _AI_MATCHER, sentences)
     return format_matches_as_section(matches, "ai_specific_content")
 
 
-def extract_rd_content(text: str) -> Optional[str]:
+def extract_rd_content(text: str, sentences: Optional[SentenceIndex] = None) -> Optional[str]:
     """Extract R&D-related content with context."""
-    pattern = (
-        r"(?i)(?:Research\s+(?:&|and)\s+Development|R&D)\s*"
-        r"(?:costs|expenses|activities|initiatives|efforts|investments|spending|"
-        r"expenditures|programs|projects|operations|facilities|capabilities|strategy)?"
-    )
-    matches = extract_matches_with_context(text, pattern)
+    matches = extract_matches_with_context(text, _RD_MATCHER, sentences)
     return format_matches_as_section(matches, "rd_specific_content")
-
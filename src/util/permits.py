@@ -0,0 +1,59 @@
+"""Per-provider concurrency permits shared by a fan-out and the fetches it runs."""
+from __future__ import annotations
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List
+
+_local = threading.local()
+
+
+@contextmanager
+def holding(provider: str, gate: threading.Semaphore) -> Iterator[None]:
+    """Mark the current thread as holding one of `provider`'s `gate` permits."""
+    previous = getattr(_local, "held", None)
+    _local.held = (provider, gate)
+    try:
+        yield
+    finally:
+        _local.held = previous
+
+
+def map_within_limit(provider: str, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+    """
+    `[fn(item) for item in items]`, run concurrently without exceeding `provider`'s cap.
+
+    Inside a fan-out task that holds a `provider` permit, extra workers only
+    run on permits that are free right now (never waiting for one, so nested
+    fetches can't deadlock the fan-out); items beyond those run on the held
+    permit. Outside a fan-out every item gets its own thread.
+
+    Returns:
+        Results in item order
+    """
+    items = list(items)
+    held = getattr(_local, "held", None)
+    gate = held[1] if held is not None and held[0] == provider else None
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    if gate is None:
+        with ThreadPoolExecutor(max_workers=len(items)) as pool:
+            return list(pool.map(fn, items))
+
+    extra = 0
+    while extra < len(items) - 1 and gate.acquire(blocking=False):
+        extra += 1
+    if not extra:
+        return [fn(item) for item in items]
+
+    def run(item: Any) -> Any:
+        with holding(provider, gate):
+            return fn(item)
+
+    try:
+        # The calling thread only waits here, so extra + 1 permits cover the workers
+        with ThreadPoolExecutor(max_workers=extra + 1) as pool:
+            return list(pool.map(run, items))
+    finally:
+        for _ in range(extra):
+            gate.release()
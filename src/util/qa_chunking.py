@@ -0,0 +1,176 @@
+"""Structure-aware chunking of documents for mf-qa's map phase."""
+from __future__ import annotations
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.util.doc_diff import split_sections
+from src.util.filing_index import SENTENCE_BREAK_RE
+from src.util.filing_sections import SectionIndex
+from src.util.filings_processor import PhraseMatcher
+from src.util.qa_pipeline import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_CHUNK_TOKENS = 3750
+_LINE_RE = re.compile(r"[^\n]+")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+# Cover page, check boxes, signatures, exhibit index and page furniture
+_BOILERPLATE = PhraseMatcher([
+    "table of contents", "indicate by check mark", "securities and exchange commission", "washington, d.c.",
+    "commission file number", "exact name of registrant", "state or other jurisdiction", "i.r.s. employer",
+    "address of principal executive", "registrant's telephone", "securities registered pursuant to",
+    "accelerated filer", "smaller reporting company", "emerging growth company", "☐", "☒",
+    "pursuant to the requirements of", "/s/", "power of attorney", "exhibit index", "exhibit number",
+    "exhibit no.", "incorporated by reference", "incorporated herein by reference", "filed herewith",
+    "furnished herewith",
+])
+# A contents line: "Item 7. Management's Discussion ... 24" / "Risk Factors | 12"
+_TOC_LINE_RE = re.compile(r"^\W*(?:part\s+[ivx]+|item\s*\d{1,2}[a-c]?)\b.{0,150}?\D(\d{1,3})\W*$", re.IGNORECASE)
+_MAX_NOISE_WORDS = 3
+_MAX_TOC_WORDS = 12
+# A chunk is dropped when less than this share of its words is substantive
+_MIN_CONTENT_SHARE = 0.2
+
+
+def _is_boilerplate(line: str, in_toc: bool) -> bool:
+    words = line.split()
+    if len(words) <= _MAX_NOISE_WORDS or not _LETTER_RE.search(line):
+        return True  # headings, page numbers, table rules
+    if in_toc and len(words) <= _MAX_TOC_WORDS:
+        return True
+    return bool(_TOC_LINE_RE.match(line)) or _BOILERPLATE.search(line)
+
+
+def _pieces(text: str, start: int, end: int, budget: int) -> Iterator[Tuple[int, int]]:
+    """Spans of at most `budget` chars covering text[start:end], cut at sentences, then spaces."""
+    if end - start <= budget:
+        yield start, end
+        return
+    cuts = [m.end() for m in SENTENCE_BREAK_RE.finditer(text, start, end)] + [end]
+    piece = start
+    for i, cut in enumerate(cuts):
+        following = cuts[i + 1] if i + 1 < len(cuts) else None
+        if following is not None and following - piece <= budget:
+            continue
+        while cut - piece > budget:
+            space = text.rfind(" ", piece + 1, piece + budget)
+            split = space if space > piece else piece + budget
+            yield piece, split
+            piece = split
+        if cut > piece:
+            yield piece, cut
+            piece = cut
+
+
+def _section_spans(text: str, index: SectionIndex) -> List[Tuple[int, str]]:
+    """(start, label) of each Item section, from split_sections' contiguous slices."""
+    spans, offset = [], 0
+    for label, section in split_sections(text, index):
+        spans.append((offset, label))
+        offset += len(section)
+    return spans
+
+
+def chunk_document(
+    text: str,
+    source: str,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    index: Optional[SectionIndex] = None,
+) -> Tuple[List[Dict], int]:
+    """
+    Split `text` at section, line and sentence boundaries into chunks of at most `max_tokens`.
+
+    Lines are packed greedily; a new Item section starts a new chunk once
+    the current one is half full (always after the preamble), so sections
+    are rarely cut. A line longer
+    than the budget is cut at sentence ends, and a sentence longer than the
+    budget at spaces. Lines of the contents page, cover page, signatures and
+    exhibit index count as boilerplate, and chunks that are mostly
+    boilerplate are dropped (unless that would drop everything).
+
+    Args:
+        text: Document text
+        source: Label for citations (file path or "INLINE")
+        max_tokens: Token budget per chunk (estimated locally)
+        index: SectionIndex of `text` (built on the fly if omitted)
+
+    Returns:
+        (chunks, dropped) where each chunk has source, section, start, end,
+        tokens and text (text == the document's [start:end] slice)
+    """
+    if index is None:
+        index = SectionIndex.build(text)
+    budget = max(1, max_tokens) * CHARS_PER_TOKEN
+    toc = [(h["start"], h["end"]) for h in index.headings if h["toc"]]
+    toc_span = (toc[0][0], toc[-1][1]) if toc else (0, 0)
+    sections = _section_spans(text, index)
+
+    # (start, end, section number, words, boilerplate words) per packable unit
+    units = []
+    section = 0
+    for line in _LINE_RE.finditer(text):
+        while section + 1 < len(sections) and line.start() >= sections[section + 1][0]:
+            section += 1
+        words = len(line.group().split())
+        if not words:
+            continue
+        noise = words if _is_boilerplate(line.group(), toc_span[0] <= line.start() < toc_span[1]) else 0
+        for start, end in _pieces(text, line.start(), line.end(), budget):
+            share = len(text[start:end].split())
+            units.append((start, end, section, share, share if noise else 0))
+
+    packed: List[List[Tuple]] = []
+    for unit in units:
+        if packed:
+            current = packed[-1]
+            size = unit[1] - current[0][0]
+            new_section = unit[2] != current[-1][2]
+            # The preamble (cover page, contents) always closes its own chunk
+            half_full = current[-1][1] - current[0][0] >= budget // 2 or sections[current[-1][2]][1] == "Preamble"
+            if size <= budget and not (new_section and half_full):
+                current.append(unit)
+                continue
+        packed.append([unit])
+
+    chunks, substantive = [], []
+    for group in packed:
+        words = sum(u[3] for u in group)
+        boilerplate = sum(u[4] for u in group)
+        start, end = group[0][0], group[-1][1]
+        chunks.append({
+            "source": source,
+            "section": sections[group[0][2]][1],
+            "start": start,
+            "end": end,
+            "tokens": estimate_tokens(text[start:end]),
+            "text": text[start:end],
+        })
+        substantive.append(words - boilerplate >= _MIN_CONTENT_SHARE * words)
+    if not any(substantive):
+        return chunks, 0
+    return [c for c, keep in zip(chunks, substantive) if keep], substantive.count(False)
+
+
+def chunk_documents(documents: List[Tuple[str, str]], max_tokens: int = DEFAULT_CHUNK_TOKENS) -> Tuple[List[Dict], int]:
+    """
+    Chunk each (source, text) separately; chunks never span two documents.
+
+    Returns:
+        (chunks in document order, number of boilerplate chunks dropped)
+    """
+    chunks: List[Dict] = []
+    dropped = 0
+    for source, text in documents:
+        doc_chunks, doc_dropped = chunk_document(text, source, max_tokens)
+        chunks += doc_chunks
+        dropped += doc_dropped
+    return chunks, dropped
+
+
+def format_chunk(chunk: Dict) -> str:
+    """
+    Chunk text under a header naming its source and section, for citations.
+
+    Offsets stay out of the prompt (they are in the chunk manifest): an edit
+    early in a document shifts every later offset, and the prompt of an
+    unchanged chunk must stay the same for its cached partial to be reused.
+    """
+    return f"===== FILE: {chunk['source']} [{chunk['section']}] =====\n{chunk['text']}"
@@ -0,0 +1,340 @@
+"""Concurrent map / tree-reduce pipeline behind mf-qa."""
+from __future__ import annotations
+import os
+import json
+import time
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import anthropic
+
+from src.util.disk_cache import DiskCache, cache_key
+from src.util.workspace import workspace_cache_dir
+
+# Rough English rate for Claude's tokenizer; only used for budgeting
+CHARS_PER_TOKEN = 4
+DEFAULT_CONCURRENCY = 4
+# Partials are reduced in groups once together they exceed this many tokens
+DEFAULT_REDUCE_BUDGET_TOKENS = 50_000
+DEFAULT_MAX_RETRIES = 5
+_BACKOFF_BASE = 1.0
+_BACKOFF_CAP = 30.0
+_PARTIAL_SEPARATOR = "-----"
+# Shortest prefix the API will cache (Sonnet/Opus; Haiku needs 2048); below
+# it cache_control is ignored, so there is nothing to warm up
+MIN_CACHEABLE_TOKENS = 1024
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# USD per million tokens: (input, output); unknown models are priced as Sonnet
+MODEL_PRICES = {
+    "claude-3-5-sonnet-latest": (3.0, 15.0),
+    "claude-3-5-haiku-latest": (0.25, 1.25),
+}
+# Cache writes cost 1.25x the input rate, cache reads 0.1x
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+# Rate limits, overload (529) and other 5xx, dropped connections
+RETRYABLE_ERRORS = (
+    anthropic.RateLimitError,
+    anthropic.InternalServerError,
+    anthropic.APITimeoutError,
+    anthropic.APIConnectionError,
+)
+# Overloaded is an APIStatusError, not an InternalServerError (and older SDKs
+# don't export a class for it), so it is matched by status code
+OVERLOADED_STATUS = 529
+
+
+def _retryable(error: Exception) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS) or (
+        isinstance(error, anthropic.APIStatusError) and error.status_code == OVERLOADED_STATUS
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate (no API call)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def cost_usd(model: str, usage: Dict[str, int]) -> Dict[str, float]:
+    """
+    Cost of `usage` for `model`, with cache writes and reads at their own rates.
+
+    Returns:
+        cost_usd, and cache_savings_usd versus paying the full input rate for cached tokens
+    """
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES["claude-3-5-sonnet-latest"])
+    written = usage.get("cache_creation_input_tokens", 0)
+    read = usage.get("cache_read_input_tokens", 0)
+    cost = (
+        usage.get("input_tokens", 0) * input_price
+        + written * input_price * CACHE_WRITE_MULTIPLIER
+        + read * input_price * CACHE_READ_MULTIPLIER
+        + usage.get("output_tokens", 0) * output_price
+    ) / 1_000_000
+    uncached = cost + (
+        written * input_price * (1 - CACHE_WRITE_MULTIPLIER) + read * input_price * (1 - CACHE_READ_MULTIPLIER)
+    ) / 1_000_000
+    return {"cost_usd": cost, "cache_savings_usd": uncached - cost}
+
+
+def cache_from_env() -> Optional[DiskCache]:
+    """Workspace cache for answers and partials (WORKSPACE_ABS_PATH/.cache/qa); QA_CACHE=0 disables."""
+    root = workspace_cache_dir("qa", "QA_CACHE")
+    if root is None:
+        return None
+    max_mb = int(os.getenv("QA_CACHE_MAX_MB", "256"))
+    return DiskCache(root, max_bytes=max_mb * 1024 * 1024)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retry `attempt` (0-based): Retry-After if sent, else jittered backoff."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after")), _BACKOFF_CAP)
+        except (TypeError, ValueError):
+            pass
+    return min(_BACKOFF_BASE * 2 ** attempt, _BACKOFF_CAP) * random.uniform(0.5, 1.0)
+
+
+class QAPipeline:
+    """
+    Map an instruction over document chunks concurrently, then reduce the partials.
+
+    Map calls run on a pool of `concurrency` threads sharing one client (and
+    its connection pool). Rate-limit, overload and connection errors are
+    retried with exponential backoff, honouring Retry-After. Each partial is
+    written to `partials_dir` as soon as it completes, so an interrupted run
+    leaves its finished work on disk. When the partials together exceed
+    `reduce_budget_tokens`, they are reduced in groups that fit the budget,
+    level by level, until one final reduce call fits.
+
+    Requests are laid out for prompt caching: the system prompt, instruction
+    and schema form a stable prefix whose last block carries `cache_control`,
+    and the chunk (or partials) follows as the variable suffix. When the
+    prefix is long enough to be cached, the first map call runs alone so
+    the remaining calls read the prefix from the cache instead of all
+    writing it at once.
+
+    With a `cache`, map partials are stored under a hash of the model,
+    prompts and chunk text (not its position), so a re-run after editing
+    one section only calls the model for the chunks that changed.
+
+    Args:
+        client: anthropic.Anthropic client (its own retries should be disabled)
+        model: Model name
+        system_prompt: System prompt for every call
+        instruction: The user's instruction
+        schema: Optional JSON schema the answer must follow
+        concurrency: Max simultaneous API calls
+        reduce_budget_tokens: Estimated tokens of partials one reduce call may take
+        max_retries: Retries per call on retryable errors
+        partials_dir: Directory receiving map/reduce partials (None = keep in memory only)
+        max_tokens: Output token cap per call
+        cache_prompts: Mark the stable prefix with cache_control
+        cache: DiskCache for map partials (None = no reuse across runs)
+    """
+
+    def __init__(
+        self,
+        client: "anthropic.Anthropic",
+        model: str,
+        system_prompt: str,
+        instruction: str,
+        schema: Optional[Dict[str, Any]] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        reduce_budget_tokens: int = DEFAULT_REDUCE_BUDGET_TOKENS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        partials_dir: Optional[Path] = None,
+        max_tokens: int = 1500,
+        cache_prompts: bool = True,
+        cache: Optional[DiskCache] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.system_prompt = system_prompt
+        self.instruction = instruction
+        self.schema = schema
+        self.concurrency = max(1, concurrency)
+        self.reduce_budget_tokens = reduce_budget_tokens
+        self.max_retries = max_retries
+        self.partials_dir = Path(partials_dir) if partials_dir else None
+        self.max_tokens = max_tokens
+        self.cache_prompts = cache_prompts
+        self.cache = cache
+        self.usage = {
+            "input_tokens": 0, "output_tokens": 0, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0,
+            "calls": 0, "retries": 0, "reduce_levels": 0, "cached_partials": 0,
+        }
+        self._lock = threading.Lock()
+
+    # ---- API calls ----
+
+    def call(self, content: Union[str, List[Dict[str, Any]]]) -> str:
+        """One messages.create call, retried on rate limits / overload; returns the text."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    system=self.system_prompt,
+                    messages=[{"role": "user", "content": content}],
+                )
+                break
+            except anthropic.APIError as e:
+                if attempt == self.max_retries or not _retryable(e):
+                    raise
+                with self._lock:
+                    self.usage["retries"] += 1
+                time.sleep(_retry_delay(e, attempt))
+        with self._lock:
+            self.usage["calls"] += 1
+            for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+                self.usage[field] += getattr(response.usage, field, None) or 0
+        return response.content[0].text if response.content else ""
+
+    def _save_partial(self, name: str, record: Dict[str, Any]) -> None:
+        if self.partials_dir is None:
+            return
+        self.partials_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.partials_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.partials_dir / f"{name}.json")
+
+    def _run_all(
+        self, prompts: List[Any], names: List[str], warm_up: bool = False, keys: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Run prompts concurrently; results in input order, each saved as it completes.
+
+        With `warm_up`, the first prompt runs alone so its cache write is
+        visible to the rest. With `keys`, each result is also stored in the
+        cache as it completes.
+        """
+        results: List[Optional[str]] = [None] * len(prompts)
+
+        def finish(i: int, text: str) -> None:
+            results[i] = text
+            self._save_partial(names[i], {"name": names[i], "text": text})
+            if keys is not None and self.cache is not None:
+                self.cache.set(keys[i], text, meta={"name": names[i]})
+
+        pending = list(range(len(prompts)))
+        if warm_up and len(prompts) > 1:
+            finish(0, self.call(prompts[0]))
+            pending = pending[1:]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(pending)))) as pool:
+            futures = {pool.submit(self.call, prompts[i]): i for i in pending}
+            try:
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+            except BaseException:
+                # Don't pay for queued calls whose results would be thrown away
+                for future in futures:
+                    future.cancel()
+                raise
+        return results  # type: ignore[return-value]
+
+    # ---- Prompts ----
+
+    def prefix(self) -> str:
+        """The part of every request that doesn't depend on the chunk: instruction and schema."""
+        parts = [f"INSTRUCTION:\n{self.instruction}"]
+        if self.schema:
+            parts.append(f"OUTPUT_SCHEMA (JSON):\n{json.dumps(self.schema)}")
+        return "\n\n".join(parts)
+
+    def _content(self, suffix: str) -> List[Dict[str, Any]]:
+        """Stable prefix block (cache breakpoint) followed by the variable block."""
+        stable: Dict[str, Any] = {"type": "text", "text": self.prefix()}
+        if self.cache_prompts:
+            stable["cache_control"] = _CACHE_CONTROL
+        return [stable, {"type": "text", "text": suffix}]
+
+    def _cacheable(self) -> bool:
+        return self.cache_prompts and estimate_tokens(self.system_prompt + self.prefix()) >= MIN_CACHEABLE_TOKENS
+
+    def partial_key(self, chunk: str) -> str:
+        """Cache key of the map partial for `chunk`: same model, prompts and text -> same partial."""
+        return cache_key("qa-map", self.model, self.max_tokens, self.system_prompt, self.prefix(), chunk)
+
+    def map_prompt(self, chunk: str, index: int, total: int) -> List[Dict[str, Any]]:
+        return self._content(f"CHUNK {index + 1}/{total}:\n{chunk}")
+
+    def reduce_prompt(self, partials: List[str], group: Optional[str] = None) -> List[Dict[str, Any]]:
+        label = "PARTIALS" if group is None else (
+            f"PARTIALS ({group}; combine them into one partial answer, it will be merged with the others)"
+        )
+        body = [_PARTIAL_SEPARATOR]
+        for partial in partials:
+            body += [partial, _PARTIAL_SEPARATOR]
+        return self._content(f"{label}:\n" + "\n".join(body))
+
+    # ---- Map / reduce ----
+
+    def map(self, chunks: List[str]) -> List[str]:
+        """Partial answers for every chunk, in chunk order; cached partials are reused."""
+        names = [f"map_{i + 1:04d}" for i in range(len(chunks))]
+        partials: List[Optional[str]] = [None] * len(chunks)
+        keys = [self.partial_key(chunk) for chunk in chunks] if self.cache is not None else None
+        if keys is not None:
+            for i, key in enumerate(keys):
+                partials[i] = self.cache.get(key)
+                if partials[i] is not None:
+                    self.usage["cached_partials"] += 1
+                    self._save_partial(names[i], {"name": names[i], "text": partials[i], "cached": True})
+        todo = [i for i, partial in enumerate(partials) if partial is None]
+        fresh = self._run_all(
+            [self.map_prompt(chunks[i], i, len(chunks)) for i in todo],
+            [names[i] for i in todo],
+            warm_up=self._cacheable(),
+            keys=[keys[i] for i in todo] if keys is not None else None,
+        )
+        for i, partial in zip(todo, fresh):
+            partials[i] = partial
+        return partials  # type: ignore[return-value]
+
+    def _groups(self, partials: List[str]) -> List[List[str]]:
+        """Consecutive partials packed into groups within the reduce budget."""
+        groups: List[List[str]] = []
+        size = 0
+        for partial in partials:
+            tokens = estimate_tokens(partial)
+            if groups and size + tokens <= self.reduce_budget_tokens:
+                groups[-1].append(partial)
+                size += tokens
+            else:
+                groups.append([partial])
+                size = tokens
+        return groups
+
+    def reduce(self, partials: List[str]) -> str:
+        """Tree-reduce `partials` until they fit one call, then produce the final answer."""
+        level = 0
+        while len(partials) > 1 and sum(map(estimate_tokens, partials)) > self.reduce_budget_tokens:
+            groups = self._groups(partials)
+            if len(groups) == len(partials):
+                break  # no two partials fit together; the final call gets them all
+            level += 1
+            merge = [g for g in groups if len(g) > 1]
+            merged = iter(self._run_all(
+                [self.reduce_prompt(g, f"group {n + 1} of {len(merge)}") for n, g in enumerate(merge)],
+                [f"reduce_{level}_{n + 1:04d}" for n in range(len(merge))],
+            ))
+            partials = [next(merged) if len(g) > 1 else g[0] for g in groups]
+        with self._lock:
+            self.usage["reduce_levels"] = level + 1
+        final = self.call(self.reduce_prompt(partials))
+        self._save_partial("final", {"name": "final", "text": final})
+        return final
+
+    def run(self, chunks: List[str]) -> str:
+        """Map over `chunks` and reduce to the final answer text."""
+        return self.reduce(self.map(chunks))
@@ -1,5 +1,22 @@
 """Workspace utility functions."""
+import os
 from pathlib import Path
+from typing import Optional
+
+
+def workspace_dir() -> Path:
+    """Absolute WORKSPACE_ABS_PATH (default ./runtime/workspace)."""
+    return Path(os.getenv("WORKSPACE_ABS_PATH", "./runtime/workspace")).resolve()
+
+
+def workspace_cache_dir(name: str, disable_env: Optional[str] = None) -> Optional[Path]:
+    """
+    WORKSPACE_ABS_PATH/.cache/`name`, or None when the `disable_env` variable
+    is 0, false or off.
+    """
+    if disable_env and os.getenv(disable_env, "1").lower() in ("0", "false", "off"):
+        return None
+    return workspace_dir() / ".cache" / name
 
 
 def ensure_workspace(root: Path) -> None:
@@ -0,0 +1,118 @@
+"""Shared fixtures: local stand-in HTTP(S) servers for offline provider tests."""
+import json
+import ssl
+import shutil
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+from src.providers.capiq import CapIQProvider
+
+
+@pytest.fixture(scope="session")
+def tls_cert(tmp_path_factory):
+    """Self-signed certificate for localhost (requires the openssl binary)."""
+    if not shutil.which("openssl"):
+        pytest.skip("openssl not available")
+    d = tmp_path_factory.mktemp("tls")
+    cert, key = d / "cert.pem", d / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+@pytest.fixture
+def serve():
+    """Start a handler class on a local port; returns its base URL."""
+    servers = []
+
+    def _serve(handler_cls, tls=None):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        scheme = "http"
+        if tls:
+            cert, key = tls
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ctx.load_cert_chain(cert, key)
+            server.socket = ctx.wrap_socket(server.socket, server_side=True)
+            scheme = "https"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"{scheme}://localhost:{server.server_address[1]}"
+
+    yield _serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class CapIQStandIn(BaseHTTPRequestHandler):
+    """
+    CapIQ token endpoint plus GDS; every GDS call is recorded in `requested`.
+
+    Tests swap in `item` (the response item for one input request; by default
+    one "1.0" row) or `gds` (the items for a whole call) via capiq_gds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    requested: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def cell(self, request, rows=(), error=""):
+        """GDS response item echoing `request`, with `rows` (lists of strings) or an ErrMsg."""
+        return {"Identifier": request["identifier"] + ":", "Mnemonic": request["mnemonic"],
+                "Properties": {"periodtype": request["properties"].get("PeriodType", "")},
+                "Rows": [{"Row": row} for row in rows], "ErrMsg": error}
+
+    def item(self, request):
+        return self.cell(request, [["1.0"]])
+
+    def gds(self, requests):
+        return [self.item(r) for r in requests]
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.endswith("/api/v1/token"):
+            self._send({"access_token": "a", "refresh_token": "r", "expires_in_seconds": "3600"})
+            return
+        requests = json.loads(body)["inputRequests"]
+        type(self).requested.append(requests)
+        self._send({"GDSSDKResponse": self.gds(requests)})
+
+
+@pytest.fixture
+def capiq_gds(serve, monkeypatch):
+    """
+    Serve a CapIQStandIn with `overrides` as class attributes (e.g. item=fn);
+    returns (handler, make), where make(**kwargs) builds a CapIQProvider
+    against it. The shared token cache is disabled.
+    """
+    monkeypatch.setenv("CAPIQ_TOKEN_CACHE", "0")
+
+    def _capiq_gds(**overrides):
+        handler = type("CapIQ", (CapIQStandIn,), {"requested": [], **overrides})
+        base = serve(handler)
+
+        def make(**kwargs):
+            return CapIQProvider("user", "secret", auth_base_url=base, data_base_url=f"{base}/gds", **kwargs)
+
+        return handler, make
+
+    return _capiq_gds
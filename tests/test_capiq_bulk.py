@@ -0,0 +1,129 @@
+"""Tests for concurrent, adaptively sized CapIQ bulk dispatch."""
+import time
+import random
+import threading
+from urllib.error import HTTPError
+
+import pytest
+
+from src.providers.capiq.bulk import ChunkSizer, dispatch
+
+
+class _InFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.now = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.now += 1
+            self.peak = max(self.peak, self.now)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.now -= 1
+
+
+def test_results_merge_in_request_order_under_in_flight_limit():
+    rng = random.Random(3)
+    gauge = _InFlight()
+
+    def call(chunk):
+        with gauge:
+            time.sleep(rng.uniform(0, 0.01))
+        return [f"r{i}" for i in chunk]
+
+    out, stats = dispatch(list(range(1000)), call, ChunkSizer(37), max_in_flight=4)
+
+    assert out == [f"r{i}" for i in range(1000)]
+    assert gauge.peak == 4
+    assert stats["calls"] == 28 and stats["retries"] == 0
+
+
+def test_failed_chunks_are_retried_alone_and_split(monkeypatch):
+    monkeypatch.setattr("src.providers.capiq.bulk._retry_delay", lambda error, attempt: 0)
+    sent = []
+    failures = {"left": 2}
+
+    def call(chunk):
+        sent.append(list(chunk))
+        if 100 in chunk and failures["left"]:
+            failures["left"] -= 1
+            raise HTTPError("http://capiq", 503, "Service Unavailable", {}, None)
+        return chunk
+
+    sizer = ChunkSizer(50, min_size=1)
+    out, stats = dispatch(list(range(300)), call, sizer, max_in_flight=2)
+
+    assert out == list(range(300))
+    assert stats["retries"] == 2
+    # Only the chunk holding 100 was re-sent, in halves: 100..149 -> 100..124 -> 100..111
+    assert [c for c in sent if 100 in c] == [list(range(100, 150)), list(range(100, 125)), list(range(100, 112))]
+    assert sum(c.count(0) for c in sent) == 1
+
+
+def test_non_retryable_errors_and_exhausted_retries_raise(monkeypatch):
+    monkeypatch.setattr("src.providers.capiq.bulk._retry_delay", lambda error, attempt: 0)
+
+    def bad_request(chunk):
+        raise HTTPError("http://capiq", 400, "Bad Request", {}, None)
+
+    with pytest.raises(HTTPError):
+        dispatch(list(range(10)), bad_request, ChunkSizer(5))
+
+    def overloaded(chunk):
+        raise HTTPError("http://capiq", 503, "Service Unavailable", {}, None)
+
+    with pytest.raises(HTTPError):
+        dispatch([1], overloaded, ChunkSizer(5), max_retries=2)
+
+
+def test_chunk_size_follows_observed_latency():
+    sizer = ChunkSizer(500, target_seconds=2.0, min_size=10)
+
+    sizer.observe(500, 20.0)  # too slow, cost split unknown: probe a half-size chunk
+    assert sizer.size == 250
+    sizer.observe(250, 10.0)  # 40 ms per request, no overhead -> 50 fit in 2 s
+    assert sizer.size == 50
+    for _ in range(20):
+        sizer.observe(100, 0.1)
+        sizer.observe(50, 0.1)
+    assert sizer.size == 500
+    sizer.failed()
+    assert sizer.size == 250
+
+
+def test_constant_latency_keeps_chunks_at_the_limit():
+    sizer = ChunkSizer(500, target_seconds=2.0, min_size=10)
+    sizes = []
+    for _ in range(15):
+        sizes.append(sizer.size)
+        sizer.observe(sizer.size, 3.0)  # fixed per-call overhead, independent of size
+
+    assert sizes[:3] == [500, 250, 500]  # one probe, then the fit shows size doesn't matter
+    assert sizer.size == 500 and sizes.count(500) == 14
+    assert sizer.overhead == pytest.approx(3.0) and sizer.per_request == pytest.approx(0.0)
+
+
+def _slow_gds(self, requests):
+    """Every request gets a row, after a delay."""
+    with self.gauge:
+        time.sleep(0.05)
+    return [self.item(r) for r in requests]
+
+
+def test_bulk_query_dispatches_chunks_concurrently_in_order(capiq_gds):
+    handler, make = capiq_gds(gds=_slow_gds, gauge=_InFlight())
+    provider = make(max_in_flight=4)
+    tickers = [f"T{i:02d}" for i in range(50)]
+    mnemonics = [f"IQ_M{i}" for i in range(10)]
+    periods = [f"IQ_FY+{i}" for i in range(1, 11)]
+
+    points = provider.bulk_query(tickers, mnemonics, periods=periods)
+
+    assert [(p.identifier, p.mnemonic, p.period) for p in points] == [
+        (t, m, p) for t in tickers for m in mnemonics for p in periods
+    ]
+    assert len(handler.requested) == provider.stats["gds_calls"] == 10
+    assert handler.gauge.peak == 4
@@ -0,0 +1,81 @@
+"""Tests for the cell-level GDSP cache inside CapIQProvider.bulk_query."""
+import pytest
+
+from src.providers.capiq.cells import EMPTY_CELL_TTL, ESTIMATE_TTLS, PAST_VALUES_TTL, CellCache, cell_key
+
+
+def _item(self, request):
+    """Value = FY offset; EMPTY has no data, IQ_BAD errors."""
+    if request["mnemonic"] == "IQ_BAD":
+        return self.cell(request, error="InvalidMnemonic")
+    if request["identifier"] == "EMPTY":
+        return self.cell(request, [["Data Unavailable"]])
+    period = request["properties"].get("PeriodType", "")
+    return self.cell(request, [[period.rsplit("+", 1)[-1].rsplit("-", 1)[-1]]])
+
+
+@pytest.fixture
+def provider(capiq_gds, tmp_path):
+    handler, make = capiq_gds(item=_item)
+    return (lambda: make(cell_cache=CellCache(tmp_path / "cells"))), handler
+
+
+def _cells(handler):
+    return [(r["identifier"], r["mnemonic"], r["properties"]["PeriodType"]) for call in handler.requested for r in call]
+
+
+def test_overlapping_estimates_fetch_only_missing_cells(provider):
+    make, handler = provider
+
+    make().get_estimates(["AAPL"], "revenue", years_future=5)
+    assert len(_cells(handler)) == 10
+
+    tomorrow = make()  # a later CLI run
+    points = tomorrow.get_estimates(["AAPL"], "revenue", years_future=3)
+    assert len(_cells(handler)) == 10 and tomorrow.stats["gds_calls"] == 0
+    assert tomorrow.cell_cache.summary() == {"hits": 6, "misses": 0}
+    assert [(p.mnemonic, p.period, p.value) for p in points] == [
+        (m, f"IQ_FY+{y}", float(y)) for m in ("IQ_REVENUE_EST_CIQ", "IQ_REVENUE_NUM_EST_CIQ") for y in (1, 2, 3)
+    ]
+
+    wider = make()
+    points = wider.get_estimates(["AAPL", "MSFT"], "revenue", years_future=6)
+    assert wider.cell_cache.summary() == {"hits": 10, "misses": 14}
+    assert sorted(_cells(handler)[10:]) == sorted(
+        [("AAPL", m, "IQ_FY+6") for m in ("IQ_REVENUE_EST_CIQ", "IQ_REVENUE_NUM_EST_CIQ")]
+        + [("MSFT", m, f"IQ_FY+{y}") for m in ("IQ_REVENUE_EST_CIQ", "IQ_REVENUE_NUM_EST_CIQ") for y in range(1, 7)]
+    )
+    # Cached and fetched cells merge back in request order
+    assert [(p.identifier, p.period) for p in points[:7]] == [("AAPL", f"IQ_FY+{y}") for y in range(1, 7)] + [
+        ("AAPL", "IQ_FY+1")]
+
+
+def test_staleness_policy_per_method(provider):
+    make, handler = provider
+    capiq = make()
+    capiq.get_estimates(["AAPL"], "forward_pe", years_future=1)
+    capiq.get_past_values(["AAPL"], "revenue", years=1)
+    capiq.get_estimates(["EMPTY"], "eps", years_future=1)
+
+    def ttl(request):
+        entry = capiq.cell_cache.store.get_entry(cell_key(request))
+        return round(entry["expires_at"] - entry["stored_at"])
+
+    forward_pe, actual, empty = handler.requested[0][0], handler.requested[1][0], handler.requested[2][0]
+    assert ttl(forward_pe) == ESTIMATE_TTLS["forward_pe"]
+    assert ttl(actual) == PAST_VALUES_TTL
+    assert ttl(empty) == min(ESTIMATE_TTLS["eps"], EMPTY_CELL_TTL)
+
+
+def test_errored_cells_are_not_cached_and_direct_queries_bypass(provider):
+    make, handler = provider
+    capiq = make()
+
+    capiq.bulk_query(["AAPL"], ["IQ_OK", "IQ_BAD"], periods=["IQ_FY+1"], cache_ttl=60)
+    # Only the errored cell is asked again; alone in its call, its error surfaces as before
+    with pytest.raises(Exception, match="InvalidMnemonic"):
+        capiq.bulk_query(["AAPL"], ["IQ_OK", "IQ_BAD"], periods=["IQ_FY+1"], cache_ttl=60)
+    assert _cells(handler)[2:] == [("AAPL", "IQ_BAD", "IQ_FY+1")]
+
+    capiq.bulk_query(["AAPL"], ["IQ_OK"], periods=["IQ_FY+1"])  # no cache_ttl: always fetched
+    assert _cells(handler)[-1] == ("AAPL", "IQ_OK", "IQ_FY+1")
@@ -0,0 +1,70 @@
+"""Tests for multi-ticker, multi-metric CapIQ estimates (DataHub.estimates_batch)."""
+from decimal import Decimal
+
+import pytest
+
+from src.datahub import DataHub
+from src.providers.capiq.cells import ESTIMATE_TTLS, CellCache, cell_key
+
+
+def _item(self, request):
+    """Estimates are 100 + FY offset, analyst counts 7; ZZZZ is unknown, ISINs echo a company id."""
+    if request["identifier"] == "ZZZZ":
+        return self.cell(request, error="InvalidIdentifier")
+    if "NUM_EST" in request["mnemonic"]:
+        item = self.cell(request, [["7"]])
+    else:
+        item = self.cell(request, [[str(100 + int(request["properties"]["PeriodType"].rsplit("+", 1)[-1]))]])
+    if request["identifier"].startswith("US"):
+        item["Identifier"] = "IQ24937:"
+    return item
+
+
+@pytest.fixture
+def hub(capiq_gds, tmp_path):
+    handler, make = capiq_gds(item=_item)
+    capiq = make(cell_cache=CellCache(tmp_path / "cells"))
+    return DataHub(fmp=object(), sec=object(), capiq=capiq, cache=object(), prices=object(),
+                   filing_search=object()), handler
+
+
+def test_peer_group_estimates_in_one_bulk_query(hub):
+    hub, handler = hub
+
+    found = hub.estimates_batch(["AAPL", "MSFT", "ZZZZ"], ["revenue", "eps", "forward_pe"], years_future=2)
+
+    assert hub.capiq.stats["gds_calls"] == 1 and len(handler.requested[0]) == 3 * 5 * 2
+    assert list(found) == ["AAPL", "MSFT", "ZZZZ"]
+    assert list(found["MSFT"]) == ["revenue", "eps", "forward_pe"]
+    eps = found["MSFT"]["eps"]
+    assert (eps.ticker, eps.metric_type) == ("MSFT", "eps")
+    assert [(p.period, p.value, p.num_estimates) for p in eps.points] == [
+        ("IQ_FY+1", Decimal("101.0"), 7), ("IQ_FY+2", Decimal("102.0"), 7)]
+    assert [p.num_estimates for p in found["AAPL"]["forward_pe"].points] == [None, None]
+    assert all(not est.points for est in found["ZZZZ"].values())
+
+    # Each metric's cells keep their own staleness policy
+    entry = hub.capiq.cell_cache.store.get_entry(cell_key(next(
+        r for r in handler.requested[0] if r["mnemonic"] == "IQ_PE_EXCL_FWD_CIQ")))
+    assert round(entry["expires_at"] - entry["stored_at"]) == ESTIMATE_TTLS["forward_pe"]
+
+
+def test_single_estimates_matches_batch(hub):
+    hub, handler = hub
+
+    single = hub.estimates("AAPL", "revenue", years_future=2)
+    assert single == hub.estimates_batch(["AAPL"], ["revenue"], years_future=2)["AAPL"]["revenue"]
+    assert hub.capiq.stats["gds_calls"] == 1
+
+    with pytest.raises(ValueError, match="Unsupported estimate type"):
+        hub.estimates_batch(["AAPL"], ["revenue", "bogus"])
+
+
+def test_points_follow_the_request_not_the_echoed_identifier(hub):
+    hub, handler = hub
+
+    found = hub.estimates_batch(["US0378331005", "MSFT"], ["eps"], years_future=1)
+
+    assert [(p.period, p.value) for p in found["US0378331005"]["eps"].points] == [("IQ_FY+1", Decimal("101.0"))]
+    assert len(found["MSFT"]["eps"].points) == 1
+    assert hub.estimates("US0378331005", "eps", years_future=1).points
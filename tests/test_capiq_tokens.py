@@ -0,0 +1,188 @@
+"""Tests for the shared CapIQ token store against a stand-in auth / GDS server."""
+import json
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+from src.providers.capiq import CapIQProvider
+from src.providers.capiq.tokens import TokenStore
+
+REPO = Path(__file__).resolve().parent.parent
+PAYLOAD = {"inputRequests": [{"function": "GDSP", "identifier": "AAPL", "mnemonic": "IQ_REVENUE_EST_CIQ",
+                              "properties": {"PeriodType": "IQ_FY+1"}}]}
+
+
+class _CapIQ(BaseHTTPRequestHandler):
+    """Token, tokenRefresh and GDS endpoints; GDS answers 401 for unknown or revoked tokens."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    logins = 0
+    refreshes = 0
+    issued = 0
+    valid: set = set()
+    expires_in = "3600"
+    reject_delay = 0.0
+    rejections = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _issue(self):
+        cls = type(self)
+        cls.issued += 1
+        token = f"access-{cls.issued}"
+        cls.valid.add(token)
+        return {"access_token": token, "refresh_token": f"refresh-{cls.issued}",
+                "token_type": "Bearer", "expires_in_seconds": cls.expires_in}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        cls = type(self)
+        rejected = 0
+        with cls.lock:
+            if self.path.endswith("/api/v1/token"):
+                cls.logins += 1
+                self._send(200, self._issue())
+            elif self.path.endswith("/api/v1/tokenRefresh"):
+                cls.refreshes += 1
+                assert parse_qs(body)["refreshToken"][0].startswith("refresh-")
+                self._send(200, self._issue())
+            elif self.headers["Authorization"].split()[-1] not in cls.valid:
+                cls.rejections += 1
+                rejected = cls.rejections
+            else:
+                self._send(200, {"GDSSDKResponse": [{
+                    "Function": "GDSP", "Identifier": "AAPL", "Mnemonic": "IQ_REVENUE_EST_CIQ",
+                    "Properties": {"periodtype": "IQ_FY+1"}, "Rows": [{"Row": ["420000.0"]}], "ErrMsg": "",
+                }]})
+        if rejected:
+            # Staggered, so later rejections arrive after an earlier one was handled
+            time.sleep(cls.reject_delay * rejected)
+            self._send(401, {"error": "invalid token"})
+
+
+@pytest.fixture
+def capiq(serve):
+    class Handler(_CapIQ):
+        lock = threading.Lock()
+        logins = 0
+        refreshes = 0
+        issued = 0
+        valid = set()
+        expires_in = "3600"
+        reject_delay = 0.0
+        rejections = 0
+
+    return Handler, serve(Handler)
+
+
+def _provider(base, token_path):
+    return CapIQProvider("user", "secret", auth_base_url=base, data_base_url=f"{base}/gds",
+                         token_store=TokenStore(token_path))
+
+
+def test_successive_processes_reuse_one_token(capiq, tmp_path):
+    handler, base = capiq
+
+    for _ in range(3):  # each CLI run builds a new provider
+        points = _provider(base, tmp_path / "token.json").call_gdsapi(PAYLOAD)
+        assert points[0].value == 420000.0
+
+    assert handler.logins == 1 and handler.refreshes == 0
+    assert (tmp_path / "token.json").stat().st_mode & 0o077 == 0
+
+
+def test_expiring_token_is_refreshed_not_relogged(capiq, tmp_path):
+    handler, base = capiq
+    handler.expires_in = "30"  # inside the renewal margin: stale as soon as it is stored
+
+    _provider(base, tmp_path / "token.json").call_gdsapi(PAYLOAD)
+    handler.expires_in = "3600"
+    provider = _provider(base, tmp_path / "token.json")
+    provider.call_gdsapi(PAYLOAD)
+
+    assert (handler.logins, handler.refreshes) == (1, 1)
+    assert provider.access_token == "access-2"
+    assert json.loads((tmp_path / "token.json").read_text())["refresh_token"] == "refresh-2"
+
+
+def test_parallel_providers_log_in_once(capiq, tmp_path):
+    handler, base = capiq
+    errors = []
+
+    def run():
+        try:
+            _provider(base, tmp_path / "token.json").call_gdsapi(PAYLOAD)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors and handler.logins == 1
+
+
+def test_parallel_cli_processes_share_the_token(capiq, tmp_path):
+    handler, base = capiq
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1])\n"
+        "from src.providers.capiq import CapIQProvider\n"
+        "p = CapIQProvider('user', 'secret', auth_base_url=sys.argv[2], data_base_url=sys.argv[2] + '/gds')\n"
+        f"print(p.call_gdsapi({PAYLOAD!r})[0].value)\n"
+    )
+    env = {"WORKSPACE_ABS_PATH": str(tmp_path / "ws"), "PATH": ""}
+    procs = [subprocess.Popen([sys.executable, "-c", script, str(REPO), base], env=env,
+                              stdout=subprocess.PIPE, text=True) for _ in range(4)]
+
+    assert [p.communicate()[0].strip() for p in procs] == ["420000.0"] * 4
+    assert handler.logins == 1
+    assert len(list((tmp_path / "ws" / ".cache" / "capiq").glob("token_*.json"))) == 1
+
+
+def test_revoked_token_is_replaced(capiq, tmp_path):
+    handler, base = capiq
+    _provider(base, tmp_path / "token.json").call_gdsapi(PAYLOAD)
+    handler.valid.clear()  # server-side revocation
+
+    provider = _provider(base, tmp_path / "token.json")
+    assert provider.call_gdsapi(PAYLOAD)[0].value == 420000.0
+    assert provider.access_token == "access-2"
+    assert handler.refreshes == 1
+
+
+def test_concurrent_chunks_renew_a_revoked_token_once(capiq, tmp_path):
+    handler, base = capiq
+    provider = _provider(base, tmp_path / "token.json")
+    provider.call_gdsapi(PAYLOAD)
+    handler.valid.clear()
+    handler.reject_delay = 0.1
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(provider.call_gdsapi(PAYLOAD)[0].value))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Chunks rejected with the old token must not invalidate the one another chunk renewed
+    assert results == [420000.0] * 4
+    assert (handler.logins, handler.refreshes) == (1, 1) and provider.access_token == "access-2"
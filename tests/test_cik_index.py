@@ -0,0 +1,78 @@
+"""Tests for the local ticker -> CIK index."""
+import json
+import os
+import time
+
+import pytest
+
+from src.providers.ratelimit import FileTokenBucket
+from src.providers.sec import SecProvider
+from src.providers.sec.cik_index import CikIndex
+
+COMPANY_TICKERS = {
+    "0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    "1": {"cik_str": 789019, "ticker": "MSFT", "title": "MICROSOFT CORP"},
+    "2": {"cik_str": 1067983, "ticker": "BRK-B", "title": "BERKSHIRE HATHAWAY INC"},
+}
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "company_tickers.json"
+    path.write_text(json.dumps(COMPANY_TICKERS))
+    return path
+
+
+def test_lookup_from_local_source(tmp_path, source):
+    index = CikIndex(tmp_path / "cik.tsv", source_path=source)
+
+    assert index.lookup("aapl") == "0000320193"
+    assert index.lookup("BRK.B") == "0001067983"
+    assert index.lookup("ZZZZ") is None
+    assert (tmp_path / "cik.tsv").read_text().splitlines()[0] == "AAPL\t320193"
+
+
+def test_fresh_tsv_is_reused_without_source(tmp_path, source):
+    CikIndex(tmp_path / "cik.tsv", source_path=source).lookup("AAPL")
+    source.unlink()
+
+    assert CikIndex(tmp_path / "cik.tsv", source_path=source).lookup("MSFT") == "0000789019"
+
+
+def test_stale_tsv_is_refreshed_via_fetch(tmp_path):
+    tsv = tmp_path / "cik.tsv"
+    tsv.write_text("AAPL\t1\n")
+    old = time.time() - 8 * 86400
+    os.utime(tsv, (old, old))
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return json.dumps(COMPANY_TICKERS)
+
+    assert CikIndex(tsv, fetch=fetch).lookup("AAPL") == "0000320193"
+    assert fetched == ["https://www.sec.gov/files/company_tickers.json"]
+
+
+def test_failed_refresh_keeps_stale_index(tmp_path):
+    tsv = tmp_path / "cik.tsv"
+    tsv.write_text("AAPL\t320193\n")
+    os.utime(tsv, (0, 0))
+
+    def fetch(url):
+        raise OSError("offline")
+
+    assert CikIndex(tsv, fetch=fetch).lookup("AAPL") == "0000320193"
+
+
+def test_sec_provider_resolves_cik_without_network(tmp_path, source):
+    class NoNetwork:
+        def get(self, url, headers=None):
+            raise AssertionError(f"unexpected request to {url}")
+
+    sec = SecProvider(
+        transport=NoNetwork(),
+        rate_limiter=FileTokenBucket(tmp_path / "rl.json", rate=10),
+        cik_index=CikIndex(tmp_path / "cik.tsv", source_path=source),
+    )
+    assert sec._get_cik("AAPL") == "0000320193"
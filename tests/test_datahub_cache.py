@@ -0,0 +1,123 @@
+"""Tests for the DataHub response cache and the underlying disk cache."""
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from src.datahub import DataHub
+from src.datahub.cache import ResponseCache, until_next_earnings
+from src.domain.models import FundamentalsQuarterly, QuarterFundamentals, Provenance
+from src.util.disk_cache import DiskCache
+
+
+class FakeFmp:
+    """Counts calls so tests can assert on network round-trips."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_company_profile(self, ticker):
+        self.calls += 1
+        return {"symbol": ticker, "companyName": "Apple Inc."}
+
+    def get_quote(self, ticker):
+        self.calls += 1
+        return [{"symbol": ticker, "price": 190.1}]
+
+    def get_quarterly_fundamentals(self, ticker, limit=8):
+        self.calls += 1
+        return FundamentalsQuarterly(
+            ticker=ticker,
+            currency="USD",
+            quarters=[QuarterFundamentals(period_end="2024-09-28", revenue=Decimal("94930000000"))],
+            provenance=Provenance(source="FMP"),
+        )
+
+
+def make_hub(tmp_path):
+    fmp = FakeFmp()
+    return DataHub(fmp=fmp, sec=object(), cache=ResponseCache(tmp_path)), fmp
+
+
+def test_repeat_calls_hit_cache(tmp_path):
+    hub, fmp = make_hub(tmp_path)
+
+    first = hub.company_profile("AAPL")
+    second = hub.company_profile("aapl ")  # ticker is normalized
+
+    assert first == second
+    assert fmp.calls == 1
+    assert hub.cache.summary() == {"hits": 1, "misses": 1}
+
+
+def test_cache_shared_across_hub_instances(tmp_path):
+    hub, _ = make_hub(tmp_path)
+    hub.quote("MSFT")
+
+    other, fmp = make_hub(tmp_path)
+    other.quote("MSFT")
+
+    assert fmp.calls == 0
+
+
+def test_models_round_trip_as_decimal(tmp_path):
+    hub, fmp = make_hub(tmp_path)
+    hub.fundamentals_quarterly("AAPL", limit=4)
+    cached = hub.fundamentals_quarterly("AAPL", limit=4)
+
+    assert fmp.calls == 1
+    assert isinstance(cached, FundamentalsQuarterly)
+    assert cached.quarters[0].revenue == Decimal("94930000000")
+
+
+def test_different_params_are_different_entries(tmp_path):
+    hub, fmp = make_hub(tmp_path)
+    hub.fundamentals_quarterly("AAPL", limit=4)
+    hub.fundamentals_quarterly("AAPL", limit=8)
+    assert fmp.calls == 2
+
+
+def test_fundamentals_expire_at_next_earnings():
+    recent = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+    value = FundamentalsQuarterly(
+        ticker="AAPL", currency="USD",
+        quarters=[QuarterFundamentals(period_end=recent)],
+        provenance=Provenance(source="FMP"),
+    )
+    days_left = (until_next_earnings(value) - time.time()) / 86400
+    assert 100 < days_left < 110  # 91 + 45 - 30
+
+
+def test_disk_cache_expiry(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.set("k", {"v": 1}, ttl=-1)
+    assert cache.get("k") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_disk_cache_lru_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=2000)
+    for i in range(5):
+        cache.set(f"{i:02d}" * 32, "x" * 300)
+        time.sleep(0.01)
+    cache.get("00" * 32)  # refresh the oldest entry
+    for i in range(5, 8):
+        cache.set(f"{i:02d}" * 32, "x" * 300)
+
+    assert cache.get("00" * 32) == "x" * 300
+    assert cache.get("01" * 32) is None
+    assert cache.stats["evictions"] > 0
+
+
+def test_disk_cache_size_tracks_replaced_entries_across_instances(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    for _ in range(5):
+        cache.set("ab" * 32, "x" * 1000)
+    assert cache.size() == cache._scan_size()
+
+    # A later process picks up the running total without walking the directory
+    monkeypatch.setattr(DiskCache, "_scan_size", lambda self: pytest.fail("scanned"))
+    later = DiskCache(tmp_path)
+    later.set("cd" * 32, "y" * 10)
+    later.delete("ab" * 32)
+    monkeypatch.undo()
+    assert later.size() == later._scan_size() > 0
@@ -0,0 +1,116 @@
+"""Tests for the paragraph-hash diff between two filings."""
+import random
+
+import pytest
+
+from src.util.doc_diff import align, diff_documents, diff_paragraphs, render_changes, split_paragraphs
+
+OLD = """UNITED STATES SECURITIES AND EXCHANGE COMMISSION
+PART I
+Item 1. Business
+We design chips for data centers, gaming and automotive customers around the world.
+
+Item 1A. Risk Factors
+Competition could harm our business and results of operations in many markets.
+Supply chain disruptions may delay shipments to customers across regions.
+Our stock price may be volatile.
+12
+
+Item 7. Management's Discussion and Analysis
+Revenue increased 10% driven by data center demand and strong gaming sales this year.
+"""
+
+NEW = """UNITED STATES SECURITIES AND EXCHANGE COMMISSION
+PART I
+Item 1. Business
+We design chips for data centers, gaming and automotive customers around the world.
+
+Item 1A. Risk Factors
+Competition could harm our business and results of operations in many markets.
+New export controls on shipments to China could reduce our revenue.
+Supply chain disruptions may significantly delay shipments to customers across regions.
+14
+
+Item 7. Management's Discussion and Analysis
+Revenue increased 10% driven by data center demand and strong gaming sales this year.
+Our stock price may be volatile.
+"""
+
+
+def _changes(diff, section):
+    return {c["type"]: c for s in diff["sections"] if s["section"] == section for c in s["changes"]}
+
+
+def test_align_reconstructs_both_sides():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = [rng.randrange(5).to_bytes(1, "big") for _ in range(rng.randrange(12))]
+        b = [x for x in a if rng.random() > 0.2] + [rng.randrange(8).to_bytes(1, "big")]
+        if rng.random() < 0.1:
+            rng.shuffle(b)
+        rebuilt_a, rebuilt_b = [], []
+        for tag, i1, i2, j1, j2 in align(a, b):
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+            rebuilt_a += a[i1:i2]
+            rebuilt_b += b[j1:j2]
+        assert (rebuilt_a, rebuilt_b) == (a, b)
+
+
+def test_sections_are_paired_by_item():
+    diff = diff_documents(OLD, NEW)
+    status = {s["section"]: s["status"] for s in diff["sections"]}
+
+    assert status == {"Preamble": "unchanged", "Item 1": "unchanged", "Item 1A": "changed", "Item 7": "changed"}
+    risk = _changes(diff, "Item 1A")
+    assert risk["added"]["text"].startswith("New export controls")
+    assert risk["modified"]["after"].startswith("Supply chain disruptions may significantly")
+    assert 0.5 < risk["modified"]["similarity"] < 1
+    # A paragraph that changed Items is removed from one and added to the other
+    assert risk["removed"]["text"] == "Our stock price may be volatile."
+    assert _changes(diff, "Item 7")["added"]["text"] == "Our stock price may be volatile."
+    assert (diff["summary"]["paragraphs_a"], diff["summary"]["paragraphs_b"]) == (10, 11)  # page numbers dropped
+
+
+def test_section_restriction_and_extracted_section_files():
+    in_filings = diff_documents(OLD, NEW, section="Risk Factors")
+    assert [s["section"] for s in in_filings["sections"]] == ["Risk Factors"]
+    assert in_filings["summary"]["modified"] == 1
+
+    # Section files have no Item headings; they are the section already
+    collapsed_old = "<risk_factors>\n" + " ".join(OLD.split("Item 1A.")[1].split("Item 7")[0].split()) + "\n</risk_factors>"
+    collapsed_new = "<risk_factors>\n" + " ".join(NEW.split("Item 1A.")[1].split("Item 7")[0].split()) + "\n</risk_factors>"
+    as_files = diff_documents(collapsed_old, collapsed_new, section="1A")
+    assert as_files["summary"]["unchanged"] == 2  # the tags
+    assert as_files["summary"]["modified"] == 1
+
+    with pytest.raises(ValueError):
+        diff_documents(OLD, NEW, section="Item 9B")
+
+
+def test_moved_paragraphs_and_formatting_are_not_changes():
+    old = ["Alpha risk paragraph one.", "Beta risk paragraph two.", "Gamma risk paragraph three."]
+    new = ["- gamma   risk paragraph THREE.", "Alpha risk paragraph one.", "Beta risk paragraph two."]
+
+    diff = diff_paragraphs(old, new)
+
+    assert diff["counts"] == {"unchanged": 2, "added": 0, "removed": 0, "modified": 0, "moved": 1}
+    assert diff["similarity"] == 1.0
+    assert render_changes({"sections": [dict(section="Document", status="changed", **diff)]}).count("\n+") == 0
+
+
+def test_one_long_added_word_is_a_modification():
+    before = "Risk a b c d e f"
+    after = before + " " + "supercalifragilisticexpialidocious" * 3  # 0.93 similar, much longer in chars
+
+    diff = diff_paragraphs([before], [after])
+
+    assert diff["counts"] == {"unchanged": 0, "added": 0, "removed": 0, "modified": 1, "moved": 0}
+
+
+def test_long_lines_are_compared_by_sentence():
+    sentence = "The Company sells products in many regions around the world."
+    long_line = " ".join(f"{sentence[:-1]} number {i}." for i in range(60))
+
+    assert len(split_paragraphs(long_line)) == 60
+    assert split_paragraphs("Intro line\n\n  2024 | 12 \nOutro") == ["Intro line", "Outro"]
@@ -0,0 +1,90 @@
+"""Tests for the concurrent field fan-out planner."""
+import time
+import threading
+from src.datahub.fanout import FieldTask, run_field_tasks
+from src.util.permits import map_within_limit
+
+
+def _sleeper(value, seconds=0.2):
+    def fetch():
+        time.sleep(seconds)
+        return value
+    return fetch
+
+
+def test_wall_time_tracks_slowest_field():
+    tasks = [FieldTask(f"f{i}", "FMP", _sleeper(i)) for i in range(5)]
+
+    start = time.perf_counter()
+    results = run_field_tasks(tasks, max_workers=5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6  # ~0.2s, not 5 x 0.2s
+    assert [r.value for r in results.values()] == [0, 1, 2, 3, 4]
+    assert all(r.t_ms >= 190 for r in results.values())
+
+
+def test_results_keep_task_order():
+    tasks = [
+        FieldTask("slow", "FMP", _sleeper("a", 0.2)),
+        FieldTask("fast", "FMP", _sleeper("b", 0.0)),
+    ]
+    assert list(run_field_tasks(tasks)) == ["slow", "fast"]
+
+
+def test_provider_cap_limits_concurrency():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def fetch():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    tasks = [FieldTask(f"f{i}", "CapIQ", fetch) for i in range(6)]
+    run_field_tasks(tasks, max_workers=6, provider_limits={"CapIQ": 2})
+
+    assert peak == 2
+
+
+def test_errors_captured_per_field():
+    def boom():
+        raise ValueError("bad ticker")
+
+    results = run_field_tasks([
+        FieldTask("ok", "FMP", lambda: 1),
+        FieldTask("bad", "FMP", boom),
+    ])
+
+    assert results["ok"].value == 1 and results["ok"].error is None
+    assert isinstance(results["bad"].error, ValueError)
+
+
+def test_nested_fetches_stay_within_provider_cap():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def request(n):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return n * 2
+
+    # Like fundamentals: one field task fetching three statements
+    tasks = [FieldTask(f"f{i}", "FMP", lambda: map_within_limit("FMP", request, [1, 2, 3])) for i in range(4)]
+    results = run_field_tasks(tasks, max_workers=4, provider_limits={"FMP": 3})
+
+    assert [r.value for r in results.values()] == [[2, 4, 6]] * 4
+    assert peak == 3
+
+    start = time.perf_counter()
+    assert map_within_limit("FMP", request, [1, 2, 3]) == [2, 4, 6]  # no fan-out: all at once
+    assert time.perf_counter() - start < 0.12
@@ -0,0 +1,106 @@
+"""Tests for the accession-keyed SEC filing cache and manifest."""
+import json
+from pathlib import Path
+
+import pytest
+
+from src.providers.http import HttpResponse
+from src.providers.ratelimit import FileTokenBucket
+from src.providers.sec import SecProvider
+from src.providers.sec.cik_index import CikIndex
+
+ATOM = """<feed><entry><content>
+<accession-number>{accession}</accession-number>
+<filing-date>{date}</filing-date>
+</content></entry></feed>"""
+
+SUBMISSION = """<SEC-DOCUMENT>
+<DOCUMENT>
+<TYPE>10-K
+<SEQUENCE>1
+<FILENAME>aapl-20240928.htm
+<TEXT><html><body><p>UNITED STATES SECURITIES AND EXCHANGE COMMISSION</p>
+<p>Annual report for Apple Inc.</p></body></html></TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>"""
+
+
+class FakeEdgar:
+    """Serves browse-edgar and Archives responses; records every URL."""
+
+    def __init__(self):
+        self.urls = []
+        self.latest = ("0000320193-24-000123", "2024-11-01")
+
+    def get(self, url, headers=None):
+        self.urls.append(url)
+        if "browse-edgar" in url:
+            accession, date = self.latest
+            body = ATOM.format(accession=accession, date=date)
+        else:
+            body = SUBMISSION
+        return HttpResponse(url, 200, {}, body.encode())
+
+    def stream(self, url, headers=None):
+        body = self.get(url, headers).body
+        for i in range(0, len(body), 64):
+            yield body[i:i + 64]
+
+    def downloads(self):
+        return [u for u in self.urls if "/Archives/" in u]
+
+
+@pytest.fixture
+def sec(tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKSPACE_ABS_PATH", str(tmp_path))
+    tickers = tmp_path / "company_tickers.json"
+    tickers.write_text(json.dumps({"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}))
+    edgar = FakeEdgar()
+    provider = SecProvider(
+        transport=edgar,
+        rate_limiter=FileTokenBucket(tmp_path / "rl.json", rate=1000),
+        cik_index=CikIndex(tmp_path / "cik.tsv", source_path=tickers),
+    )
+    return provider, edgar
+
+
+def test_same_accession_is_not_downloaded_twice(sec):
+    provider, edgar = sec
+
+    first = provider.get_latest_filing("AAPL", "10-K")
+    second = provider.get_latest_filing("AAPL", "10-K")
+
+    assert len(edgar.downloads()) == 1
+    assert first.provenance.meta["cache_hit"] is False
+    assert second.provenance.meta["cache_hit"] is True
+    assert second.main_text_path == first.main_text_path
+    assert "Annual report" in open(second.main_text_path).read()
+    assert Path(second.main_text_path).with_name("clean.words.idx").exists()
+    exhibits = json.load(open(second.exhibits_index_path))
+    assert exhibits[0]["filename"] == "aapl-20240928.htm"
+    assert open(exhibits[0]["path"]).read().startswith("<html>")
+
+
+def test_new_accession_is_downloaded_and_listed(sec):
+    provider, edgar = sec
+    provider.get_latest_filing("AAPL", "10-K")
+    edgar.latest = ("0000320193-25-000079", "2025-10-31")
+
+    ref = provider.get_latest_filing("AAPL", "10-K")
+
+    assert len(edgar.downloads()) == 2
+    manifest = provider.load_manifest("AAPL")["10-K"]
+    assert [e["accession"] for e in manifest] == ["0000320193-25-000079", "0000320193-24-000123"]
+    assert ref.filing_date == "2025-10-31"
+
+
+def test_latest_known_needs_no_network(sec):
+    provider, edgar = sec
+    assert provider.latest_known_filing("AAPL", "10-K") is None
+    provider.get_latest_filing("AAPL", "10-K")
+    calls = len(edgar.urls)
+
+    ref = provider.get_latest_filing("AAPL", "10-K", refresh=False)
+
+    assert len(edgar.urls) == calls
+    assert ref.accession == "0000320193-24-000123"
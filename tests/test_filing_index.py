@@ -0,0 +1,109 @@
+"""Tests for the persisted word and sentence offset indexes behind filing searches."""
+import os
+
+import pytest
+
+from src.util.filing_index import OffsetIndex, SentenceIndex, WordIndex
+from src.util.filings_processor import (
+    PhraseMatcher,
+    extract_keyword_context,
+    extract_matches_with_context,
+    extract_regex_context,
+    split_into_sentences,
+)
+
+TEXT = "  UNITED STATES\n\nItem 7. Management's Discussion | Analysis\n\tRevenue grew 8%   in fiscal 2024.\n"
+
+
+def test_starts_line_up_with_split():
+    index = WordIndex.build(TEXT)
+    words = TEXT.split()
+
+    assert len(index) == len(words)
+    assert all(TEXT.startswith(w, s) for w, s in zip(words, index.starts))
+    assert index.word_at(TEXT.index("grew") + 2) == words.index("grew")
+    assert index.words(TEXT, 2, 5) == " ".join(words[2:5])
+    assert index.words(TEXT, 12, len(words)) == " ".join(words[12:])
+    assert len(WordIndex.build("  \n ")) == 0
+
+
+def test_saved_index_is_memory_mapped_and_reused(tmp_path):
+    clean = tmp_path / "clean.txt"
+    clean.write_text(TEXT, encoding="utf-8")
+
+    built = WordIndex.for_file(clean)
+    loaded = WordIndex.for_file(clean)
+
+    assert (tmp_path / "clean.words.idx").exists()
+    assert isinstance(loaded.starts, memoryview)
+    assert list(loaded.starts) == list(built.starts)
+
+
+def test_rewritten_text_invalidates_index(tmp_path):
+    clean = tmp_path / "clean.txt"
+    clean.write_text(TEXT, encoding="utf-8")
+    WordIndex.for_file(clean)
+    stat = clean.stat()
+
+    clean.write_text("short text", encoding="utf-8")
+    os.utime(clean, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert WordIndex.load(WordIndex.path_for(clean), clean.stat()) is None
+    assert len(WordIndex.for_file(clean)) == 2
+
+
+def test_searches_map_matches_to_exact_word_windows():
+    # Irregular whitespace before the match used to shift the window
+    text = "alpha\n\n\n\nbeta   gamma delta epsilon zeta"
+    index = WordIndex.build(text)
+
+    assert extract_keyword_context(text, ["delta"], 1, 1, index=index) == "gamma delta epsilon"
+    assert extract_regex_context(text, r"eps\w+", 1, 0, snippet_min_words=2) == ["delta epsilon"]
+
+
+PROSE = "Mr. Cook leads Apple Inc. and U.S. operations.  Revenue grew.\nAI spending rose. R&D too. "
+
+
+def test_sentence_index_agrees_with_split_into_sentences():
+    index = SentenceIndex.build(PROSE)
+    sentences = split_into_sentences(PROSE)
+
+    assert [index.sentence(PROSE, i) for i in range(len(index))] == sentences
+    assert index.sentence_at(PROSE.index("spending")) == 2
+    assert index.context(PROSE, 0, size=1) == " ".join(sentences[:2])
+    assert len(SentenceIndex.build("   ")) == 0
+
+
+def test_sentence_and_word_sidecars_are_separate(tmp_path):
+    clean = tmp_path / "clean.txt"
+    clean.write_text(PROSE, encoding="utf-8")
+
+    SentenceIndex.for_file(clean)
+    WordIndex.for_file(clean)
+
+    assert (tmp_path / "clean.sentences.idx").exists()
+    assert WordIndex.load(SentenceIndex.path_for(clean), clean.stat()) is None  # magic differs
+    assert len(SentenceIndex.for_file(clean)) == 4
+
+
+def test_topic_matches_are_placed_in_sentences():
+    index = SentenceIndex.build(PROSE)
+
+    matches = extract_matches_with_context(PROSE, PhraseMatcher([r"\bai\b", "r&d", "revenue"]), index)
+
+    assert [(m["position"], m["target_sentence"]) for m in matches] == [
+        (1, "Revenue grew."), (2, "AI spending rose."), (3, "R&D too."),
+    ]
+    assert matches[0]["context"] == " ".join(split_into_sentences(PROSE))
+    assert extract_matches_with_context(PROSE, r"cook|grew") == [
+        {"target_sentence": s, "context": " ".join(split_into_sentences(PROSE)[:p + 3]), "position": p}
+        for p, s in [(0, split_into_sentences(PROSE)[0]), (1, "Revenue grew.")]
+    ]
+
+
+def test_index_without_build_cannot_be_instantiated():
+    class LineIndex(OffsetIndex):
+        SUFFIX = ".lines.idx"
+
+    with pytest.raises(TypeError, match="build"):
+        LineIndex([0])
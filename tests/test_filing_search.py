@@ -0,0 +1,85 @@
+"""Tests for the workspace-wide FTS5 filing index."""
+import json
+
+import pytest
+
+from src.datahub import DataHub
+from src.datahub.filing_search import FilingSearchIndex
+
+
+def _filing(root, ticker, date, form, text, sections=None):
+    filing_dir = root / ticker / date / form.lower().replace("-", "")
+    (filing_dir / "sections").mkdir(parents=True)
+    (filing_dir / "clean.txt").write_text(text, encoding="utf-8")
+    for name, body in (sections or {}).items():
+        (filing_dir / "sections" / f"{name}.txt").write_text(body, encoding="utf-8")
+    (filing_dir / "metadata.json").write_text(json.dumps({
+        "ticker": ticker, "form": form, "filing_date": date,
+        "accession": f"{ticker}-{date}", "cik": "0000000001",
+    }))
+    return filing_dir
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "data" / "sec"
+    _filing(root, "NVDA", "2024-02-21", "10-K",
+            "New export controls on China restrict data center GPU sales.",
+            {"risk_factors": "<risk_factors>\nExport controls may limit our China revenue.\n</risk_factors>"})
+    _filing(root, "AMD", "2024-01-31", "10-K", "Export regulations and controls affect some products.")
+    _filing(root, "AAPL", "2024-11-01", "10-K", "iPhone net sales grew in every geographic segment.")
+    return FilingSearchIndex(tmp_path / "filings.db", root), root
+
+
+def test_phrase_query_ranks_and_collapses_per_filing(workspace):
+    index, _ = workspace
+    assert index.ingest() == {"added": 4, "updated": 0, "removed": 0, "documents": 4}
+
+    hits = index.search('"export controls"')
+
+    assert [h["ticker"] for h in hits] == ["NVDA"]
+    assert sorted(hits[0]["matched_in"]) == ["filing", "risk_factors"]
+    assert hits[0]["filing_path"].endswith("clean.txt")
+    assert hits[0]["snippet"] == "New [export controls] on China restrict data center GPU sales."
+
+
+def test_boolean_proximity_and_filters(workspace):
+    index, _ = workspace
+    index.ingest()
+
+    assert {h["ticker"] for h in index.search("export AND controls")} == {"NVDA", "AMD"}
+    assert [h["ticker"] for h in index.search("NEAR(export controls, 0)")] == ["NVDA"]
+    assert [h["ticker"] for h in index.search("export", tickers=["amd"])] == ["AMD"]
+    assert index.search("export", forms=["10Q"]) == []
+    assert [h["ticker"] for h in index.search("export", date_from="2024-02-01")] == ["NVDA"]
+    assert len(index.search("export", per_filing=False)) == 3
+
+
+def test_ingest_is_incremental(workspace):
+    index, root = workspace
+    index.ingest()
+    assert index.ingest() == {"added": 0, "updated": 0, "removed": 0, "documents": 4}
+
+    (root / "AAPL" / "2024-11-01" / "10k" / "clean.txt").write_text("Tariffs raised export costs.")
+    (root / "NVDA" / "2024-02-21" / "10k" / "sections" / "risk_factors.txt").unlink()
+
+    assert index.ingest() == {"added": 0, "updated": 1, "removed": 1, "documents": 3}
+    assert [h["ticker"] for h in index.search("tariffs")] == ["AAPL"]
+
+
+def test_invalid_query_raises_value_error(workspace):
+    index, _ = workspace
+    index.ingest()
+
+    with pytest.raises(ValueError):
+        index.search('"unbalanced')
+
+
+def test_datahub_search_filings(workspace):
+    index, _ = workspace
+    hub = DataHub(fmp=object(), sec=object(), cache=object(), prices=object(), filing_search=index)
+
+    found = hub.search_filings("export", forms=["10-K"], limit=1)
+
+    assert found["indexed"]["added"] == 4
+    assert len(found["hits"]) == 1
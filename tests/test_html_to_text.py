@@ -0,0 +1,61 @@
+"""Tests for the streaming HTML -> text converter used for clean.txt."""
+import pytest
+
+from src.util.filings_processor import HtmlToText, html_to_text
+
+DOCUMENT = """<html><head><title>aapl-20240928</title><style>p { color: red }</style></head>
+<body>
+<div style="display:none"><ix:header><ix:hidden>dei:EntityCentralIndexKey 0000320193</ix:hidden></ix:header></div>
+<p>UNITED&#160;STATES SECURITIES AND EXCHANGE COMMISSION</p>
+<p>Item&#160;7<span>.</span>   Management&#8217;s Discussion &amp; Analysis</p>
+<!-- page break -->
+<table><tr><td>Net sales</td><td>$</td><td>391,035</td></tr>
+<tr><td>Cost&nbsp;of sales</td><td>210,352</td></tr></table>
+<ul><li>&#8226;iPhone</li><li>Mac &#8212; desktops</li></ul>
+<script>var x = "<p>not text</p>";</script>
+<p>R&amp;D rose&#8230;</p>
+</body></html>"""
+
+
+def test_converts_blocks_cells_and_entities():
+    text = html_to_text(DOCUMENT)
+
+    assert text.splitlines() == [
+        "UNITED STATES SECURITIES AND EXCHANGE COMMISSION",
+        "",
+        "Item 7. Management's Discussion & Analysis",
+        "",
+        "Net sales | $ | 391,035",
+        "Cost of sales | 210,352",
+        "",
+        "- iPhone",
+        "Mac - desktops",
+        "",
+        "R&D rose…",
+    ]
+
+
+def test_drops_hidden_content():
+    text = html_to_text(DOCUMENT)
+
+    assert "EntityCentralIndexKey" not in text
+    assert "not text" not in text
+    assert "color" not in text
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_output_is_independent_of_chunking(size):
+    converter = HtmlToText()
+    parts = [converter.feed(DOCUMENT[i:i + size]) for i in range(0, len(DOCUMENT), size)]
+    parts.append(converter.close())
+
+    assert "".join(parts).strip() == html_to_text(DOCUMENT)
+
+
+def test_unknown_tags_separate_words():
+    assert html_to_text("<x-foo>alpha</x-foo><x-bar>beta</x-bar>") == "alpha beta"
+    assert html_to_text("<P>one</P><P>two</P>") == "one\n\ntwo"
+
+
+def test_escaped_entities_decode_once():
+    assert html_to_text("<p>AT&#38;amp;T and R&#38;lt;D, R&#38;D</p>") == "AT&amp;T and R&lt;D, R&D"
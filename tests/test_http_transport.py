@@ -0,0 +1,119 @@
+"""Tests for the shared keep-alive HTTP transport."""
+import ssl
+import gzip
+import json
+import zlib
+import pytest
+from http.server import BaseHTTPRequestHandler
+from urllib.error import HTTPError
+from src.providers.http import HttpTransport
+
+
+BIG = b"".join(b"line %d\n" % i for i in range(200_000))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body: bytes, extra=None):
+        self.send_response(status)
+        for k, v in (extra or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/json"):
+            body = json.dumps({"path": self.path, "ae": self.headers.get("Accept-Encoding")})
+            self._send(200, body.encode())
+        elif self.path == "/gzip":
+            self._send(200, gzip.compress(b'{"zipped": true}'), {"Content-Encoding": "gzip"})
+        elif self.path == "/big.gz":
+            self._send(200, gzip.compress(BIG), {"Content-Encoding": "gzip"})
+        elif self.path in ("/big.zlib", "/big.deflate"):
+            # zlib-wrapped, or raw deflate without a header (as some servers send)
+            packer = zlib.compressobj(wbits=zlib.MAX_WBITS if self.path.endswith("zlib") else -zlib.MAX_WBITS)
+            self._send(200, packer.compress(BIG) + packer.flush(), {"Content-Encoding": "deflate"})
+        elif self.path == "/redirect":
+            self._send(302, b"", {"Location": "/json?redirected=1"})
+        else:
+            self._send(404, b"missing")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(200, json.dumps({"echo": body.decode()}).encode())
+
+
+def test_connections_are_reused(serve):
+    base = serve(_Handler)
+    transport = HttpTransport(pool_size=2)
+
+    for i in range(5):
+        assert transport.get_json(f"{base}/json?i={i}")["path"] == f"/json?i={i}"
+
+    assert transport.stats["requests"] == 5
+    assert transport.stats["connections_opened"] == 1
+    assert transport.stats["connections_reused"] == 4
+
+
+def test_gzip_requested_and_decoded(serve):
+    base = serve(_Handler)
+    transport = HttpTransport()
+
+    assert "gzip" in transport.get_json(f"{base}/json")["ae"]
+    assert transport.get_json(f"{base}/gzip") == {"zipped": True}
+
+
+def test_redirect_followed(serve):
+    base = serve(_Handler)
+    assert HttpTransport().get_json(f"{base}/redirect")["path"] == "/json?redirected=1"
+
+
+def test_http_error_raised(serve):
+    base = serve(_Handler)
+    with pytest.raises(HTTPError) as exc:
+        HttpTransport().get(f"{base}/nope")
+    assert exc.value.code == 404
+
+
+def test_post_form_body(serve):
+    base = serve(_Handler)
+    resp = HttpTransport().post(f"{base}/token", "username=a&password=b")
+    assert resp.json() == {"echo": "username=a&password=b"}
+
+
+def test_https_keep_alive(serve, tls_cert):
+    base = serve(_Handler, tls=tls_cert)
+    ctx = ssl.create_default_context(cafile=str(tls_cert[0]))
+    transport = HttpTransport(ssl_context=ctx)
+
+    for _ in range(3):
+        transport.get_json(f"{base}/json")
+
+    assert transport.stats["connections_opened"] == 1
+
+
+def test_stream_yields_decoded_chunks_and_reuses_connection(serve):
+    base = serve(_Handler)
+    transport = HttpTransport()
+
+    chunks = list(transport.stream(f"{base}/big.gz", chunk_size=16 * 1024))
+    transport.get_json(f"{base}/json")
+
+    assert b"".join(chunks) == BIG
+    assert len(chunks) > 1
+    assert transport.stats["connections_opened"] == 1
+
+
+@pytest.mark.parametrize("path", ["/big.zlib", "/big.deflate"])
+def test_stream_and_get_decode_both_deflate_forms(serve, path):
+    base = serve(_Handler)
+    transport = HttpTransport()
+
+    assert b"".join(transport.stream(f"{base}{path}", chunk_size=16 * 1024)) == BIG
+    assert transport.get(f"{base}{path}").body == BIG
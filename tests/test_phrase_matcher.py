@@ -0,0 +1,70 @@
+"""Tests for the single-pass multi-phrase matcher."""
+from src.util.filings_processor import (
+    PhraseMatcher,
+    extract_ai_content,
+    extract_keyword_context,
+    extract_rd_content,
+)
+
+
+def test_finds_all_phrases_in_text_order():
+    matcher = PhraseMatcher(["Net Sales", "net income", "income taxes"])
+    text = "NET SALES rose. Provision for income\ntaxes fell; net sales and net income grew."
+
+    found = [(text[s:e], phrase) for s, e, phrase in matcher.finditer(text)]
+
+    assert found == [
+        ("NET SALES", "Net Sales"),
+        ("income\ntaxes", "income taxes"),
+        ("net sales", "Net Sales"),
+        ("net income", "net income"),
+    ]
+
+
+def test_word_boundary_entries():
+    matcher = PhraseMatcher([r"\bai\b", "generative ai", r"\bllm\b"])
+
+    assert [p for _, _, p in matcher.finditer("AI, said the maid; generative AI and LLMs")] == [
+        r"\bai\b", "generative ai",
+    ]
+    assert not matcher.search("Chairman of the board")
+    assert PhraseMatcher(["ai"], whole_words=True).search("maid") is False
+
+
+def test_longest_phrase_wins_at_same_position():
+    matcher = PhraseMatcher(["research", "research and development"])
+
+    assert [p for _, _, p in matcher.finditer("Research and development costs")] == ["research and development"]
+
+
+def test_longest_phrase_wins_across_boundary_flags():
+    matcher = PhraseMatcher([r"\bartificial", "artificial intelligence", r"\bgen\b", "genai"])
+
+    assert [p for _, _, p in matcher.finditer("Artificial intelligence, artificial sweeteners")] == [
+        "artificial intelligence", r"\bartificial",
+    ]
+    # The short phrase still needs its boundary; the long one doesn't
+    assert [p for _, _, p in matcher.finditer("nonartificial intelligence; nonartificial")] == [
+        "artificial intelligence",
+    ]
+    assert [p for _, _, p in matcher.finditer("GenAI, gen Z, oxygen")] == ["genai", r"\bgen\b"]
+
+
+def test_offsets_survive_case_folding_that_changes_length():
+    text = "İstanbul office; machine learning team"
+    start, end, _ = next(PhraseMatcher(["machine learning"]).finditer(text))
+
+    assert text[start:end] == "machine learning"
+
+
+def test_empty_phrase_list_matches_nothing():
+    assert list(PhraseMatcher([]).finditer("anything")) == []
+
+
+def test_extractors_use_one_pass_matching():
+    text = "We invest in AI. Research & Development expenses grew. The maid left. Sales were flat."
+
+    assert extract_keyword_context(text, ["invest", "SALES"], 0, 0) == "invest\n\n--- SNIPPET BREAK ---\n\nSales"
+    assert "Target Sentence: We invest in AI." in extract_ai_content(text)
+    assert "Target Sentence: The maid left." not in extract_ai_content(text)
+    assert "Research & Development expenses grew." in extract_rd_content(text)
@@ -0,0 +1,87 @@
+"""Tests for the columnar PriceColumns representation."""
+import json
+import os
+import subprocess
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+from src.domain.models import PriceColumns, PricePoint, PriceSeries, Provenance
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def make_series():
+    # FMP order: newest first
+    points = [
+        PricePoint(date="2024-01-04", close=Decimal("184.25"), open=Decimal("182.15"), volume=58414500),
+        PricePoint(date="2024-01-03", close=Decimal("184.25"), high=Decimal("185.88")),
+        PricePoint(date="2024-01-02", close=Decimal("185.64"), open=Decimal("187.15"), volume=82488700),
+    ]
+    return PriceSeries(ticker="AAPL", currency="USD", points=points, provenance=Provenance(source="FMP"))
+
+
+def test_round_trip_through_series():
+    series = make_series()
+    columns = PriceColumns.from_series(series)
+
+    assert len(columns) == 3
+    assert columns.date_iso(0) == "2024-01-02"  # chronological
+    assert columns.dates.tolist() == [20240102, 20240103, 20240104]
+    assert columns.to_series() == series
+
+
+def test_window_is_a_view():
+    columns = PriceColumns.from_series(make_series())
+    window = columns.window("2024-01-03", "2024-01-10")
+
+    assert window.dates.tolist() == [20240103, 20240104]
+    assert window.close.obj is columns.close.obj  # no copy
+
+
+def test_bytes_round_trip_and_size():
+    series = make_series()
+    columns = PriceColumns.from_series(series)
+    blob = columns.to_bytes(meta={"covered_to": "2024-01-04"})
+
+    decoded, meta = PriceColumns.from_bytes(blob)
+
+    assert meta == {"covered_to": "2024-01-04"}
+    assert decoded.to_series() == series
+    assert len(blob) < len(series.model_dump_json())
+
+
+def test_load_json_and_compact_files(tmp_path):
+    series = make_series()
+    json_path = tmp_path / "prices_1y.json"
+    json_path.write_text(series.model_dump_json())
+    pxc_path = tmp_path / "prices_1y.pxc"
+    pxc_path.write_bytes(PriceColumns.from_series(series).to_bytes())
+    fmp_path = tmp_path / "raw.json"
+    fmp_path.write_text(json.dumps({"symbol": "AAPL", "historical": [{"date": "2024-01-02", "close": 185.64}]}))
+
+    assert PriceColumns.load(json_path).close.tolist() == [185.64, 184.25, 184.25]
+    assert PriceColumns.load(pxc_path).volume.tolist() == [82488700, -1, 58414500]
+    assert PriceColumns.load(fmp_path).ticker == "AAPL"
+
+
+def _chart(tmp_path, **args):
+    out = subprocess.run(
+        [sys.executable, str(REPO / "bin" / "mf-chart-data")],
+        input=json.dumps({"type": "line", "save": False, **args}),
+        capture_output=True, text=True, env=dict(os.environ, WORKSPACE_ABS_PATH=str(tmp_path)),
+    )
+    return json.loads(out.stdout)
+
+
+def test_chart_data_from_prices_reports_empty_windows(tmp_path):
+    path = tmp_path / "prices.pxc"
+    path.write_bytes(PriceColumns.from_series(make_series()).to_bytes())
+
+    ok = _chart(tmp_path, prices_path=str(path), max_points=2)
+    assert [p["x"] for p in ok["result"]["chart"]["data"]] == ["2024-01-02", "2024-01-04"]
+
+    empty = _chart(tmp_path, prices_path=str(path), **{"from": "2025-01-01"})
+    assert not empty["ok"] and "No price data in range 2025-01-01..end" in empty["error"]
+    zero = _chart(tmp_path, prices_path=str(path), max_points=0)
+    assert not zero["ok"] and "max_points must be positive" in zero["error"]
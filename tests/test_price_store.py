@@ -0,0 +1,113 @@
+"""Tests for price range resolution and the incremental price store."""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.datahub.prices import PriceStore, resolve_price_range
+from src.domain.models import PricePoint, PriceSeries, Provenance
+
+TODAY = date.today()
+
+
+def _days(n):
+    return (TODAY - timedelta(days=n)).isoformat()
+
+
+class FakeFmp:
+    """Serves one bar per calendar day for the last `history` days, newest first."""
+
+    def __init__(self, history=400):
+        self.calls = []
+        self.history = history
+        self.close = Decimal("100.5")
+
+    def get_historical_prices(self, ticker, from_date=None, to_date=None):
+        self.calls.append((from_date, to_date))
+        days = [_days(n) for n in range(self.history)]
+        points = [
+            PricePoint(date=d, close=self.close, volume=1000)
+            for d in days
+            if (from_date is None or d >= from_date) and (to_date is None or d <= to_date)
+        ]
+        return PriceSeries(ticker=ticker, currency="USD", points=points,
+                           provenance=Provenance(source="FMP"))
+
+
+def test_resolve_presets():
+    today = date(2024, 3, 31)
+    assert resolve_price_range("30d", today) == ("2024-03-01", "2024-03-31")
+    assert resolve_price_range("1m", today) == ("2024-02-29", "2024-03-31")
+    assert resolve_price_range("1y", today) == ("2023-03-31", "2024-03-31")
+    assert resolve_price_range("ytd", today) == ("2024-01-01", "2024-03-31")
+    assert resolve_price_range("max", today) == (None, "2024-03-31")
+    assert resolve_price_range("2024-01-02:2024-02-01") == ("2024-01-02", "2024-02-01")
+    with pytest.raises(ValueError):
+        resolve_price_range("forever")
+
+
+def test_short_range_downloads_only_that_window(tmp_path):
+    store, fmp = PriceStore(tmp_path), FakeFmp()
+    series = store.series("AAPL", _days(30), None, fmp.get_historical_prices)
+
+    assert fmp.calls == [(_days(30), TODAY.isoformat())]
+    assert len(series.points) == 31
+    assert series.points[0].date == TODAY.isoformat()  # newest first, like FMP
+    assert series.points[0].close == Decimal("100.5")
+
+
+def test_overlapping_request_fetches_only_missing_head(tmp_path):
+    store, fmp = PriceStore(tmp_path), FakeFmp()
+    store.series("AAPL", _days(30), None, fmp.get_historical_prices)
+
+    series = store.series("AAPL", _days(90), None, fmp.get_historical_prices)
+
+    assert fmp.calls[1] == (_days(90), _days(31))
+    assert len(series.points) == 91
+    assert series.provenance.meta["bars_fetched"] == 60
+
+
+def test_covered_window_is_served_from_disk(tmp_path):
+    fmp = FakeFmp()
+    PriceStore(tmp_path).series("AAPL", _days(90), _days(10), fmp.get_historical_prices)
+
+    series = PriceStore(tmp_path).series("aapl", _days(60), _days(20), fmp.get_historical_prices)
+
+    assert len(fmp.calls) == 1
+    assert [p.date for p in series.points][::40] == [_days(20), _days(60)]
+
+
+def test_stale_tail_fetches_from_last_covered_date(tmp_path):
+    store, fmp = PriceStore(tmp_path), FakeFmp()
+    store.series("AAPL", _days(30), _days(5), fmp.get_historical_prices)
+
+    store.series("AAPL", _days(30), None, fmp.get_historical_prices)
+
+    # A week of settled bars is re-read to detect re-based history
+    assert fmp.calls[1] == (_days(12), TODAY.isoformat())
+
+
+def test_split_adjusted_history_is_refetched(tmp_path):
+    store, fmp = PriceStore(tmp_path), FakeFmp()
+    store.series("AAPL", _days(90), _days(5), fmp.get_historical_prices)
+
+    fmp.close = Decimal("25.125")  # 4:1 split: FMP re-bases every past close
+    series = store.series("AAPL", _days(90), None, fmp.get_historical_prices)
+
+    assert fmp.calls[1:] == [(_days(12), TODAY.isoformat()), (_days(90), TODAY.isoformat())]
+    assert series.provenance.meta["rebased"] is True
+    assert {p.close for p in series.points} == {Decimal("25.125")}
+
+
+def test_open_ended_fetch_marks_history_complete_only_past_stored_data(tmp_path):
+    store, fmp = PriceStore(tmp_path), FakeFmp(history=100)
+    store.series("AAPL", _days(50), None, fmp.get_historical_prices)
+
+    store.series("AAPL", None, None, fmp.get_historical_prices)
+    _, state = store.load("AAPL")
+    assert state["complete_history"] and state["covered_from"] == _days(99)
+
+    empty = PriceStore(tmp_path / "other")
+    fmp.history = 0  # provider returns nothing: nothing proves the history is complete
+    empty.series("AAPL", None, None, fmp.get_historical_prices)
+    assert empty.load("AAPL")[1]["complete_history"] is False
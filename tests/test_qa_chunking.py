@@ -0,0 +1,74 @@
+"""Tests for mf-qa's structure-aware chunker."""
+from src.util.qa_chunking import chunk_document, chunk_documents, format_chunk
+from src.util.qa_pipeline import CHARS_PER_TOKEN
+
+SENTENCE = "Our revenue depends on a small number of customers in the data center market. "
+BODY = (SENTENCE * 6 + "\n") * 8
+
+FILING = f"""UNITED STATES SECURITIES AND EXCHANGE COMMISSION
+Washington, D.C. 20549
+FORM 10-K
+Indicate by check mark whether the registrant is a large accelerated filer, an accelerated filer or a smaller reporting company.
+Yes ☒ No ☐
+TABLE OF CONTENTS
+Item 1. | Business | 3
+Item 1A. | Risk Factors | 9
+Item 7. | Management's Discussion and Analysis | 24
+Item 8. | Financial Statements | 40
+PART I
+Item 1. Business
+{BODY}Item 1A. Risk Factors
+{BODY}Item 7. Management's Discussion and Analysis
+{BODY}Item 8. Financial Statements
+{BODY}"""
+
+
+def test_chunks_are_exact_slices_within_budget():
+    chunks, _ = chunk_document(FILING, "10k.txt", max_tokens=1000)
+
+    previous_end = 0
+    for chunk in chunks:
+        assert chunk["text"] == FILING[chunk["start"]:chunk["end"]]
+        assert chunk["end"] - chunk["start"] <= 1000 * CHARS_PER_TOKEN
+        assert chunk["start"] >= previous_end
+        previous_end = chunk["end"]
+
+
+def test_sections_start_chunks_and_contents_page_is_dropped():
+    chunks, dropped = chunk_document(FILING, "10k.txt", max_tokens=1500)
+
+    assert dropped == 1
+    assert [c["section"] for c in chunks] == ["Item 1", "Item 1A", "Item 7", "Item 8"]
+    assert chunks[0]["text"].startswith("Item 1. Business")
+    assert all("check mark" not in c["text"] for c in chunks)
+
+
+def test_long_lines_are_cut_at_sentences():
+    text = SENTENCE * 200  # one 16k-char line
+    chunks, _ = chunk_document(text, "INLINE", max_tokens=500)
+
+    assert len(chunks) == 8  # 25 whole sentences each
+    assert all(c["text"].endswith("market. ") for c in chunks[:-1])
+    assert "".join(c["text"] for c in chunks) == text
+
+
+def test_sentences_over_budget_are_cut_at_spaces():
+    text = "word " * 1000
+    chunks, _ = chunk_document(text, "INLINE", max_tokens=100)
+
+    assert all(len(c["text"]) <= 400 for c in chunks)
+    assert "".join(c["text"] for c in chunks) == text
+
+
+def test_boilerplate_only_document_is_kept():
+    chunks, dropped = chunk_document("Table of Contents\nItem 1. | Business | 3\n", "toc.txt")
+
+    assert dropped == 0 and "".join(c["text"] for c in chunks) == "Table of ContentsItem 1. | Business | 3"
+
+
+def test_documents_are_chunked_separately_and_headed_for_citation():
+    chunks, _ = chunk_documents([("a.txt", "Alpha paragraph about supply risk."),
+                                 ("b.txt", "Beta paragraph about demand risk.")])
+
+    assert [(c["source"], c["start"]) for c in chunks] == [("a.txt", 0), ("b.txt", 0)]
+    assert format_chunk(chunks[1]).splitlines()[0] == "===== FILE: b.txt [Document] ====="
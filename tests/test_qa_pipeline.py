@@ -0,0 +1,323 @@
+"""Tests for mf-qa's concurrent map / tree-reduce pipeline against a stand-in Messages API."""
+import os
+import re
+import json
+import time
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+import anthropic
+import pytest
+
+from src.util.disk_cache import DiskCache
+from src.util.qa_pipeline import MIN_CACHEABLE_TOKENS, QAPipeline, cost_usd, estimate_tokens
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _text(content):
+    return content if isinstance(content, str) else "".join(block["text"] for block in content)
+
+
+def _cache_split(request):
+    """(prefix, rest) at the cache_control breakpoint, as the API would cache it."""
+    blocks = request["messages"][0]["content"]
+    if isinstance(blocks, str):
+        return "", blocks
+    for i, block in enumerate(blocks):
+        if "cache_control" in block:
+            prefix = request["system"] + "".join(b["text"] for b in blocks[:i + 1])
+            return prefix, "".join(b["text"] for b in blocks[i + 1:])
+    return "", _text(blocks)
+
+
+class _Messages(BaseHTTPRequestHandler):
+    """
+    POST /v1/messages: echoes which chunk or partials it saw; first calls can be rate limited or overloaded.
+
+    Prefixes up to a cache_control breakpoint are cached once long enough, and
+    reported as cache creation / read tokens like the real API.
+    """
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    requests: list = []
+    in_flight = 0
+    max_in_flight = 0
+    rate_limit_first = 0
+    overload_first = 0
+    reject_chunk = None
+    delay = 0.05
+    cached: set = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            limited = overloaded = False
+            if cls.rate_limit_first:
+                cls.rate_limit_first -= 1
+                limited = True
+            elif cls.overload_first:
+                cls.overload_first -= 1
+                overloaded = True
+            else:
+                cls.requests.append(request)
+                cls.in_flight += 1
+                cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        if limited:
+            self._send(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "slow down"}},
+                       {"retry-after": "0"})
+            return
+        if overloaded:
+            self._send(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+                       {"retry-after": "0"})
+            return
+        time.sleep(cls.delay)
+        content = _text(request["messages"][0]["content"])
+        if cls.reject_chunk and f"CHUNK {cls.reject_chunk}/" in content:
+            with cls.lock:
+                cls.in_flight -= 1
+            self._send(400, {"type": "error", "error": {"type": "invalid_request_error", "message": "bad chunk"}})
+            return
+        prefix, rest = _cache_split(request)
+        usage = {"input_tokens": len(content) // 4, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if len(prefix) // 4 >= MIN_CACHEABLE_TOKENS:
+            usage["input_tokens"] = len(rest) // 4
+            with cls.lock:
+                hit = prefix in cls.cached
+                cls.cached.add(prefix)
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = len(prefix) // 4
+        chunk = re.search(r"CHUNK (\d+)/\d+", content)
+        if chunk:
+            text = f"partial {chunk.group(1)} " + "x" * 400
+        else:
+            seen = re.findall(r"partial (\d+)|merged\[([\d,]+)\]", content)
+            ids = ",".join(a or b for a, b in seen)
+            text = f"merged[{ids}]" + ("" if "PARTIALS:" in content else " " + "y" * 400)
+        with cls.lock:
+            cls.in_flight -= 1
+        self._send(200, {
+            "id": "msg_test", "type": "message", "role": "assistant", "model": request["model"],
+            "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": dict(usage, output_tokens=len(text) // 4),
+        })
+
+
+@pytest.fixture
+def messages_api(serve):
+    class Handler(_Messages):
+        requests = []
+        in_flight = 0
+        max_in_flight = 0
+        rate_limit_first = 0
+        overload_first = 0
+        reject_chunk = None
+        cached = set()
+
+    return Handler, serve(Handler)
+
+
+def _pipeline(base, **kwargs):
+    client = anthropic.Anthropic(api_key="test", base_url=base, max_retries=0)
+    return QAPipeline(client, "claude-test", "system", "List the risks.", **kwargs)
+
+
+def test_map_runs_concurrently_and_streams_partials(messages_api, tmp_path):
+    handler, base = messages_api
+    pipeline = _pipeline(base, concurrency=4, partials_dir=tmp_path)
+
+    answer = pipeline.run([f"chunk text {i}" for i in range(8)])
+
+    assert answer == "merged[1,2,3,4,5,6,7,8]"
+    assert handler.max_in_flight == 4
+    assert {p.name for p in tmp_path.iterdir()} == {f"map_{i:04d}.json" for i in range(1, 9)} | {"final.json"}
+    assert json.loads((tmp_path / "map_0003.json").read_text())["text"].startswith("partial 3 ")
+    assert pipeline.usage["calls"] == 9
+    assert pipeline.usage["reduce_levels"] == 1
+    assert pipeline.usage["input_tokens"] == sum(len(_text(r["messages"][0]["content"])) // 4 for r in handler.requests)
+
+
+def test_rate_limited_calls_are_retried(messages_api):
+    handler, base = messages_api
+    handler.rate_limit_first = 2
+    pipeline = _pipeline(base, concurrency=2)
+
+    assert pipeline.run(["a", "b"]) == "merged[1,2]"
+    assert pipeline.usage["retries"] == 2
+    assert pipeline.usage["calls"] == 3
+
+
+def test_overloaded_calls_are_retried(messages_api):
+    handler, base = messages_api
+    handler.overload_first = 2
+    pipeline = _pipeline(base, concurrency=1)
+
+    assert pipeline.call("hello").startswith("merged[]")
+    assert pipeline.usage["retries"] == 2
+
+
+def test_rate_limit_errors_surface_after_max_retries(messages_api):
+    handler, base = messages_api
+    handler.rate_limit_first = 10
+    pipeline = _pipeline(base, max_retries=1)
+
+    with pytest.raises(anthropic.RateLimitError):
+        pipeline.call("hello")
+
+
+def test_non_retryable_error_cancels_queued_map_calls(messages_api):
+    handler, base = messages_api
+    handler.reject_chunk = 2
+    pipeline = _pipeline(base, concurrency=2)
+
+    with pytest.raises(anthropic.BadRequestError):
+        pipeline.run([f"chunk text {i}" for i in range(40)])
+    assert len(handler.requests) <= 4
+
+
+def test_partials_over_budget_are_tree_reduced(messages_api, tmp_path):
+    handler, base = messages_api
+    # Each partial is ~100 tokens; three fit per group
+    pipeline = _pipeline(base, concurrency=3, reduce_budget_tokens=3 * estimate_tokens("partial 1 " + "x" * 400),
+                         partials_dir=tmp_path)
+
+    answer = pipeline.run([f"chunk {i}" for i in range(9)])
+
+    assert answer == "merged[1,2,3,4,5,6,7,8,9]"
+    assert pipeline.usage["reduce_levels"] == 3
+    assert sorted(p.name for p in tmp_path.glob("reduce_1_*")) == ["reduce_1_0001.json", "reduce_1_0002.json",
+                                                                  "reduce_1_0003.json"]
+    final_prompt = _text(handler.requests[-1]["messages"][0]["content"])
+    assert "PARTIALS:" in final_prompt and estimate_tokens(final_prompt) < 400
+
+
+def test_stable_prefix_is_cached_after_the_first_chunk(messages_api):
+    handler, base = messages_api
+    client = anthropic.Anthropic(api_key="test", base_url=base, max_retries=0)
+    instruction = "List every risk factor with its category. " * 120  # ~1.3k tokens with the schema
+    pipeline = QAPipeline(client, "claude-3-5-sonnet-latest", "system", instruction,
+                          schema={"type": "object", "properties": {"risks": {"type": "array"}}}, concurrency=4)
+
+    pipeline.run([f"chunk text {i}" for i in range(6)])
+
+    first = handler.requests[0]["messages"][0]["content"]
+    assert first[0]["cache_control"] == {"type": "ephemeral"}
+    assert first[0]["text"].startswith("INSTRUCTION:") and "OUTPUT_SCHEMA" in first[0]["text"]
+    assert first[1] == {"type": "text", "text": "CHUNK 1/6:\nchunk text 0"}
+    # First call writes the prefix alone; the other five map calls and the reduce read it
+    prefix_tokens = len("system" + first[0]["text"]) // 4
+    assert pipeline.usage["cache_creation_input_tokens"] == prefix_tokens
+    assert pipeline.usage["cache_read_input_tokens"] == 6 * prefix_tokens
+    cost = cost_usd("claude-3-5-sonnet-latest", pipeline.usage)
+    uncached = dict(pipeline.usage, input_tokens=pipeline.usage["input_tokens"] + 7 * prefix_tokens,
+                    cache_creation_input_tokens=0, cache_read_input_tokens=0)
+    assert cost["cost_usd"] + cost["cache_savings_usd"] == pytest.approx(cost_usd("x", uncached)["cost_usd"])
+    assert cost["cache_savings_usd"] > 0
+
+
+def test_cost_prices_cache_writes_and_reads():
+    usage = {"input_tokens": 1_000_000, "output_tokens": 1_000_000,
+             "cache_creation_input_tokens": 1_000_000, "cache_read_input_tokens": 1_000_000}
+
+    assert cost_usd("claude-3-5-sonnet-latest", usage)["cost_usd"] == pytest.approx(3 + 15 + 3.75 + 0.30)
+    assert cost_usd("claude-3-5-haiku-latest", {"input_tokens": 1_000_000})["cost_usd"] == pytest.approx(0.25)
+    assert cost_usd("claude-3-5-haiku-latest", {"cache_read_input_tokens": 1_000_000}) == pytest.approx(
+        {"cost_usd": 0.025, "cache_savings_usd": 0.225})
+
+
+def test_unchanged_chunks_reuse_cached_partials(messages_api, tmp_path):
+    handler, base = messages_api
+    cache = DiskCache(tmp_path / "cache")
+    chunks = ["Item 1 text", "Item 1A text", "Item 7 text"]
+
+    _pipeline(base, cache=cache).run(chunks)
+    edited = _pipeline(base, cache=cache, partials_dir=tmp_path / "partials")
+    answer = edited.run([chunks[0], "Item 1A text, revised", chunks[2]])
+
+    assert answer == "merged[1,2,3]"
+    assert edited.usage["cached_partials"] == 2 and edited.usage["calls"] == 2  # one map call, then the reduce
+    assert json.loads((tmp_path / "partials" / "map_0001.json").read_text())["cached"] is True
+
+    reworded = _pipeline(base, cache=cache)
+    reworded.instruction = "List the opportunities."
+    reworded.run(chunks)
+    assert reworded.usage["cached_partials"] == 0
+
+
+def test_mf_qa_cli_against_stand_in(messages_api, tmp_path):
+    handler, base = messages_api
+    doc = tmp_path / "doc.txt"
+    doc.write_text("Risk paragraph. " * 2000, encoding="utf-8")
+    env = dict(os.environ, ANTHROPIC_API_KEY="test", ANTHROPIC_BASE_URL=base, WORKSPACE_ABS_PATH=str(tmp_path / "ws"))
+
+    out = subprocess.run(
+        [sys.executable, str(REPO / "bin" / "mf-qa")],
+        input=json.dumps({"document_paths": [str(doc)], "instruction": "List risks", "max_chunk_chars": 5000,
+                          "concurrency": 3}),
+        capture_output=True, text=True, env=env, check=True,
+    )
+    result = json.loads(out.stdout)
+
+    assert result["ok"], result
+    assert result["result"] == "merged[1,2,3,4,5,6,7]"
+    assert result["metrics"]["chunks"] == 7 and result["metrics"]["api_calls"] == 8
+    assert result["metrics"]["cache_read_input_tokens"] == 0  # prefix too short to cache
+    assert handler.requests[0]["messages"][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    partials_dir = Path(result["paths"][1])
+    assert len(list(partials_dir.glob("map_*.json"))) == 7
+    manifest = json.loads((partials_dir / "chunks.json").read_text())
+    assert manifest[0] == {"source": str(doc), "section": "Document", "start": 0, "end": manifest[1]["start"],
+                           "tokens": manifest[0]["tokens"]}
+    assert _text(handler.requests[0]["messages"][0]["content"]).count(f"===== FILE: {doc} [Document] =====") == 1
+
+
+def test_mf_qa_cli_returns_cached_result(messages_api, tmp_path):
+    handler, base = messages_api
+    doc = tmp_path / "doc.txt"
+    sections = {item: f"{topic} risk paragraph for the year.\n" * 25
+                for item, topic in (("1", "Supply"), ("1A", "Demand"), ("7", "Currency"))}
+    doc.write_text("".join(f"Item {item}. Heading\n{body}" for item, body in sections.items()), encoding="utf-8")
+    env = dict(os.environ, ANTHROPIC_API_KEY="test", ANTHROPIC_BASE_URL=base, WORKSPACE_ABS_PATH=str(tmp_path / "ws"))
+
+    def ask(**extra):
+        out = subprocess.run(
+            [sys.executable, str(REPO / "bin" / "mf-qa")],
+            input=json.dumps({"document_paths": [str(doc)], "instruction": "List risks", "max_chunk_tokens": 400,
+                              **extra}),
+            capture_output=True, text=True, env=env, check=True,
+        )
+        return json.loads(out.stdout)
+
+    first = ask()
+    calls = len(handler.requests)
+    second = ask()
+
+    assert second["metrics"]["cached"] is True and len(handler.requests) == calls
+    assert second["result"] == first["result"] and second["paths"] == first["paths"]
+    assert second["metrics"]["cost_usd"] == first["metrics"]["cost_usd"] > 0
+    assert second["metrics"]["original_t_ms"] == first["metrics"]["t_ms"]
+
+    assert ask(cache=False)["metrics"]["cached"] is False
+    assert ask(reduce_budget_tokens=100)["metrics"]["cached"] is False  # a different reduce tree
+    # Editing Item 1A re-runs the answer but reuses the partials of Items 1 and 7
+    doc.write_text(doc.read_text(encoding="utf-8").replace("Demand risk", "Demand and pricing risk"), encoding="utf-8")
+    third = ask()
+    assert first["metrics"]["chunks"] == third["metrics"]["chunks"] == 3
+    assert third["metrics"]["cached"] is False and third["metrics"]["cached_partials"] == 2
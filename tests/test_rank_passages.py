@@ -0,0 +1,63 @@
+"""Tests for BM25-ranked, budgeted passage retrieval over a filing."""
+from src.util.filing_index import WordIndex
+from src.util.filings_processor import TOKENS_PER_WORD, rank_passages
+
+
+def _filler(n: int) -> str:
+    return " ".join(f"w{i}" for i in range(n))
+
+
+# Sparse mentions early, a dense discussion of both terms in the middle
+TEXT = " ".join([
+    _filler(300), "export controls", _filler(300),
+    "new export controls on shipments to China; China export controls may limit China sales",
+    _filler(300), "China", _filler(300), "export controls", _filler(300),
+])
+
+
+def test_dense_passage_ranks_first():
+    passages = rank_passages(TEXT, ["export controls", "China"], passage_words=40, top_k=1)
+
+    assert len(passages) == 1
+    best = passages[0]
+    assert best["rank"] == 1
+    assert best["hits"] == {"export controls": 2, "China": 3}
+    assert "China export controls may limit" in best["text"]
+    assert best["end_word"] - best["start_word"] == 40
+
+
+def test_budget_caps_output_and_passages_do_not_overlap():
+    passages = rank_passages(TEXT, ["export controls", "China"], passage_words=40, max_words=120)
+
+    assert len(passages) == 3
+    assert [p["start_word"] for p in passages] == sorted(p["start_word"] for p in passages)
+    for left, right in zip(passages, passages[1:]):
+        assert left["end_word"] <= right["start_word"]
+    scores = [p["score"] for p in sorted(passages, key=lambda p: p["rank"])]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_token_budget_is_converted_to_words():
+    by_tokens = rank_passages(TEXT, ["export controls"], passage_words=40, max_tokens=int(80 * TOKENS_PER_WORD))
+
+    assert sum(p["end_word"] - p["start_word"] for p in by_tokens) <= 80
+    assert len(by_tokens) == 2
+
+
+def test_budget_below_one_passage_shrinks_it():
+    passages = rank_passages(TEXT, ["China"], passage_words=200, max_words=25)
+
+    assert len(passages) == 1
+    assert passages[0]["end_word"] - passages[0]["start_word"] == 25
+    assert "China" in passages[0]["text"]
+
+
+def test_whole_words_only_and_index_reuse():
+    text = "Our maid service uses AI tools. " + _filler(50)
+    index = WordIndex.build(text)
+
+    passages = rank_passages(text, ["ai"], passage_words=10, index=index)
+
+    assert [p["hits"] for p in passages] == [{"ai": 1}]
+    assert rank_passages(text, ["robotics"], index=index) == []
+    assert rank_passages("", ["ai"]) == []
@@ -0,0 +1,49 @@
+"""Tests for the shared file-backed token bucket."""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.providers.ratelimit import FileTokenBucket
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_idle_caller_does_not_wait(tmp_path):
+    bucket = FileTokenBucket(tmp_path / "b.json", rate=10)
+    assert bucket.acquire() == 0
+    time.sleep(0.15)
+    assert bucket.acquire() == 0
+    assert bucket.stats["waited"] == 0
+
+
+def test_back_to_back_calls_are_spaced(tmp_path):
+    bucket = FileTokenBucket(tmp_path / "b.json", rate=20)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.perf_counter() - start
+
+    assert 0.18 < elapsed < 0.5  # 4 gaps of 50ms
+    assert bucket.stats["waited"] == 4
+    assert bucket.stats["wait_ms"] > 150
+
+
+def test_limit_is_shared_across_processes(tmp_path):
+    state = tmp_path / "shared.json"
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from src.providers.ratelimit import FileTokenBucket\n"
+        "b = FileTokenBucket(%r, rate=20)\n"
+        "for _ in range(5): b.acquire()\n"
+    ) % (str(ROOT), str(state))
+
+    start = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(3)]
+    for p in procs:
+        assert p.wait() == 0
+    elapsed = time.perf_counter() - start
+
+    # 15 requests at 20/s need >= 0.7s no matter how they're split
+    assert elapsed >= 0.65
@@ -0,0 +1,106 @@
+"""Tests for the one-pass Item heading index behind section extraction."""
+from src.util.filing_sections import SectionIndex
+from src.util.filings_processor import extract_mda, extract_risk_factors
+
+BODY = "The Company's results are discussed below in considerable detail for the year. " * 3
+
+TEN_K = f"""UNITED STATES SECURITIES AND EXCHANGE COMMISSION
+Item 1. | Business | 1
+Item 1A. | Risk Factors | 5
+Item 7. | Management's Discussion and Analysis | 20
+Item 8. | Financial Statements and Supplementary Data | 30
+
+PART I
+
+Item 1. Business
+
+{BODY}
+Part II, Item 7 of this Form 10-K describes results.
+Item 7 of this report is incorporated by reference.
+
+Item 1A.    Risk Factors
+
+{BODY}
+
+PART II
+
+ITEM 7.
+
+MANAGEMENT'S DISCUSSION AND ANALYSIS OF FINANCIAL CONDITION
+
+{BODY}
+
+Item 8. Financial Statements and Supplementary Data
+
+{BODY}
+"""
+
+TEN_Q = f"""PART I — FINANCIAL INFORMATION
+
+Item 1. Financial Statements
+
+{BODY}
+
+Item 2. Management's Discussion and Analysis
+
+{BODY}
+
+PART II — OTHER INFORMATION
+
+Item 1. Legal Proceedings
+
+{BODY}
+
+Item 1A. Risk Factors
+
+{BODY}
+"""
+
+
+def test_contents_entries_are_flagged_and_body_headings_kept():
+    index = SectionIndex.build(TEN_K)
+
+    toc = [h["item"] for h in index.headings if h["toc"]]
+    body = [(h["part"], h["item"]) for h in index.headings if not h["toc"]]
+    assert toc == ["1", "1A", "7", "8"]
+    assert body == [("I", None), ("I", "1"), ("I", "1A"), ("II", None), ("II", "7"), ("II", "8")]
+
+
+def test_sections_are_slices_up_to_the_next_heading():
+    index = SectionIndex.build(TEN_K)
+
+    mda = index.section(TEN_K, "mda")
+    business = index.section(TEN_K, "business")
+
+    assert mda.startswith("ITEM 7. MANAGEMENT'S DISCUSSION") and mda.endswith("for the year.")
+    assert "Part II, Item 7 of this Form 10-K" in business  # prose, not a heading
+    assert "Risk Factors" not in business
+
+
+def test_10q_sections_are_found_by_title():
+    index = SectionIndex.build(TEN_Q)
+
+    assert index.section(TEN_Q, "mda").startswith("Item 2. Management's Discussion")
+    assert index.section(TEN_Q, "financial_statements").startswith("Item 1. Financial Statements")
+    assert [h["part"] for h in index.find("risk_factors")] == ["II"]
+    assert index.section(TEN_Q, "business") is None
+
+
+def test_sidecar_is_reused_until_text_changes(tmp_path):
+    clean = tmp_path / "clean.txt"
+    clean.write_text(TEN_K, encoding="utf-8")
+
+    first = SectionIndex.for_file(clean)
+    again = SectionIndex.load(SectionIndex.path_for(clean), clean.stat())
+
+    assert (tmp_path / "clean.sections.json").exists()
+    assert again.headings == first.headings
+    clean.write_text(TEN_Q, encoding="utf-8")
+    assert SectionIndex.load(SectionIndex.path_for(clean), clean.stat()) is None
+
+
+def test_extractors_keep_their_tagged_output():
+    index = SectionIndex.build(TEN_K)
+
+    assert extract_mda(TEN_K, sections=index).startswith("<mda>\nITEM 7.")
+    assert extract_risk_factors(TEN_K).startswith("<risk_factors>\nItem 1A. Risk Factors")
@@ -0,0 +1,70 @@
+"""Tests for the streaming EDGAR SGML splitter."""
+import io
+import tracemalloc
+
+import pytest
+
+from src.providers.sec.sgml import split_submission
+
+SUBMISSION = b"""<SEC-DOCUMENT>0000320193-24-000123.txt : 20241101
+<SEC-HEADER>
+ACCESSION NUMBER:\t\t0000320193-24-000123
+</SEC-HEADER>
+<DOCUMENT>
+<TYPE>10-K
+<SEQUENCE>1
+<FILENAME>aapl-20240928.htm
+<DESCRIPTION>10-K
+<TEXT>
+<html><body><p>Annual report</p></body></html>
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-21.1
+<SEQUENCE>2
+<FILENAME>a10-kexhibit2119282024.htm
+<TEXT><p>Subsidiaries</p></TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>
+"""
+
+
+def _chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 5, 64, 1 << 20])
+def test_split_is_independent_of_chunking(tmp_path, size):
+    raw = io.BytesIO()
+    docs = split_submission(_chunks(SUBMISSION, size), tmp_path / str(size), raw=raw)
+
+    assert raw.getvalue() == SUBMISSION
+    assert [(d.type, d.sequence, d.filename) for d in docs] == [
+        ("10-K", "1", "aapl-20240928.htm"),
+        ("EX-21.1", "2", "a10-kexhibit2119282024.htm"),
+    ]
+    assert docs[0].description == "10-K"
+    assert docs[0].path.read_bytes() == b"<html><body><p>Annual report</p></body></html>\n"
+    assert docs[1].path.read_bytes() == b"<p>Subsidiaries</p>"
+    assert docs[1].bytes == len(b"<p>Subsidiaries</p>")
+
+
+def test_truncated_submission_keeps_partial_body(tmp_path):
+    cut = SUBMISSION.index(b"Annual") + 6
+    docs = split_submission([SUBMISSION[:cut]], tmp_path)
+    assert len(docs) == 1
+    assert docs[0].path.read_bytes().endswith(b"Annual")
+
+
+def test_memory_bounded_by_chunk_size(tmp_path):
+    body = b"<p>" + b"x" * 100 + b"</p>\n"
+    head, tail = SUBMISSION.split(b"<html>", 1)
+    big = head + body * 100_000 + b"<html>" + tail  # ~10 MB primary document
+
+    tracemalloc.start()
+    docs = split_submission(_chunks(big, 64 * 1024), tmp_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert docs[0].bytes > 10_000_000
+    assert peak < 1024 * 1024